@@ -1,6 +1,6 @@
 {
     'name': 'Odoo 19 Accounting Financial Reports',
-    'version': '1.0.2',
+    'version': '1.0.3',
     'category': 'Invoicing Management',
     'description': 'Accounting Reports For Odoo 19, Accounting Financial Reports, '
                    'Odoo 19 Financial Reports',
@@ -16,11 +16,14 @@
     'live_test_url': 'https://www.youtube.com/watch?v=yA4NLwOLZms',
     'data': [
         'security/ir.model.access.csv',
+        'security/account_report_export_security.xml',
         'data/account_account_type.xml',
+        'data/ir_cron_data.xml',
         'views/menu.xml',
         'views/ledger_menu.xml',
         'views/financial_report.xml',
         'views/settings.xml',
+        'views/account_report_export.xml',
         'wizard/account_report_common_view.xml',
         'wizard/partner_ledger.xml',
         'wizard/general_ledger.xml',
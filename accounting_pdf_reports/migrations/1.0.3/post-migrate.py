@@ -0,0 +1,10 @@
+def migrate(cr, version):
+    # The snapshots used to be trusted up to the fiscal year lock date,
+    # which lock exceptions can bypass: only keep the ones within the hard
+    # lock date of their company.
+    cr.execute("""
+        DELETE FROM account_report_snapshot snapshot
+        USING res_company company
+        WHERE snapshot.company_id = company.id
+            AND (company.hard_lock_date IS NULL OR snapshot.lock_date > company.hard_lock_date)
+    """)
@@ -1,3 +1,7 @@
 from . import account_account_type
 from . import account_financial_report
 from . import account_move_line
+from . import account_report_export
+from . import account_report_snapshot
+from . import ir_attachment
+from . import res_company
@@ -1,7 +1,30 @@
 import ast
+import itertools
 from odoo.osv import expression
 from odoo import api, models, fields
 
+# Suffix making the names of the server side cursors unique in a transaction
+_cursor_sequence = itertools.count()
+
+# Context keys _query_get builds its domain from
+QUERY_GET_CONTEXT_KEYS = (
+    'aged_balance', 'date_to', 'date_from', 'strict_range', 'initial_bal',
+    'journal_ids', 'state', 'company_id', 'allowed_company_ids',
+    'reconcile_date', 'account_tag_ids', 'account_ids', 'analytic_tag_ids',
+    'analytic_account_ids', 'partner_ids', 'partner_categories',
+)
+
+
+def _freeze(value):
+    """Returns a hashable version of a domain or context value."""
+    if isinstance(value, models.BaseModel):
+        return (value._name, tuple(value.ids))
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(val)) for key, val in value.items()))
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(val) for val in value)
+    return value
+
 
 class AccountMoveLine(models.Model):
     _inherit = "account.move.line"
@@ -47,12 +70,35 @@ class AccountMoveLine(models.Model):
 
     @api.model
     def _query_get(self, domain=None):
+        """Returns the tables, where clause and parameters filtering the
+        move lines on domain and on the report options of the context.
+
+        The result is cached for the duration of the cursor, keyed on the
+        domain, the options of the context, the user, the companies and the
+        record rules applied, so reports calling it for every journal or
+        report line only compile it once.
+        """
         self.check_access('read')
+        if not isinstance(domain, (list, tuple)):
+            domain = ast.literal_eval(domain) if domain else []
+        context = self.env.context
+        rules = None
+        if not self.env.su:
+            rules = str(self.env['ir.rule']._compute_domain(self._name, 'read'))
+        key = (
+            self.env.uid, self.env.su, self.env.company.id,
+            tuple(self.env.companies.ids), rules, _freeze(domain),
+            tuple((name, _freeze(context.get(name))) for name in QUERY_GET_CONTEXT_KEYS),
+        )
+        cache = self.env.cr.cache.setdefault('accounting_pdf_reports.query_get', {})
+        if key not in cache:
+            cache[key] = self._compile_query_get(list(domain))
+        tables, where_clause, where_clause_params = cache[key]
+        return tables, where_clause, list(where_clause_params)
 
+    @api.model
+    def _compile_query_get(self, domain):
         context = dict(self.env.context or {})
-        domain = domain or []
-        if not isinstance(domain, (list, tuple)):
-            domain = ast.literal_eval(domain)
 
         date_field = 'date'
         if context.get('aged_balance'):
@@ -115,3 +161,26 @@ class AccountMoveLine(models.Model):
             where_string, where_params = query.where_clause
             tables, where_clause, where_clause_params = from_string, where_string, from_params + where_params
         return tables, where_clause, where_clause_params
+
+    @api.model
+    def _iter_query_rows(self, query, params, batch_size=2000):
+        """Yields the rows of query as dictionaries, fetching them by batches
+        through a server side cursor, so the whole result is never loaded
+        in memory at once.
+
+        :param str query: the SQL query to run
+        :param params: the parameters of the query
+        :param int batch_size: number of rows fetched at once
+        """
+        cr = self.env.cr
+        cursor_name = 'report_rows_%s' % next(_cursor_sequence)
+        cr.execute('DECLARE %s NO SCROLL CURSOR FOR %s' % (cursor_name, query), params)
+        try:
+            while True:
+                cr.execute('FETCH %s FROM %s' % (batch_size, cursor_name))
+                rows = cr.dictfetchall()
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            cr.execute('CLOSE %s' % cursor_name)
@@ -0,0 +1,160 @@
+import csv
+import json
+import logging
+import os
+import tempfile
+
+import xlsxwriter
+
+from odoo import api, models, fields, _
+
+_logger = logging.getLogger(__name__)
+
+# Report models which can be exported, providing _get_export_rows
+EXPORT_REPORTS = [
+    ('report.accounting_pdf_reports.report_general_ledger', 'General Ledger'),
+    ('report.accounting_pdf_reports.report_partnerledger', 'Partner Ledger'),
+    ('report.accounting_pdf_reports.report_agedpartnerbalance', 'Aged Partner Balance'),
+]
+
+# Last row index allowed by the xlsx format, a new sheet is started after it
+XLSX_MAX_ROWS = 1048575
+
+
+class AccountReportExportMixin(models.AbstractModel):
+    """ Report written to a file in the background by a cron, then attached
+    to the export and posted to the requester. """
+    _name = "account.report.export.mixin"
+    _inherit = ['mail.thread']
+    _description = "Report Export"
+    _order = 'id desc'
+
+    # XML id of the cron generating the pending exports
+    _export_cron = None
+
+    name = fields.Char('Name', required=True, readonly=True)
+    state = fields.Selection([('pending', 'Pending'),
+                              ('done', 'Done'),
+                              ('failed', 'Failed')],
+                             string='Status', required=True,
+                             default='pending', readonly=True, tracking=True)
+    attachment_id = fields.Many2one('ir.attachment', string='File',
+                                    readonly=True, ondelete='set null')
+    error = fields.Text('Error', readonly=True)
+    user_id = fields.Many2one('res.users', string='Requested By', required=True,
+                              readonly=True, default=lambda self: self.env.user)
+    company_id = fields.Many2one('res.company', string='Company', required=True,
+                                 readonly=True, default=lambda self: self.env.company)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        exports = super().create(vals_list)
+        self.env.ref(self._export_cron)._trigger()
+        return exports
+
+    def _get_file_name(self):
+        raise NotImplementedError()
+
+    def _write_file(self, path):
+        """ Writes the report to the file at path, returning its mimetype. """
+        raise NotImplementedError()
+
+    def _generate_file(self):
+        """ Writes the report to a temporary file, then attaches the file to
+        the export and notifies the requester. """
+        self.ensure_one()
+        file_name = self._get_file_name()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, file_name)
+            mimetype = self._write_file(path)
+            attachment = self.env['ir.attachment']._create_from_file(path, {
+                'name': file_name,
+                'mimetype': mimetype,
+                'res_model': self._name,
+                'res_id': self.id,
+            })
+        self.write({'state': 'done', 'attachment_id': attachment.id, 'error': False})
+        self.message_post(
+            body=_("The export %s is ready.", self.name),
+            attachment_ids=attachment.ids,
+            partner_ids=self.user_id.partner_id.ids,
+        )
+
+    @api.model
+    def _cron_generate_exports(self):
+        for export in self.search([('state', '=', 'pending')], order='id'):
+            try:
+                export._generate_file()
+                self.env.cr.commit()
+            except Exception as e:
+                self.env.cr.rollback()
+                _logger.exception("Failed to generate the report export %s of %s", export.id, self._name)
+                export.write({'state': 'failed', 'error': str(e)})
+                self.env.cr.commit()
+
+    def action_retry(self):
+        self.write({'state': 'pending', 'error': False})
+        self.env.ref(self._export_cron)._trigger()
+
+
+class AccountReportExport(models.Model):
+    _name = "account.report.export"
+    _inherit = ['account.report.export.mixin']
+    _description = "Accounting Report Export"
+    _order = 'id desc'
+    _export_cron = 'accounting_pdf_reports.ir_cron_account_report_export'
+
+    report_name = fields.Selection(
+        EXPORT_REPORTS, 'Report', required=True, readonly=True,
+        help="Report model providing the rows.")
+    file_format = fields.Selection([('xlsx', 'XLSX'), ('csv', 'CSV')],
+                                   string='Format', required=True,
+                                   default='xlsx', readonly=True)
+    data = fields.Text('Report Data', readonly=True)
+
+    @api.model
+    def _export_cell(self, value):
+        if value is None or value is False:
+            return ''
+        if isinstance(value, (int, float, str)):
+            return value
+        return str(value)
+
+    def _write_xlsx(self, path, rows):
+        workbook = xlsxwriter.Workbook(path, {'constant_memory': True})
+        sheet_name = self.name[:28]
+        sheet = workbook.add_worksheet(sheet_name)
+        header = None
+        row_index = 0
+        for row in rows:
+            row = [self._export_cell(value) for value in row]
+            if header is None:
+                header = row
+            elif row_index > XLSX_MAX_ROWS:
+                sheet = workbook.add_worksheet('%s %s' % (sheet_name, len(workbook.worksheets()) + 1))
+                sheet.write_row(0, 0, header)
+                row_index = 1
+            sheet.write_row(row_index, 0, row)
+            row_index += 1
+        workbook.close()
+
+    def _write_csv(self, path, rows):
+        with open(path, 'w', newline='', encoding='utf-8') as csv_file:
+            writer = csv.writer(csv_file)
+            for row in rows:
+                writer.writerow([self._export_cell(value) for value in row])
+
+    def _get_file_name(self):
+        return '%s.%s' % (self.name, self.file_format)
+
+    def _write_file(self, path):
+        """ Writes the rows of the report to the file, row by row. """
+        data = json.loads(self.data)
+        report = self.env[self.report_name].with_user(self.user_id).with_company(
+            self.company_id).with_context(lang=self.user_id.lang)
+        rows = report._get_export_rows(data)
+        if self.file_format == 'xlsx':
+            self._write_xlsx(path, rows)
+            return 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        self._write_csv(path, rows)
+        return 'text/csv'
@@ -0,0 +1,149 @@
+import hashlib
+from odoo import api, fields, models
+from odoo.tools import sql
+from .account_move_line import QUERY_GET_CONTEXT_KEYS, _freeze
+
+# Company fields after which the move lines can no longer be modified. The
+# other lock dates can be bypassed by lock exceptions without the company
+# being written, only the hard lock date is irreversible.
+LOCK_DATE_FIELDS = ('hard_lock_date',)
+
+
+class AccountReportSnapshot(models.Model):
+    _name = "account.report.snapshot"
+    _description = "Accounting Report Snapshot"
+    _log_access = False
+
+    key = fields.Char('Key', required=True, readonly=True, index=True,
+                      help="Hash of the report options the amounts were computed with.")
+    company_id = fields.Many2one('res.company', 'Company', required=True, readonly=True,
+                                 index=True, ondelete='cascade')
+    lock_date = fields.Date('Lock Date', required=True, readonly=True,
+                            help="Lock date of the company when the amounts were computed, "
+                                 "the last date of the move lines they sum up.")
+    res_id = fields.Integer('Resource ID', readonly=True,
+                            help="ID of the account or tax the amounts belong to, 0 for the "
+                                 "row marking the snapshot as computed.")
+    debit = fields.Float('Debit', readonly=True)
+    credit = fields.Float('Credit', readonly=True)
+
+    def init(self):
+        sql.create_unique_index(self.env.cr, 'account_report_snapshot_key_res_uniq',
+                                self._table, ['key', 'res_id'])
+
+    @api.model
+    def _get_report_company(self):
+        """ Returns the company the move lines of _query_get belong to, or
+        None when they span several companies. """
+        context = self.env.context
+        if context.get('company_id'):
+            return self.env['res.company'].browse(context['company_id'])
+        if context.get('allowed_company_ids'):
+            return self.env.companies if len(self.env.companies) == 1 else None
+        return self.env.company
+
+    @api.model
+    def _get_lock_date(self, company):
+        """ Returns the date up to which the move lines of _query_get can no
+        longer change, or None when no snapshot can be used for them.
+
+        Only posted entries are locked, and the analytic distribution of the
+        lines can still be edited once they are, so the reports on all
+        entries or on analytic accounts are always computed live.
+        """
+        context = self.env.context
+        if (context.get('state') or '').lower() != 'posted' or context.get('aged_balance') \
+                or context.get('initial_bal') or context.get('reconcile_date') \
+                or context.get('analytic_account_ids'):
+            return None
+        if not company:
+            return None
+        lock_dates = [company[name] for name in LOCK_DATE_FIELDS if company[name]]
+        if not lock_dates:
+            return None
+        lock_date = max(lock_dates)
+        date_from = context.get('date_from')
+        if date_from and fields.Date.to_date(date_from) > lock_date:
+            return None
+        return lock_date
+
+    @api.model
+    def _get_key(self, kind, company, lock_date):
+        rules = None
+        if not self.env.su:
+            rules = str(self.env['ir.rule']._compute_domain('account.move.line', 'read'))
+        key = (
+            kind, company.id, fields.Date.to_string(lock_date), rules,
+            tuple((name, _freeze(self.env.context.get(name))) for name in QUERY_GET_CONTEXT_KEYS),
+        )
+        return hashlib.sha1(repr(key).encode()).hexdigest()
+
+    @api.model
+    def _get_amounts(self, kind, compute):
+        """ Returns the amounts of the move lines of _query_get, as a
+        dictionary {res_id: {'debit': debit, 'credit': credit}}.
+
+        The amounts of the lines dated up to the lock date of the company are
+        read from the snapshot of the report options, computed and stored on
+        the first call, so only the lines of the open period after the lock
+        date are read from account_move_line on the following ones.
+
+        :param kind: the kind of amounts, e.g. 'account' or 'tax', the
+            snapshots being shared between the reports of a same kind
+        :param compute: function called with a context and a domain,
+            returning the rows (res_id, debit, credit) of the move lines of
+            _query_get for them
+        """
+        company = self._get_report_company()
+        lock_date = self._get_lock_date(company)
+        amounts = {}
+
+        def add(rows):
+            for res_id, debit, credit in rows:
+                if not res_id:
+                    continue
+                res = amounts.setdefault(res_id, {'debit': 0.0, 'credit': 0.0})
+                res['debit'] += debit or 0.0
+                res['credit'] += credit or 0.0
+
+        if not lock_date:
+            add(compute(self.env.context, []))
+            return amounts
+
+        date_to = self.env.context.get('date_to')
+        context = dict(self.env.context)
+        if not date_to or fields.Date.to_date(date_to) > lock_date:
+            context['date_to'] = fields.Date.to_string(lock_date)
+            add(compute(self.env.context, [('date', '>', lock_date)]))
+        key = self.with_context(context)._get_key(kind, company, lock_date)
+        self.env.cr.execute("SELECT res_id, debit, credit FROM account_report_snapshot WHERE key = %s",
+                            (key,))
+        rows = self.env.cr.fetchall()
+        if not rows:
+            rows = [(res_id, debit or 0.0, credit or 0.0)
+                    for res_id, debit, credit in compute(context, []) if res_id]
+            # The row of res_id 0 marks the snapshot as computed, even when
+            # no line was found. Reports filling the same snapshot at once
+            # write the same amounts, so the conflicting rows are skipped.
+            values = [(key, company.id, lock_date, res_id, debit, credit)
+                      for res_id, debit, credit in rows + [(0, 0.0, 0.0)]]
+            self.env.cr.execute(
+                "INSERT INTO account_report_snapshot (key, company_id, lock_date, res_id, debit, credit) "
+                "VALUES " + ", ".join(["(%s, %s, %s, %s, %s, %s)"] * len(values)) +
+                " ON CONFLICT (key, res_id) DO NOTHING",
+                [value for row in values for value in row])
+        add(rows)
+        return amounts
+
+    @api.model
+    def _invalidate(self, companies, lock_dates):
+        """ Removes the snapshots of the companies summing up move lines
+        after their new lock date, which may be modified again.
+
+        :param lock_dates: dictionary {company: new lock date or None}
+        """
+        for company in companies:
+            self.env.cr.execute("""
+                DELETE FROM account_report_snapshot
+                WHERE company_id = %s AND (%s IS NULL OR lock_date > %s)
+            """, (company.id, lock_dates.get(company), lock_dates.get(company)))
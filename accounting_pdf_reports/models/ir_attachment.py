@@ -0,0 +1,48 @@
+import hashlib
+import os
+import shutil
+from odoo import api, models
+
+# Bytes read at once when copying a file into the filestore
+FILE_BLOCK_SIZE = 1024 * 1024
+
+
+class IrAttachment(models.Model):
+    _inherit = 'ir.attachment'
+
+    @api.model
+    def _create_from_file(self, path, vals):
+        """ Creates an attachment with the content of the file at path,
+        without loading the file in memory when the attachments are stored
+        in the local filestore: the file is hashed and copied there by
+        blocks, under the same name _file_write would give it.
+
+        With any other storage, the file is read at once and given to
+        create(), the memory used then growing with the size of the file.
+        """
+        if self._storage() != 'file':
+            with open(path, 'rb') as source:
+                return self.create(dict(vals, raw=source.read()))
+        checksum = hashlib.sha1()
+        with open(path, 'rb') as source:
+            for block in iter(lambda: source.read(FILE_BLOCK_SIZE), b''):
+                checksum.update(block)
+        checksum = checksum.hexdigest()
+        fname = checksum[:2] + '/' + checksum
+        full_path = self._full_path(fname)
+        if not os.path.isfile(full_path):
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            shutil.copyfile(path, full_path)
+            # removed by the garbage collection of the filestore if the
+            # transaction is rolled back
+            self._mark_for_gc(fname)
+        attachment = self.create(vals)
+        # create() and write() ignore these fields, only setting them from
+        # the content they are given
+        self.env.cr.execute("""
+            UPDATE ir_attachment
+            SET store_fname = %s, checksum = %s, file_size = %s, db_datas = NULL
+            WHERE id = %s
+        """, (fname, checksum, os.path.getsize(path), attachment.id))
+        attachment.invalidate_recordset(['store_fname', 'checksum', 'file_size', 'db_datas'])
+        return attachment
@@ -0,0 +1,26 @@
+from odoo import models
+from .account_report_snapshot import LOCK_DATE_FIELDS
+
+
+class ResCompany(models.Model):
+    _inherit = 'res.company'
+
+    def _get_report_lock_date(self):
+        self.ensure_one()
+        return max((self[name] for name in LOCK_DATE_FIELDS if self[name]), default=None)
+
+    def write(self, vals):
+        if not any(name in vals for name in LOCK_DATE_FIELDS):
+            return super().write(vals)
+        lock_dates = {company: company._get_report_lock_date() for company in self}
+        res = super().write(vals)
+        # Moving a lock date backward reopens the move lines after it, so
+        # the report snapshots summing them up can no longer be used
+        unlocked = self.filtered(
+            lambda company: lock_dates[company] and (
+                not company._get_report_lock_date()
+                or company._get_report_lock_date() < lock_dates[company]))
+        if unlocked:
+            self.env['account.report.snapshot']._invalidate(
+                unlocked, {company: company._get_report_lock_date() for company in unlocked})
+        return res
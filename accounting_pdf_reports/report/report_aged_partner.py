@@ -40,7 +40,7 @@ class ReportAgedPartnerBalance(models.AbstractModel):
             start = stop
 
         res = []
-        total = []
+        total = [0] * 7
         cr = self.env.cr
         user_company = self.env.user.company_id
         user_currency = user_company.currency_id
@@ -51,173 +51,121 @@ class ReportAgedPartnerBalance(models.AbstractModel):
 
         if target_move == 'posted':
             move_state = ['posted']
-        arg_list = (tuple(move_state), tuple(account_type))
 
-        reconciliation_clause = '(l.reconciled IS FALSE)'
-        cr.execute('SELECT debit_move_id, credit_move_id FROM account_partial_reconcile where max_date > %s', (date_from,))
-        reconciled_after_date = []
-        for row in cr.fetchall():
-            reconciled_after_date += [row[0], row[1]]
-        if reconciled_after_date:
-            reconciliation_clause = '(l.reconciled IS FALSE OR l.id IN %s)'
-            arg_list += (tuple(reconciled_after_date),)
-        arg_list += (date_from, tuple(company_ids))
-        query = '''
-            SELECT DISTINCT l.partner_id, UPPER(res_partner.name)
-            FROM account_move_line AS l left join res_partner on l.partner_id = res_partner.id, account_account, account_move am
-            WHERE (l.account_id = account_account.id)
-                AND (l.move_id = am.id)
-                AND (am.state IN %s)
-                AND (account_account.account_type IN %s)
-                AND ''' + reconciliation_clause + '''
-                AND (l.date <= %s)
-                AND l.company_id IN %s
-            ORDER BY UPPER(res_partner.name)'''
-        cr.execute(query, arg_list)
-        partners = cr.dictfetchall()
-        # put a total of 0
-        for i in range(7):
-            total.append(0)
-
-        # Build a string like (1,2,3) for easy use in SQL query
-        if not partner_ids:
-            partner_ids = [partner['partner_id'] for partner in partners if partner['partner_id']]
-        lines = dict((partner['partner_id'] or False, []) for partner in partners)
-        if not partner_ids:
-            return [], [], {}
-
-        # This dictionary will store the not due amount of all partners
-        undue_amounts = {}
-        query = '''SELECT l.id
-                FROM account_move_line AS l, account_account, account_move am
-                WHERE (l.account_id = account_account.id) AND (l.move_id = am.id)
-                    AND (am.state IN %s)
-                    AND (account_account.account_type IN %s)
-                    AND (COALESCE(l.date_maturity,l.date) >= %s)\
-                    AND ((l.partner_id IN %s) OR (l.partner_id IS NULL))
-                AND (l.date <= %s)
-                AND l.company_id IN %s'''
-        cr.execute(query, (tuple(move_state), tuple(account_type), date_from,
-                           tuple(partner_ids), date_from, tuple(company_ids)))
-        aml_ids = cr.fetchall()
-        aml_ids = aml_ids and [x[0] for x in aml_ids] or []
-        for line in self.env['account.move.line'].browse(aml_ids):
-            partner_id = line.partner_id.id or False
-            if partner_id not in undue_amounts:
-                undue_amounts[partner_id] = 0.0
-            line_amount = line.company_id.currency_id._convert(line.balance,
-                                                               user_currency,
-                                                               company, date)
-            if user_currency.is_zero(line_amount):
-                continue
-            for partial_line in line.matched_debit_ids:
-                if partial_line.max_date <= date_from:
-                    line_currency = partial_line.company_id.currency_id
-                    line_amount += line_currency._convert(partial_line.amount,
-                                                          user_currency,
-                                                          company, date)
-            for partial_line in line.matched_credit_ids:
-                if partial_line.max_date <= date_from:
-                    line_currency = partial_line.company_id.currency_id
-                    line_amount -= line_currency._convert(partial_line.amount,
-                                                          user_currency,
-                                                          company, date)
-            if not self.env.user.company_id.currency_id.is_zero(line_amount):
-                undue_amounts[partner_id] += line_amount
-                lines[partner_id].append({
-                    'line': line,
-                    'amount': line_amount,
-                    'period': 6,
-                })
-
-        # Use one query per period and store results in history (a list variable)
-        # Each history will contain: history[1] = {'<partner_id>': <partner_debit-credit>}
-        history = []
+        # Preload the rate converting the currency of each company to the
+        # currency of the user, the amounts are converted in the query
+        companies = self.env['res.company'].browse(company_ids)
+        rates = [
+            line_company.currency_id._get_conversion_rate(
+                line_company.currency_id, user_currency, company, date)
+            for line_company in companies
+        ]
+
+        # The amount of a line is its balance minus what was reconciled with
+        # it up to the date of the report, each amount being converted and
+        # rounded like _convert() does. A partner is listed as soon as one of
+        # its lines is unreconciled at the date of the report.
+        params = {
+            'move_state': tuple(move_state),
+            'account_type': tuple(account_type),
+            'date_from': date_from,
+            'company_ids': tuple(company_ids),
+            'rate_company_ids': companies.ids,
+            'rate_values': rates,
+            'digits': user_currency.decimal_places,
+        }
+        partner_clause = ''
+        if partner_ids:
+            params['partner_ids'] = tuple(partner_ids)
+            partner_clause = 'AND (l.partner_id IN %(partner_ids)s OR l.partner_id IS NULL)'
+        period_columns = []
         for i in range(5):
-            args_list = (tuple(move_state), tuple(account_type), tuple(partner_ids),)
-            dates_query = '(COALESCE(l.date_maturity,l.date)'
-
             if periods[str(i)]['start'] and periods[str(i)]['stop']:
-                dates_query += ' BETWEEN %s AND %s)'
-                args_list += (periods[str(i)]['start'], periods[str(i)]['stop'])
+                period_clause = 'maturity BETWEEN %%(start_%s)s AND %%(stop_%s)s' % (i, i)
             elif periods[str(i)]['start']:
-                dates_query += ' >= %s)'
-                args_list += (periods[str(i)]['start'],)
+                period_clause = 'maturity >= %%(start_%s)s' % i
             else:
-                dates_query += ' <= %s)'
-                args_list += (periods[str(i)]['stop'],)
-            args_list += (date_from, tuple(company_ids))
+                period_clause = 'maturity <= %%(stop_%s)s' % i
+            params['start_%s' % i] = periods[str(i)]['start']
+            params['stop_%s' % i] = periods[str(i)]['stop']
+            period_columns.append(
+                'COALESCE(SUM(amount) FILTER (WHERE %s), 0) AS period_%s' % (period_clause, i))
+        query = '''
+            WITH rate AS (
+                SELECT * FROM unnest(%(rate_company_ids)s::int[], %(rate_values)s::numeric[])
+                    AS rate(company_id, rate)
+            ), line_amount AS (
+                SELECT l.partner_id,
+                    COALESCE(l.date_maturity, l.date) AS maturity,
+                    (l.reconciled IS FALSE OR EXISTS (
+                        SELECT 1 FROM account_partial_reconcile p
+                        WHERE (p.debit_move_id = l.id OR p.credit_move_id = l.id)
+                            AND p.max_date > %(date_from)s
+                    )) AS unreconciled,
+                    ROUND(l.balance * rate.rate, %(digits)s)
+                    + COALESCE((
+                        SELECT SUM(ROUND(p.amount * rate.rate, %(digits)s))
+                        FROM account_partial_reconcile p
+                        WHERE p.credit_move_id = l.id AND p.max_date <= %(date_from)s
+                    ), 0)
+                    - COALESCE((
+                        SELECT SUM(ROUND(p.amount * rate.rate, %(digits)s))
+                        FROM account_partial_reconcile p
+                        WHERE p.debit_move_id = l.id AND p.max_date <= %(date_from)s
+                    ), 0) AS amount
+                FROM account_move_line AS l
+                JOIN account_move am ON (l.move_id = am.id)
+                JOIN account_account ON (l.account_id = account_account.id)
+                JOIN rate ON (rate.company_id = l.company_id)
+                WHERE (am.state IN %(move_state)s)
+                    AND (account_account.account_type IN %(account_type)s)
+                    AND (l.date <= %(date_from)s)
+                    AND l.company_id IN %(company_ids)s
+                    AND ROUND(l.balance * rate.rate, %(digits)s) != 0
+                    ''' + partner_clause + '''
+            )
+            SELECT line_amount.partner_id,
+                COALESCE(SUM(amount) FILTER (WHERE maturity >= %(date_from)s), 0) AS direction,
+                ''' + ',\n                '.join(period_columns) + ''',
+                COUNT(*) FILTER (WHERE amount != 0) AS line_count
+            FROM line_amount
+            LEFT JOIN res_partner ON (line_amount.partner_id = res_partner.id)
+            GROUP BY line_amount.partner_id, UPPER(res_partner.name)
+            HAVING BOOL_OR(unreconciled)
+            ORDER BY UPPER(res_partner.name)'''
+        cr.execute(query, params)
+        partners = cr.dictfetchall()
 
-            query = '''SELECT l.id
-                    FROM account_move_line AS l, account_account, account_move am
-                    WHERE (l.account_id = account_account.id) AND (l.move_id = am.id)
-                        AND (am.state IN %s)
-                        AND (account_account.account_type IN %s)
-                        AND ((l.partner_id IN %s) OR (l.partner_id IS NULL))
-                        AND ''' + dates_query + '''
-                    AND (l.date <= %s)
-                    AND l.company_id IN %s'''
-            cr.execute(query, args_list)
-            partners_amount = {}
-            aml_ids = cr.fetchall()
-            aml_ids = aml_ids and [x[0] for x in aml_ids] or []
-            for line in self.env['account.move.line'].browse(aml_ids):
-                partner_id = line.partner_id.id or False
-                if partner_id not in partners_amount:
-                    partners_amount[partner_id] = 0.0
-                line_currency_id = line.company_id.currency_id
-                line_amount = line_currency_id._convert(line.balance, user_currency, company, date)
-                if user_currency.is_zero(line_amount):
-                    continue
-                for partial_line in line.matched_debit_ids:
-                    if partial_line.max_date <= date_from:
-                        line_currency_id = partial_line.company_id.currency_id
-                        line_amount += line_currency_id._convert(
-                            partial_line.amount, user_currency, company, date)
-                for partial_line in line.matched_credit_ids:
-                    if partial_line.max_date <= date_from:
-                        line_currency_id = partial_line.company_id.currency_id
-                        line_amount -= line_currency_id._convert(
-                            partial_line.amount, user_currency, company, date)
-                if not self.env.user.company_id.currency_id.is_zero(line_amount):
-                    partners_amount[partner_id] += line_amount
-                    lines[partner_id].append({
-                        'line': line,
-                        'amount': line_amount,
-                        'period': i + 1,
-                        })
-            history.append(partners_amount)
+        # Number of lines of each partner still open at the date of the report
+        lines = dict((partner['partner_id'] or False, partner['line_count']) for partner in partners)
+        if not partners:
+            return [], [], {}
 
+        rounding = user_currency.rounding
+        browsed_partners = {browsed_partner.id: browsed_partner for browsed_partner in self.env['res.partner'].browse(
+            [partner['partner_id'] for partner in partners if partner['partner_id']])}
         for partner in partners:
             if partner['partner_id'] is None:
                 partner['partner_id'] = False
             at_least_one_amount = False
             values = {}
-            undue_amt = 0.0
-            if partner['partner_id'] in undue_amounts:  # Making sure this partner actually was found by the query
-                undue_amt = undue_amounts[partner['partner_id']]
-
-            total[6] = total[6] + undue_amt
-            values['direction'] = undue_amt
-            if not float_is_zero(values['direction'], precision_rounding=self.env.user.company_id.currency_id.rounding):
+            values['direction'] = float(partner['direction'])
+            total[6] = total[6] + values['direction']
+            if not float_is_zero(values['direction'], precision_rounding=rounding):
                 at_least_one_amount = True
 
             for i in range(5):
-                during = False
-                if partner['partner_id'] in history[i]:
-                    during = [history[i][partner['partner_id']]]
+                values[str(i)] = float(partner['period_%s' % i])
                 # Adding counter
-                total[(i)] = total[(i)] + (during and during[0] or 0)
-                values[str(i)] = during and during[0] or 0.0
-                if not float_is_zero(values[str(i)],
-                                     precision_rounding=self.env.user.company_id.currency_id.rounding):
+                total[(i)] = total[(i)] + values[str(i)]
+                if not float_is_zero(values[str(i)], precision_rounding=rounding):
                     at_least_one_amount = True
             values['total'] = sum([values['direction']] + [values[str(i)] for i in range(5)])
             ## Add for total
             total[(i + 1)] += values['total']
             values['partner_id'] = partner['partner_id']
             if partner['partner_id']:
-                browsed_partner = self.env['res.partner'].browse(partner['partner_id'])
+                browsed_partner = browsed_partners[partner['partner_id']]
                 values['name'] = browsed_partner.name and len(
                     browsed_partner.name) >= 45 and browsed_partner.name[
                                                     0:40] + '...' or browsed_partner.name
@@ -231,14 +179,7 @@ class ReportAgedPartnerBalance(models.AbstractModel):
 
         return res, total, lines
 
-    @api.model
-    def _get_report_values(self, docids, data=None):
-        if not data.get('form') or not self.env.context.get('active_model') or not self.env.context.get('active_id'):
-            raise UserError(_("Form content is missing, this report cannot be printed."))
-
-        model = self.env.context.get('active_model')
-        docs = self.env[model].browse(self.env.context.get('active_id'))
-
+    def _get_report_lines(self, data):
         target_move = data['form'].get('target_move', 'all')
         date_from = data['form'].get('date_from', time.strftime('%Y-%m-%d'))
 
@@ -252,6 +193,31 @@ class ReportAgedPartnerBalance(models.AbstractModel):
         movelines, total, dummy = self._get_partner_move_lines(
             account_type, partner_ids, date_from, target_move, data['form']['period_length']
         )
+        return movelines, total
+
+    @api.model
+    def _get_export_rows(self, data):
+        """
+        Yields the header, the account total then one row per partner, for
+        the XLSX/CSV export of the report, in the columns of the PDF.
+        """
+        movelines, total = self._get_report_lines(data)
+        form = data['form']
+        yield [_('Partners'), _('Not due')] + [form[str(i)]['name'] for i in range(5)[::-1]] + [_('Total')]
+        if movelines:
+            yield [_('Account Total'), total[6], total[4], total[3], total[2], total[1], total[0], total[5]]
+        for partner in movelines:
+            yield [partner['name'], partner['direction'], partner['4'], partner['3'],
+                   partner['2'], partner['1'], partner['0'], partner['total']]
+
+    @api.model
+    def _get_report_values(self, docids, data=None):
+        if not data.get('form') or not self.env.context.get('active_model') or not self.env.context.get('active_id'):
+            raise UserError(_("Form content is missing, this report cannot be printed."))
+
+        model = self.env.context.get('active_model')
+        docs = self.env[model].browse(self.env.context.get('active_id'))
+        movelines, total = self._get_report_lines(data)
         return {
             'doc_ids': self.ids,
             'doc_model': model,
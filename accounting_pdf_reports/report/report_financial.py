@@ -10,91 +10,146 @@ class ReportFinancial(models.AbstractModel):
     def _compute_account_balance(self, accounts):
         """ compute the balance, debit and credit for the provided accounts
         """
-        mapping = {
-            'balance': "COALESCE(SUM(debit),0) - COALESCE(SUM(credit), 0) as balance",
-            'debit': "COALESCE(SUM(debit), 0) as debit",
-            'credit': "COALESCE(SUM(credit), 0) as credit",
-        }
+        return self._compute_periods_account_balance(
+            accounts, [dict(self.env.context)])[0]
+
+    def _compute_periods_account_balance(self, accounts, contexts):
+        """ compute the balance, debit and credit for the provided accounts,
+        once for each of the contexts (e.g. the period of the report and
+        the comparison period), with a single grouped query using
+        conditional aggregation.
+        """
+        fields = ['credit', 'debit', 'balance']
+        results = [{account.id: dict.fromkeys(fields, 0.0) for account in accounts} for context in contexts]
+        if not accounts:
+            return results
+        MoveLine = self.env['account.move.line']
+        clauses = [MoveLine.with_context(context)._query_get() for context in contexts]
+        if len({tables for tables, where_clause, where_params in clauses}) > 1:
+            # the filters of the periods do not read the same tables
+            return [self._compute_periods_account_balance(accounts, [context])[0] for context in contexts]
+
+        tables = clauses[0][0] or "account_move_line"
+        columns = []
+        column_params = []
+        conditions = []
+        condition_params = []
+        for index, (tables_, where_clause, where_params) in enumerate(clauses):
+            condition = where_clause.strip() or 'TRUE'
+            for field in ('debit', 'credit'):
+                columns.append("COALESCE(SUM(" + field + ") FILTER (WHERE " + condition + "), 0) AS " + field + "_%s" % index)
+                column_params += where_params
+            conditions.append("(" + condition + ")")
+            condition_params += where_params
+        request = "SELECT account_id as id, " + ', '.join(columns) + \
+                  " FROM " + tables + \
+                  " WHERE account_id IN %s AND (" + " OR ".join(conditions) + ")" \
+                  " GROUP BY account_id"
+        params = tuple(column_params) + (tuple(accounts._ids),) + tuple(condition_params)
+        self.env.cr.execute(request, params)
+        for row in self.env.cr.dictfetchall():
+            for index, res in enumerate(results):
+                debit = row['debit_%s' % index]
+                credit = row['credit_%s' % index]
+                res[row['id']] = {'debit': debit, 'credit': credit, 'balance': debit - credit}
+        return results
 
+    def _get_reports_accounts(self, reports):
+        '''returns a dictionary with key=the ID of a record and value=the accounts
+           the record sums up, for the records of type 'accounts' and 'account_type'
+           among reports, their children and the reports they link to.'''
+        all_reports = self.env['account.financial.report']
+        todo = reports
+        while todo:
+            all_reports |= todo
+            todo = (todo.children_ids | todo.account_report_id) - all_reports
+
+        type_reports = all_reports.filtered(lambda report: report.type == 'account_type')
+        type_accounts = self.env['account.account']
+        if type_reports:
+            type_accounts = self.env['account.account'].search(
+                [('account_type', 'in', type_reports.account_type_ids.mapped('type'))])
         res = {}
-        for account in accounts:
-            res[account.id] = dict.fromkeys(mapping, 0.0)
-        if accounts:
-            tables, where_clause, where_params = self.env['account.move.line']._query_get()
-            tables = tables.replace('"', '') if tables else "account_move_line"
-            wheres = [""]
-            if where_clause.strip():
-                wheres.append(where_clause.strip())
-            filters = " AND ".join(wheres)
-            request = "SELECT account_id as id, " + ', '.join(mapping.values()) + \
-                       " FROM " + tables + \
-                       " WHERE account_id IN %s " \
-                            + filters + \
-                       " GROUP BY account_id"
-            params = (tuple(accounts._ids),) + tuple(where_params)
-            self.env.cr.execute(request, params)
-            for row in self.env.cr.dictfetchall():
-                res[row['id']] = row
+        for report in all_reports:
+            if report.type == 'accounts':
+                res[report.id] = report.account_ids
+            elif report.type == 'account_type':
+                account_types = report.account_type_ids.mapped('type')
+                res[report.id] = type_accounts.filtered(lambda account: account.account_type in account_types)
         return res
 
+    def _fold_report_balance(self, report, reports_accounts, accounts_balance, res):
+        if report.id in res:
+            return res[report.id]
+        fields = ['credit', 'debit', 'balance']
+        res[report.id] = dict((fn, 0.0) for fn in fields)
+        if report.type in ('accounts', 'account_type'):
+            # it's the sum of the linked accounts, or of the leaf accounts with such an account type
+            res[report.id]['account'] = {
+                account.id: dict(accounts_balance[account.id])
+                for account in reports_accounts[report.id]
+            }
+            for value in res[report.id]['account'].values():
+                for field in fields:
+                    res[report.id][field] += value.get(field)
+        elif report.type == 'account_report' and report.account_report_id:
+            # it's the amount of the linked report
+            value = self._fold_report_balance(report.account_report_id, reports_accounts, accounts_balance, res)
+            for field in fields:
+                res[report.id][field] += value[field]
+        elif report.type == 'sum':
+            # it's the sum of the children of this account.report
+            for child in report.children_ids:
+                value = self._fold_report_balance(child, reports_accounts, accounts_balance, res)
+                for field in fields:
+                    res[report.id][field] += value[field]
+        return res[report.id]
+
     def _compute_report_balance(self, reports):
         '''returns a dictionary with key=the ID of a record and value=the credit, debit and balance amount
-           computed for this record. If the record is of type :
-               'accounts' : it's the sum of the linked accounts
-               'account_type' : it's the sum of leaf accoutns with such an account_type
-               'account_report' : it's the amount of the related report
-               'sum' : it's the sum of the children of this record (aka a 'view' record)'''
-        res = {}
-        fields = ['credit', 'debit', 'balance']
-        for report in reports:
-            if report.id in res:
-                continue
-            res[report.id] = dict((fn, 0.0) for fn in fields)
-            if report.type == 'accounts':
-                # it's the sum of the linked accounts
-                res[report.id]['account'] = self._compute_account_balance(report.account_ids)
-                for value in res[report.id]['account'].values():
-                    for field in fields:
-                        res[report.id][field] += value.get(field)
-            elif report.type == 'account_type':
-                # it's the sum the leaf accounts with such an account type
-                accounts = self.env['account.account'].search(
-                    [('account_type', 'in', report.account_type_ids.mapped('type'))])
+           computed for this record. If the record is of type :
+               'accounts' : it's the sum of the linked accounts
+               'account_type' : it's the sum of leaf accoutns with such an account_type
+               'account_report' : it's the amount of the related report
+               'sum' : it's the sum of the children of this record (aka a 'view' record)'''
+        return self._compute_reports_balance(
+            reports, [dict(self.env.context)])[0]
 
-                res[report.id]['account'] = self._compute_account_balance(accounts)
-                for value in res[report.id]['account'].values():
-                    for field in fields:
-                        res[report.id][field] += value.get(field)
-            elif report.type == 'account_report' and report.account_report_id:
-                # it's the amount of the linked report
-                res2 = self._compute_report_balance(report.account_report_id)
-                for key, value in res2.items():
-                    for field in fields:
-                        res[report.id][field] += value[field]
-            elif report.type == 'sum':
-                # it's the sum of the children of this account.report
-                res2 = self._compute_report_balance(report.children_ids)
-                for key, value in res2.items():
-                    for field in fields:
-                        res[report.id][field] += value[field]
-        return res
+    def _compute_reports_balance(self, reports, contexts):
+        '''same as _compute_report_balance, once for each of the contexts. The
+           balances of all the accounts of the tree are read with one query for
+           all the contexts, then the tree is folded in memory.'''
+        reports_accounts = self._get_reports_accounts(reports)
+        accounts = self.env['account.account'].union(*reports_accounts.values())
+        results = []
+        for accounts_balance in self._compute_periods_account_balance(accounts, contexts):
+            res = {}
+            for report in reports:
+                self._fold_report_balance(report, reports_accounts, accounts_balance, res)
+            results.append(res)
+        return results
 
     def get_account_lines(self, data):
         lines = []
         account_report = self.env['account.financial.report'].search(
             [('id', '=', data['account_report_id'][0])])
         child_reports = account_report._get_children_by_order()
-        res = self.with_context(data.get('used_context'))._compute_report_balance(child_reports)
+        contexts = [data.get('used_context') or {}]
+        if data['enable_filter']:
+            contexts.append(data.get('comparison_context') or {})
+        results = self._compute_reports_balance(child_reports, contexts)
+        res = results[0]
         if data['enable_filter']:
-            comparison_res = self.with_context(
-                data.get('comparison_context'))._compute_report_balance(
-                child_reports)
+            comparison_res = results[1]
             for report_id, value in comparison_res.items():
                 res[report_id]['comp_bal'] = value['balance']
                 report_acc = res[report_id].get('account')
                 if report_acc:
                     for account_id, val in comparison_res[report_id].get('account').items():
                         report_acc[account_id]['comp_bal'] = val['balance']
+        accounts = self.env['account.account'].browse(
+            {account_id for value in res.values() for account_id in value.get('account', {})})
+        accounts = {account.id: account for account in accounts}
         for report in child_reports:
             vals = {
                 'name': report.name,
@@ -121,7 +176,7 @@ class ReportFinancial(models.AbstractModel):
                     #the COA + 1 (to avoid having them with a too low level that would conflicts with the level of data
                     #financial reports for Assets, liabilities...)
                     flag = False
-                    account = self.env['account.account'].browse(account_id)
+                    account = accounts[account_id]
                     vals = {
                         'name': account.code + ' ' + account.name,
                         'balance': value['balance'] * float(report.sign) or 0.0,
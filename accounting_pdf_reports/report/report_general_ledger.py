@@ -18,7 +18,7 @@ class ReportGeneralLedger(models.AbstractModel):
                 sortby: sorting by date or partner and journal
                 display_account: type of account(receivable, payable and both)
 
-        Returns a dictionary of accounts with following key and value {
+        Returns a list of dictionaries of accounts with following key and value {
                 'code': account code,
                 'name': account name,
                 'debit': sum of total debit amount,
@@ -28,9 +28,24 @@ class ReportGeneralLedger(models.AbstractModel):
                 'move_lines': list of move line
         }
         """
+        return list(self._iter_account_move_entry(
+            accounts, analytic_account_ids, partner_ids, init_balance,
+            sortby, display_account))
+
+    def _iter_account_move_entry(self, accounts, analytic_account_ids,
+                                 partner_ids, init_balance,
+                                 sortby, display_account):
+        """
+        Same as _get_account_move_entry, but yields the accounts one by one.
+        The move lines come ordered by account from a server side cursor,
+        with their running balance computed by the database, so only the
+        lines of the account being built are kept in memory.
+        """
+        if not accounts:
+            return
         cr = self.env.cr
         MoveLine = self.env['account.move.line']
-        move_lines = {x: [] for x in accounts.ids}
+        init_move_lines = {x: [] for x in accounts.ids}
 
         # Prepare initial sql query and Get the initial move lines
         if init_balance:
@@ -68,7 +83,7 @@ class ReportGeneralLedger(models.AbstractModel):
             params = (tuple(accounts.ids),) + tuple(init_where_params)
             cr.execute(sql, params)
             for row in cr.dictfetchall():
-                move_lines[row.pop('account_id')].append(row)
+                init_move_lines[row.pop('account_id')].append(row)
 
         sql_sort = 'l.date, l.move_id'
         if sortby == 'sort_journal_partner':
@@ -87,13 +102,16 @@ class ReportGeneralLedger(models.AbstractModel):
         filters = " AND ".join(wheres)
         filters = filters.replace('account_move_line__move_id', 'm').replace('account_move_line', 'l')
 
-        # Get move lines base on sql query and Calculate the total balance of move lines
+        # Get move lines base on sql query, ordered like the accounts, with
+        # the running balance of their account
         sql = ('''SELECT l.id AS lid, l.account_id AS account_id, 
             l.date AS ldate, j.code AS lcode, l.currency_id, 
             l.amount_currency, '' AS analytic_account_id,
             l.ref AS lref, l.name AS lname, COALESCE(l.debit,0) AS debit, 
             COALESCE(l.credit,0) AS credit, 
-            COALESCE(SUM(l.debit),0) - COALESCE(SUM(l.credit), 0) AS balance,\
+            SUM(COALESCE(l.debit,0) - COALESCE(l.credit,0)) OVER (
+                PARTITION BY l.account_id ORDER BY ''' + sql_sort + ''', l.id
+                ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW) AS balance,\
             m.name AS move_name, c.symbol AS currency_code, 
             p.name AS partner_name\
             FROM account_move_line l\
@@ -102,53 +120,41 @@ class ReportGeneralLedger(models.AbstractModel):
             LEFT JOIN res_partner p ON (l.partner_id=p.id)\
             JOIN account_journal j ON (l.journal_id=j.id)\
             JOIN account_account acc ON (l.account_id = acc.id) \
-            WHERE l.account_id IN %s ''' + filters + ''' GROUP BY l.id, 
-            l.account_id, l.date, j.code, l.currency_id, l.amount_currency, 
-            l.ref, l.name, m.name, c.symbol, p.name ORDER BY ''' + sql_sort)
-        params = (tuple(accounts.ids),) + tuple(where_params)
-        cr.execute(sql, params)
-
-        for row in cr.dictfetchall():
-            balance = 0
-            for line in move_lines.get(row['account_id']):
-                balance += line['debit'] - line['credit']
-            row['balance'] += balance
-            move_lines[row.pop('account_id')].append(row)
+            WHERE l.account_id IN %s ''' + filters + '''
+            ORDER BY array_position(%s::int[], l.account_id), ''' + sql_sort + ', l.id')
+        params = (tuple(accounts.ids),) + tuple(where_params) + (accounts.ids,)
+        rows = MoveLine._iter_query_rows(sql, params)
+        row = next(rows, None)
 
         # Calculate the debit, credit and balance for Accounts
-        account_res = []
         for account in accounts:
             currency = account.currency_id and account.currency_id or self.env.company.currency_id
             res = dict((fn, 0.0) for fn in ['credit', 'debit', 'balance'])
             res['code'] = account.code
             res['name'] = account.name
-            res['move_lines'] = move_lines[account.id]
+            res['move_lines'] = init_move_lines[account.id]
+            initial_balance = sum(line['debit'] - line['credit'] for line in res['move_lines'])
+            while row is not None and row['account_id'] == account.id:
+                row.pop('account_id')
+                row['balance'] += initial_balance
+                res['move_lines'].append(row)
+                row = next(rows, None)
             for line in res.get('move_lines'):
                 res['debit'] += line['debit']
                 res['credit'] += line['credit']
                 res['balance'] = line['balance']
             if display_account == 'all':
-                account_res.append(res)
+                yield res
             if display_account == 'movement' and res.get('move_lines'):
-                account_res.append(res)
+                yield res
             if display_account == 'not_zero' and not currency.is_zero(res['balance']):
-                account_res.append(res)
-        return account_res
+                yield res
 
-    @api.model
-    def _get_report_values(self, docids, data=None):
-        if not data.get('form') or not self.env.context.get('active_model'):
-            raise UserError(_("Form content is missing, this report cannot be printed."))
-        model = self.env.context.get('active_model')
-        docs = self.env[model].browse(self.env.context.get('active_ids', []))
-        init_balance = data['form'].get('initial_balance', True)
-        sortby = data['form'].get('sortby', 'sort_date')
-        display_account = data['form']['display_account']
-        codes = []
-        if data['form'].get('journal_ids', False):
-            codes = [journal.code for journal in
-                     self.env['account.journal'].search(
-                         [('id', 'in', data['form']['journal_ids'])])]
+    def _get_report_filters(self, data, model, docs):
+        """
+        Returns the analytic accounts, the partners and the accounts
+        selected in the wizard, or the accounts the report was called on.
+        """
         analytic_account_ids = False
         if data['form'].get('analytic_account_ids', False):
             analytic_account_ids = self.env['account.analytic.account'].search(
@@ -164,8 +170,54 @@ class ReportGeneralLedger(models.AbstractModel):
             if data['form'].get('account_ids', False):
                 domain.append(('id', 'in', data['form']['account_ids']))
             accounts = self.env['account.account'].search(domain)
+        return analytic_account_ids, partner_ids, accounts
+
+    @api.model
+    def _get_export_rows(self, data):
+        """
+        Yields the header then one row per move line, for the streaming
+        XLSX/CSV export of the report.
+        """
+        model = data['model']
+        docs = self.env[model].browse(data.get('ids', []))
+        analytic_account_ids, partner_ids, accounts = self._get_report_filters(data, model, docs)
+        accounts_res = self.with_context(
+            data['form'].get('used_context', {}))._iter_account_move_entry(
+            accounts,
+            analytic_account_ids,
+            partner_ids,
+            data['form'].get('initial_balance', True),
+            data['form'].get('sortby', 'sort_date'),
+            data['form']['display_account'])
+        yield [_('Account'), _('Date'), _('JRNL'), _('Partner'), _('Ref'),
+               _('Move'), _('Entry Label'), _('Debit'), _('Credit'),
+               _('Balance'), _('Currency Amount'), _('Currency')]
+        for account in accounts_res:
+            account_name = '%s %s' % (account['code'], account['name'])
+            for line in account['move_lines']:
+                yield [account_name, line['ldate'], line['lcode'],
+                       line['partner_name'], line['lref'], line['move_name'],
+                       line['lname'], line['debit'], line['credit'],
+                       line['balance'], line['amount_currency'],
+                       line['currency_code']]
+
+    @api.model
+    def _get_report_values(self, docids, data=None):
+        if not data.get('form') or not self.env.context.get('active_model'):
+            raise UserError(_("Form content is missing, this report cannot be printed."))
+        model = self.env.context.get('active_model')
+        docs = self.env[model].browse(self.env.context.get('active_ids', []))
+        init_balance = data['form'].get('initial_balance', True)
+        sortby = data['form'].get('sortby', 'sort_date')
+        display_account = data['form']['display_account']
+        codes = []
+        if data['form'].get('journal_ids', False):
+            codes = [journal.code for journal in
+                     self.env['account.journal'].search(
+                         [('id', 'in', data['form']['journal_ids'])])]
+        analytic_account_ids, partner_ids, accounts = self._get_report_filters(data, model, docs)
         accounts_res = self.with_context(
-            data['form'].get('used_context', {}))._get_account_move_entry(
+            data['form'].get('used_context', {}))._iter_account_move_entry(
             accounts,
             analytic_account_ids,
             partner_ids,
@@ -7,89 +7,142 @@ class ReportJournal(models.AbstractModel):
     _name = 'report.accounting_pdf_reports.report_journal'
     _description = 'Journal Audit Report'
 
+    def _get_move_state(self, target_move):
+        if target_move == 'posted':
+            return ['posted']
+        return ['draft', 'posted']
+
     def lines(self, target_move, journal_ids, sort_selection, data):
         if isinstance(journal_ids, int):
             journal_ids = [journal_ids]
-
-        move_state = ['draft', 'posted']
-        if target_move == 'posted':
-            move_state = ['posted']
-
+        return self.env['account.move.line'].browse(
+            line['id'] for lines in self._get_journal_lines(
+                target_move, journal_ids, sort_selection, data).values()
+            for line in lines)
+
+    def _get_journal_lines(self, target_move, journal_ids, sort_selection, data):
+        """
+        Returns a dictionary with key=the ID of a journal and value=the
+        list of its move lines, as dictionaries holding the columns the
+        report displays, all read in one query.
+        """
         query_get_clause = self._get_query_get_clause(data)
-        params = [tuple(move_state), tuple(journal_ids)] + query_get_clause[2]
-        query = 'SELECT "account_move_line".id FROM ' + query_get_clause[0] + ', account_move am, account_account acc WHERE "account_move_line".account_id = acc.id AND "account_move_line".move_id=am.id AND am.state IN %s AND "account_move_line".journal_id IN %s AND ' + query_get_clause[1] + ' ORDER BY '
+        params = [tuple(self._get_move_state(target_move)), tuple(journal_ids)] + query_get_clause[2]
+        query = '''
+            SELECT "account_move_line".id, "account_move_line".journal_id,
+                "account_move_line".date, "account_move_line".account_id,
+                "account_move_line".name, "account_move_line".debit,
+                "account_move_line".credit, "account_move_line".amount_currency,
+                "account_move_line".currency_id, am.id AS move_id, am.name AS move_name,
+                (SELECT p.name FROM res_partner p WHERE p.id = "account_move_line".partner_id) AS partner_name
+            FROM ''' + query_get_clause[0] + ''', account_move am, account_account acc
+            WHERE "account_move_line".account_id = acc.id
+                AND "account_move_line".move_id = am.id
+                AND am.state IN %s
+                AND "account_move_line".journal_id IN %s
+                AND ''' + query_get_clause[1] + '''
+            ORDER BY "account_move_line".journal_id, '''
         if sort_selection == 'date':
             query += '"account_move_line".date'
         else:
             query += 'am.name'
         query += ', "account_move_line".move_id'
         self.env.cr.execute(query, tuple(params))
-        ids = (x[0] for x in self.env.cr.fetchall())
-        return self.env['account.move.line'].browse(ids)
-
-    def _sum_debit(self, data, journal_id):
-        move_state = ['draft', 'posted']
-        if data['form'].get('target_move', 'all') == 'posted':
-            move_state = ['posted']
-
-        query_get_clause = self._get_query_get_clause(data)
-        params = [tuple(move_state), tuple(journal_id.ids)] + query_get_clause[2]
-        self.env.cr.execute('SELECT SUM(debit) FROM ' + query_get_clause[0] + ', account_move am '
-                        'WHERE "account_move_line".move_id=am.id AND am.state IN %s AND "account_move_line".journal_id IN %s AND ' + query_get_clause[1] + ' ',
-                        tuple(params))
-        return self.env.cr.fetchone()[0] or 0.0
-
-    def _sum_credit(self, data, journal_id):
-        move_state = ['draft', 'posted']
-        if data['form'].get('target_move', 'all') == 'posted':
-            move_state = ['posted']
+        rows = self.env.cr.dictfetchall()
+
+        accounts = self.env['account.account'].browse({row['account_id'] for row in rows})
+        account_codes = {account.id: account.code for account in accounts}
+        currencies = self.env['res.currency'].browse({row['currency_id'] for row in rows if row['currency_id']})
+        currencies = {currency.id: currency for currency in currencies}
+        res = {journal_id: [] for journal_id in journal_ids}
+        for row in rows:
+            row['account_code'] = account_codes[row['account_id']]
+            row['currency_id'] = currencies.get(row['currency_id'], self.env['res.currency'])
+            res[row['journal_id']].append(row)
+        return res
 
+    def _get_journal_totals(self, data, journal_ids):
+        """
+        Returns a dictionary with key=the ID of a journal and value={
+            'debit': sum of the debit of its move lines,
+            'credit': sum of the credit of its move lines,
+        }
+        """
+        move_state = self._get_move_state(data['form'].get('target_move', 'all'))
         query_get_clause = self._get_query_get_clause(data)
-        params = [tuple(move_state), tuple(journal_id.ids)] + query_get_clause[2]
-        self.env.cr.execute('SELECT SUM(credit) FROM ' + query_get_clause[0] + ', account_move am '
-                        'WHERE "account_move_line".move_id=am.id AND am.state IN %s AND "account_move_line".journal_id IN %s AND ' + query_get_clause[1] + ' ',
+        params = [tuple(move_state), tuple(journal_ids)] + query_get_clause[2]
+        self.env.cr.execute('SELECT "account_move_line".journal_id, SUM(debit), SUM(credit) FROM ' + query_get_clause[0] + ', account_move am '
+                        'WHERE "account_move_line".move_id=am.id AND am.state IN %s AND "account_move_line".journal_id IN %s AND ' + query_get_clause[1] + ' '
+                        'GROUP BY "account_move_line".journal_id',
                         tuple(params))
-        return self.env.cr.fetchone()[0] or 0.0
-
-    def _get_taxes(self, data, journal_id):
-        move_state = ['draft', 'posted']
-        if data['form'].get('target_move', 'all') == 'posted':
-            move_state = ['posted']
+        res = {journal_id: {'debit': 0.0, 'credit': 0.0} for journal_id in journal_ids}
+        for journal_id, debit, credit in self.env.cr.fetchall():
+            res[journal_id] = {'debit': debit or 0.0, 'credit': credit or 0.0}
+        return res
 
+    def _get_journal_taxes(self, data, journals):
+        """
+        Returns a dictionary with key=the ID of a journal and value=the
+        result of _get_taxes for it, the base and tax amounts of all the
+        journals coming from a single grouped query.
+        """
+        move_state = self._get_move_state(data['form'].get('target_move', 'all'))
         query_get_clause = self._get_query_get_clause(data)
-        params = [tuple(move_state), tuple(journal_id.ids)] + query_get_clause[2]
-        query = """
-            SELECT rel.account_tax_id, SUM("account_move_line".balance) AS base_amount
-            FROM account_move_line_account_tax_rel rel, """ + query_get_clause[0] + """ 
+        params = [tuple(move_state), tuple(journals.ids)] + query_get_clause[2]
+        lines_query = """
+            SELECT "account_move_line".id, "account_move_line".journal_id,
+                "account_move_line".balance, "account_move_line".debit,
+                "account_move_line".credit, "account_move_line".tax_line_id
+            FROM """ + query_get_clause[0] + """
             LEFT JOIN account_move am ON "account_move_line".move_id = am.id
-            WHERE "account_move_line".id = rel.account_move_line_id
-                AND am.state IN %s
+            WHERE am.state IN %s
                 AND "account_move_line".journal_id IN %s
-                AND """ + query_get_clause[1] + """
-           GROUP BY rel.account_tax_id"""
+                AND """ + query_get_clause[1]
+        # The taxes of a journal are the ones of its base lines, their tax
+        # amount being the balance of its tax lines
+        query = """
+            WITH journal_line AS (""" + lines_query + """)
+            SELECT journal_id, tax_id, SUM(base_amount), SUM(tax_amount)
+            FROM (
+                SELECT l.journal_id, rel.account_tax_id AS tax_id,
+                    l.balance AS base_amount, 0.0 AS tax_amount, TRUE AS is_base
+                FROM journal_line l
+                JOIN account_move_line_account_tax_rel rel ON (l.id = rel.account_move_line_id)
+                UNION ALL
+                SELECT l.journal_id, l.tax_line_id, 0.0, l.debit - l.credit, FALSE
+                FROM journal_line l
+                WHERE l.tax_line_id IS NOT NULL
+            ) AS journal_tax
+            GROUP BY journal_id, tax_id
+            HAVING BOOL_OR(is_base)"""
         self.env.cr.execute(query, tuple(params))
-        ids = []
-        base_amounts = {}
-        for row in self.env.cr.fetchall():
-            ids.append(row[0])
-            base_amounts[row[0]] = row[1]
-
-
-        res = {}
-        for tax in self.env['account.tax'].browse(ids):
-            self.env.cr.execute('SELECT sum(debit - credit) FROM ' + query_get_clause[0] + ', account_move am '
-                'WHERE "account_move_line".move_id=am.id AND am.state IN %s AND "account_move_line".journal_id IN %s AND ' + query_get_clause[1] + ' AND tax_line_id = %s',
-                tuple(params + [tax.id]))
-            res[tax] = {
-                'base_amount': base_amounts[tax.id],
-                'tax_amount': self.env.cr.fetchone()[0] or 0.0,
+        rows = self.env.cr.fetchall()
+
+        taxes = self.env['account.tax'].browse({row[1] for row in rows})
+        taxes = {tax.id: tax for tax in taxes}
+        res = {journal.id: {} for journal in journals}
+        for journal_id, tax_id, base_amount, tax_amount in rows:
+            res[journal_id][taxes[tax_id]] = {
+                'base_amount': base_amount,
+                'tax_amount': tax_amount or 0.0,
             }
-            if journal_id.type == 'sale':
+        for journal in journals:
+            if journal.type == 'sale':
                 #sales operation are credits
-                res[tax]['base_amount'] = res[tax]['base_amount'] * -1
-                res[tax]['tax_amount'] = res[tax]['tax_amount'] * -1
+                for amounts in res[journal.id].values():
+                    amounts['base_amount'] = amounts['base_amount'] * -1
+                    amounts['tax_amount'] = amounts['tax_amount'] * -1
         return res
 
+    def _sum_debit(self, data, journal_id):
+        return self._get_journal_totals(data, journal_id.ids)[journal_id.id]['debit']
+
+    def _sum_credit(self, data, journal_id):
+        return self._get_journal_totals(data, journal_id.ids)[journal_id.id]['credit']
+
+    def _get_taxes(self, data, journal_id):
+        return self._get_journal_taxes(data, journal_id)[journal_id.id]
+
     def _get_query_get_clause(self, data):
         return self.env['account.move.line'].with_context(data['form'].get('used_context', {}))._query_get()
 
@@ -100,18 +153,20 @@ class ReportJournal(models.AbstractModel):
 
         target_move = data['form'].get('target_move', 'all')
         sort_selection = data['form'].get('sort_selection', 'date')
+        journals = self.env['account.journal'].browse(data['form']['journal_ids'])
 
-        res = {}
-        for journal in data['form']['journal_ids']:
-            res[journal] = self.with_context(data['form'].get('used_context', {})).lines(target_move, journal, sort_selection, data)
+        res = self.with_context(data['form'].get('used_context', {}))._get_journal_lines(
+            target_move, journals.ids, sort_selection, data)
+        totals = self._get_journal_totals(data, journals.ids)
+        taxes = self._get_journal_taxes(data, journals)
         return {
             'doc_ids': data['form']['journal_ids'],
             'doc_model': self.env['account.journal'],
             'data': data,
-            'docs': self.env['account.journal'].browse(data['form']['journal_ids']),
+            'docs': journals,
             'time': time,
             'lines': res,
-            'sum_credit': self._sum_credit,
-            'sum_debit': self._sum_debit,
-            'get_taxes': self._get_taxes,
+            'sum_credit': lambda data, journal: totals[journal.id]['credit'],
+            'sum_debit': lambda data, journal: totals[journal.id]['debit'],
+            'get_taxes': lambda data, journal: taxes[journal.id],
         }
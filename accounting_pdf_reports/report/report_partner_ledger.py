@@ -8,40 +8,64 @@ class ReportPartnerLedger(models.AbstractModel):
     _description = 'Partner Ledger Report'
 
     def _lines(self, data, partner):
-        full_account = []
+        for partner_lines in self._iter_partners_lines(data, partner):
+            return partner_lines['lines']
+        return []
+
+    def _iter_partners_lines(self, data, partners):
+        """
+        Yields, for each of the partners in order, a dictionary {
+            'partner': the partner,
+            'debit': sum of the debit of its move lines,
+            'credit': sum of the credit of its move lines,
+            'balance': its balance,
+            'lines': its move lines, with their progressive balance,
+        }
+        The move lines of all the partners come from a single query ordered
+        by partner, their progressive balance being computed by the database.
+        """
+        if not partners:
+            return
+        MoveLine = self.env['account.move.line']
         currency = self.env['res.currency']
-        query_get_data = self.env['account.move.line'].with_context(data['form'].get('used_context', {}))._query_get()
+        currencies = {}
+        query_get_data = MoveLine.with_context(data['form'].get('used_context', {}))._query_get()
         reconcile_clause = "" if data['form']['reconciled'] else ' AND "account_move_line".full_reconcile_id IS NULL '
-        params = [partner.id, tuple(data['computed']['move_state']), tuple(data['computed']['account_ids'])] + query_get_data[2]
+        partner_ids = [partner.id for partner in partners]
+        params = [tuple(partner_ids), tuple(data['computed']['move_state']), tuple(data['computed']['account_ids'])] + query_get_data[2] + [partner_ids]
         query = """
-            SELECT "account_move_line".id, "account_move_line".date, j.code, acc.name->>'en_US' as a_name, "account_move_line".ref, m.name as move_name, "account_move_line".name, "account_move_line".debit, "account_move_line".credit, "account_move_line".amount_currency,"account_move_line".currency_id, c.symbol AS currency_code
+            SELECT "account_move_line".id, "account_move_line".partner_id, "account_move_line".date, j.code, acc.name->>'en_US' as a_name, "account_move_line".ref, m.name as move_name, "account_move_line".name, "account_move_line".debit, "account_move_line".credit, "account_move_line".amount_currency,"account_move_line".currency_id, c.symbol AS currency_code,
+                SUM("account_move_line".debit - "account_move_line".credit) OVER (
+                    PARTITION BY "account_move_line".partner_id
+                    ORDER BY "account_move_line".date, "account_move_line".id
+                    ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW) AS progress
             FROM """ + query_get_data[0] + """
             LEFT JOIN account_journal j ON ("account_move_line".journal_id = j.id)
             LEFT JOIN account_account acc ON ("account_move_line".account_id = acc.id)
             LEFT JOIN res_currency c ON ("account_move_line".currency_id=c.id)
             LEFT JOIN account_move m ON (m.id="account_move_line".move_id)
-            WHERE "account_move_line".partner_id = %s
+            WHERE "account_move_line".partner_id IN %s
                 AND m.state IN %s
                 AND "account_move_line".account_id IN %s AND """ + query_get_data[1] + reconcile_clause + """
-                ORDER BY "account_move_line".date"""
-        self.env.cr.execute(query, tuple(params))
-        res = self.env.cr.dictfetchall()
-        sum = 0.0
-        lang_code = self.env.context.get('lang') or 'en_US'
-        lang = self.env['res.lang']
-        lang_id = lang._lang_get(lang_code)
-        date_format = lang_id.date_format
-        for r in res:
-            r['date'] = r['date']
-            r['displayed_name'] = '-'.join(
-                r[field_name] for field_name in ('move_name', 'ref', 'name')
-                if r[field_name] not in (None, '', '/')
-            )
-            sum += r['debit'] - r['credit']
-            r['progress'] = sum
-            r['currency_id'] = currency.browse(r.get('currency_id'))
-            full_account.append(r)
-        return full_account
+                ORDER BY array_position(%s::int[], "account_move_line".partner_id), "account_move_line".date, "account_move_line".id"""
+        rows = MoveLine._iter_query_rows(query, tuple(params))
+        row = next(rows, None)
+        for partner in partners:
+            res = {'partner': partner, 'debit': 0.0, 'credit': 0.0, 'balance': 0.0, 'lines': []}
+            while row is not None and row['partner_id'] == partner.id:
+                row['displayed_name'] = '-'.join(
+                    row[field_name] for field_name in ('move_name', 'ref', 'name')
+                    if row[field_name] not in (None, '', '/')
+                )
+                if row['currency_id'] not in currencies:
+                    currencies[row['currency_id']] = currency.browse(row['currency_id'])
+                row['currency_id'] = currencies[row['currency_id']]
+                res['debit'] += row['debit']
+                res['credit'] += row['credit']
+                res['balance'] = row['progress']
+                res['lines'].append(row)
+                row = next(rows, None)
+            yield res
 
     def _sum_partner(self, data, partner, field):
         if field not in ['debit', 'credit', 'debit - credit']:
@@ -65,10 +89,7 @@ class ReportPartnerLedger(models.AbstractModel):
             result = contemp[0] or 0.0
         return result
 
-    @api.model
-    def _get_report_values(self, docids, data=None):
-        if not data.get('form'):
-            raise UserError(_("Form content is missing, this report cannot be printed."))
+    def _get_report_partners(self, data):
         data['computed'] = {}
 
         obj_partner = self.env['res.partner']
@@ -109,7 +130,33 @@ class ReportPartnerLedger(models.AbstractModel):
             partner_ids = [res['partner_id'] for res in
                            self.env.cr.dictfetchall()]
         partners = obj_partner.browse(partner_ids)
-        partners = sorted(partners, key=lambda x: (x.ref or '', x.name or ''))
+        return sorted(partners, key=lambda x: (x.ref or '', x.name or ''))
+
+    @api.model
+    def _get_export_rows(self, data):
+        """
+        Yields the header then one row per move line, partner by partner,
+        for the streaming XLSX/CSV export of the report.
+        """
+        partners = self._get_report_partners(data)
+        yield [_('Partner'), _('Date'), _('JRNL'), _('Account'), _('Ref'),
+               _('Debit'), _('Credit'), _('Balance'), _('Currency Amount'),
+               _('Currency')]
+        for partner_lines in self._iter_partners_lines(data, partners):
+            partner = partner_lines['partner']
+            partner_name = partner.ref and '%s - %s' % (partner.ref, partner.name) or partner.name
+            for line in partner_lines['lines']:
+                yield [partner_name, line['date'], line['code'], line['a_name'],
+                       line['displayed_name'], line['debit'], line['credit'],
+                       line['progress'], line['amount_currency'],
+                       line['currency_code']]
+
+    @api.model
+    def _get_report_values(self, docids, data=None):
+        if not data.get('form'):
+            raise UserError(_("Form content is missing, this report cannot be printed."))
+        partners = self._get_report_partners(data)
+        partner_ids = [partner.id for partner in partners]
 
         return {
             'doc_ids': partner_ids,
@@ -117,6 +164,7 @@ class ReportPartnerLedger(models.AbstractModel):
             'data': data,
             'docs': partners,
             'time': time,
+            'partner_lines': self._iter_partners_lines(data, partners),
             'lines': self._lines,
             'sum_partner': self._sum_partner,
         }
@@ -16,38 +16,43 @@ class ReportTax(models.AbstractModel):
         }
 
     def _sql_from_amls_one(self):
-        sql = """SELECT "account_move_line".tax_line_id, COALESCE(SUM("account_move_line".debit-"account_move_line".credit), 0)
+        sql = """SELECT "account_move_line".tax_line_id, SUM("account_move_line".debit), SUM("account_move_line".credit)
                     FROM %s
                     WHERE %s GROUP BY "account_move_line".tax_line_id"""
         return sql
 
     def _sql_from_amls_two(self):
-        sql = """SELECT r.account_tax_id, COALESCE(SUM("account_move_line".debit-"account_move_line".credit), 0)
+        sql = """SELECT r.account_tax_id, SUM("account_move_line".debit), SUM("account_move_line".credit)
                  FROM %s
                  INNER JOIN account_move_line_account_tax_rel r ON ("account_move_line".id = r.account_move_line_id)
                  INNER JOIN account_tax t ON (r.account_tax_id = t.id)
                  WHERE %s GROUP BY r.account_tax_id"""
         return sql
 
+    def _get_tax_rows(self, sql, domain=None):
+        tables, where_clause, where_params = self.env['account.move.line']._query_get(domain)
+        query = sql % (tables, where_clause)
+        self.env.cr.execute(query, where_params)
+        return self.env.cr.fetchall()
+
     def _compute_from_amls(self, options, taxes):
+        # The closed periods are read from the snapshots of the tax report
+        Snapshot = self.env['account.report.snapshot']
         #compute the tax amount
         sql = self._sql_from_amls_one()
-        tables, where_clause, where_params = self.env['account.move.line']._query_get()
-        query = sql % (tables, where_clause)
-        self.env.cr.execute(query, where_params)
-        results = self.env.cr.fetchall()
-        for result in results:
-            if result[0] in taxes:
-                taxes[result[0]]['tax'] = abs(result[1])
+        results = Snapshot._get_amounts(
+            'tax', lambda context, domain: self.with_context(context)._get_tax_rows(sql, domain))
+        for tax_id, amounts in results.items():
+            if tax_id in taxes:
+                taxes[tax_id]['tax'] = abs(amounts['debit'] - amounts['credit'])
 
         #compute the net amount
         sql2 = self._sql_from_amls_two()
-        query = sql2 % (tables, where_clause)
-        self.env.cr.execute(query, where_params)
-        results = self.env.cr.fetchall()
-        for result in results:
-            if result[0] in taxes:
-                taxes[result[0]]['net'] = abs(result[1])
+        results = Snapshot._get_amounts(
+            'tax_base', lambda context, domain: self.with_context(context)._get_tax_rows(sql2, domain))
+        for tax_id, amounts in results.items():
+            if tax_id in taxes:
+                taxes[tax_id]['net'] = abs(amounts['debit'] - amounts['credit'])
 
     @api.model
     def get_lines(self, options):
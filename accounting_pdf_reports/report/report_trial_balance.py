@@ -7,6 +7,22 @@ class ReportTrialBalance(models.AbstractModel):
     _name = 'report.accounting_pdf_reports.report_trialbalance'
     _description = 'Trial Balance Report'
 
+    def _get_account_rows(self, domain=None):
+        """ Returns the rows (account_id, debit, credit) of the move lines
+        of _query_get, grouped by account. """
+        tables, where_clause, where_params = self.env['account.move.line']._query_get(domain)
+        tables = tables.replace('"','')
+        if not tables:
+            tables = 'account_move_line'
+        wheres = [""]
+        if where_clause.strip():
+            wheres.append(where_clause.strip())
+        filters = " AND ".join(wheres)
+        request = ("SELECT account_id, SUM(debit), SUM(credit)" +\
+                   " FROM " + tables + " WHERE account_id IS NOT NULL " + filters + " GROUP BY account_id")
+        self.env.cr.execute(request, tuple(where_params))
+        return self.env.cr.fetchall()
+
     def _get_accounts(self, accounts, display_account):
         """ compute the balance, debit and credit for the provided accounts
             :Arguments:
@@ -20,24 +36,10 @@ class ReportTrialBalance(models.AbstractModel):
                 `balance`: total amount of balance,
         """
 
-        account_result = {}
-        # Prepare sql query base on selected parameters from wizard
-        tables, where_clause, where_params = self.env['account.move.line']._query_get()
-        tables = tables.replace('"','')
-        if not tables:
-            tables = 'account_move_line'
-        wheres = [""]
-        if where_clause.strip():
-            wheres.append(where_clause.strip())
-        filters = " AND ".join(wheres)
-        # compute the balance, debit and credit for the provided accounts
-        request = ("SELECT account_id AS id, SUM(debit) AS debit, SUM(credit) AS credit, "
-                   "(SUM(debit) - SUM(credit)) AS balance" +\
-                   " FROM " + tables + " WHERE account_id IN %s " + filters + " GROUP BY account_id")
-        params = (tuple(accounts.ids),) + tuple(where_params)
-        self.env.cr.execute(request, params)
-        for row in self.env.cr.dictfetchall():
-            account_result[row.pop('id')] = row
+        # compute the balance, debit and credit of the accounts, the closed
+        # periods being read from the snapshots of the trial balance
+        account_result = self.env['account.report.snapshot']._get_amounts(
+            'account', lambda context, domain: self.with_context(context)._get_account_rows(domain))
 
         account_res = []
         for account in accounts:
@@ -46,9 +48,9 @@ class ReportTrialBalance(models.AbstractModel):
             res['code'] = account.code
             res['name'] = account.name
             if account.id in account_result:
-                res['debit'] = account_result[account.id].get('debit')
-                res['credit'] = account_result[account.id].get('credit')
-                res['balance'] = account_result[account.id].get('balance')
+                res['debit'] = account_result[account.id]['debit']
+                res['credit'] = account_result[account.id]['credit']
+                res['balance'] = res['debit'] - res['credit']
             if display_account == 'all':
                 account_res.append(res)
             if display_account == 'not_zero' and not currency.is_zero(res['balance']):
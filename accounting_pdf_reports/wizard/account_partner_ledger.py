@@ -18,6 +18,12 @@ class AccountPartnerLedger(models.TransientModel):
                              'amount_currency': self.amount_currency})
         return data
 
+    def _get_export_report_name(self):
+        return 'report.accounting_pdf_reports.report_partnerledger'
+
+    def _get_export_data(self, data):
+        return self._get_report_data(data)
+
     def _print_report(self, data):
         data = self._get_report_data(data)
         return self.env.ref('accounting_pdf_reports.action_report_partnerledger').with_context(landscape=True).\
@@ -1,3 +1,5 @@
+import json
+
 from odoo import api, fields, models, _
 from odoo.tools.misc import get_lang
 
@@ -41,12 +43,53 @@ class AccountCommonReport(models.TransientModel):
     def _print_report(self, data):
         raise NotImplementedError()
 
-    def check_report(self):
-        self.ensure_one()
+    def _get_export_report_name(self):
+        raise NotImplementedError()
+
+    def _get_export_data(self, data):
+        raise NotImplementedError()
+
+    def _prepare_report_data(self):
         data = {}
         data['ids'] = self.env.context.get('active_ids', [])
         data['model'] = self.env.context.get('active_model', 'ir.ui.menu')
         data['form'] = self.read(['date_from', 'date_to', 'journal_ids', 'target_move', 'company_id'])[0]
         used_context = self._build_contexts(data)
         data['form']['used_context'] = dict(used_context, lang=get_lang(self.env).code)
+        return data
+
+    def check_report(self):
+        self.ensure_one()
+        data = self._prepare_report_data()
         return self.with_context(discard_logo_check=True)._print_report(data)
+
+    def _export_report(self, file_format):
+        """ Queues a background export of the report rows to a file,
+        which gets attached to the export record once written. """
+        self.ensure_one()
+        data = self._get_export_data(self._prepare_report_data())
+        report_name = self._get_export_report_name()
+        export = self.env['account.report.export'].create({
+            'name': '%s %s' % (self.env[report_name]._description,
+                               fields.Date.context_today(self)),
+            'report_name': report_name,
+            'file_format': file_format,
+            'data': json.dumps(data, default=str),
+        })
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('Export Queued'),
+                'message': _('The file will be attached to the export "%s" once generated.', export.name),
+                'type': 'info',
+                'sticky': False,
+                'next': {'type': 'ir.actions.act_window_close'},
+            },
+        }
+
+    def action_export_xlsx(self):
+        return self._export_report('xlsx')
+
+    def action_export_csv(self):
+        return self._export_report('csv')
@@ -35,6 +35,12 @@ class AccountAgedTrialBalance(models.TransientModel):
         data['form'].update(res)
         return data
 
+    def _get_export_report_name(self):
+        return 'report.accounting_pdf_reports.report_agedpartnerbalance'
+
+    def _get_export_data(self, data):
+        return self._get_report_data(data)
+
     def _print_report(self, data):
         data = self._get_report_data(data)
         return self.env.ref('accounting_pdf_reports.action_report_aged_partner_balance').\
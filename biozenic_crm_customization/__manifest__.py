@@ -9,10 +9,13 @@
     'depends': ['base', 'mail', 'crm', 'project', 'event', 'website_event'],
 
     "data": [
-        'data/data.xml',
         'security/security.xml',
+        'security/ir.model.access.csv',
+        'data/data.xml',
+        'data/rotation_task_data.xml',
         'views/crm_lead.xml',
         'views/event.xml',
+        'views/rotation_task.xml',
     ],
 
     'installable': True,
@@ -1,4 +1,6 @@
 # -*- coding: utf-8 -*-
+from . import stage_activity
 from . import crm_lead
 from . import event
+from . import rotation_task
 from . import project
\ No newline at end of file
@@ -0,0 +1,103 @@
+from odoo import models, fields, api, _
+from odoo.exceptions import ValidationError
+from odoo.tools import sql
+
+import pytz
+
+
+class EventRotationTask(models.Model):
+    _name = 'event.rotation.task'
+    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _description = 'Monthly Rotation Task'
+    _order = 'sequence, id'
+
+    name = fields.Char(string="Customer", required=True)
+    note = fields.Html(string="Checklist", required=True)
+    sequence = fields.Integer(string="Sequence", default=10)
+    day = fields.Integer(string="Day of Month", required=True, default=20,
+                         help="Day of the month, in the timezone of each user, from which "
+                              "the activity of the task is assigned to them.")
+    active = fields.Boolean(string="Active", default=True)
+
+    @api.constrains('day')
+    def _check_day(self):
+        for task in self:
+            if not 1 <= task.day <= 28:
+                raise ValidationError(_("The day of month of a rotation task must be between 1 and 28."))
+
+    def _get_rotation_users(self):
+        group = self.env.ref('biozenic_crm_customization.group_activity_on_20th_month', raise_if_not_found=False)
+        if not group:
+            return self.env['res.users']
+        users = getattr(group, 'users', False) or getattr(group, 'user_ids', False)
+        return users.filtered('active')
+
+    @api.model
+    def _cron_create_rotation_activities(self):
+        """ Assigns the activity of every active task to the users of the
+        rotation group once a month, from the day of the task on in their
+        timezone.
+
+        The local date is computed once per timezone, and the due (task,
+        user, month) rows are inserted into the ledger of the tasks, the
+        rows already there being skipped. Only the inserted ones get an
+        activity, all created at once, so a cron running again later that
+        day or at the same time on another worker assigns nothing twice.
+        """
+        tasks = self.search([])
+        users = self._get_rotation_users()
+        if not tasks or not users:
+            return
+
+        now = pytz.utc.localize(fields.Datetime.now())
+        due = []
+        for tz, tz_users in users.grouped('tz').items():
+            today = now.astimezone(pytz.timezone(tz or 'UTC')).date()
+            period = today.strftime('%Y-%m')
+            due.extend((task.id, user.id, period, today)
+                       for task in tasks if today.day >= task.day
+                       for user in tz_users)
+        if not due:
+            return
+
+        self.env.cr.execute(
+            "INSERT INTO event_rotation_task_log (task_id, user_id, period, date) "
+            "VALUES " + ", ".join(["(%s, %s, %s, %s)"] * len(due)) +
+            " ON CONFLICT (task_id, user_id, period) DO NOTHING"
+            " RETURNING task_id, user_id, date",
+            [value for row in due for value in row])
+        rows = self.env.cr.fetchall()
+        if not rows:
+            return
+
+        tasks = tasks.grouped('id')
+        model_id = self.env['ir.model']._get_id(self._name)
+        activity_type_id = self.env.ref('mail.mail_activity_data_todo').id
+        self.env['mail.activity'].create([{
+            'res_model_id': model_id,
+            'res_id': task_id,
+            'activity_type_id': activity_type_id,
+            'summary': 'Monthly Rotation Task',
+            'user_id': user_id,
+            'note': tasks[task_id].note,
+            'date_deadline': date,
+        } for task_id, user_id, date in rows])
+
+
+class EventRotationTaskLog(models.Model):
+    _name = 'event.rotation.task.log'
+    _description = 'Monthly Rotation Task Ledger'
+    _log_access = False
+
+    task_id = fields.Many2one('event.rotation.task', string="Task", required=True,
+                              readonly=True, ondelete='cascade')
+    user_id = fields.Many2one('res.users', string="User", required=True,
+                              readonly=True, ondelete='cascade')
+    period = fields.Char(string="Month", required=True, readonly=True,
+                         help="Month the activity was assigned for, as YYYY-MM.")
+    date = fields.Date(string="Date", readonly=True,
+                       help="Date of the user the activity was assigned on.")
+
+    def init(self):
+        sql.create_unique_index(self.env.cr, 'event_rotation_task_log_task_user_period_uniq',
+                                self._table, ['task_id', 'user_id', 'period'])
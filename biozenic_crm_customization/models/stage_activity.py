@@ -0,0 +1,48 @@
+from odoo import models, fields
+
+
+class StageActivityMixin(models.AbstractModel):
+    _name = 'stage.activity.mixin'
+    _description = 'Stage Transition Activities'
+
+    # Activities created when records reach a stage, as
+    # {stage name: [(group xml id, summary, note), ...]}, one activity being
+    # created per record and user of the group
+    _stage_activities = {}
+
+    def write(self, vals):
+        result = super().write(vals)
+        if 'stage_id' in vals and self._stage_activities:
+            self._create_stage_activities()
+        return result
+
+    def _get_stage_activity_users(self, group_xmlid):
+        group = self.env.ref(group_xmlid, raise_if_not_found=False)
+        if not group:
+            return self.env['res.users']
+        return getattr(group, 'users', False) or getattr(group, 'user_ids', False)
+
+    def _create_stage_activities(self):
+        """ Creates the activities of the current stage of the records for
+        the users of the groups configured in _stage_activities, with a
+        single create for all the records, groups and users. """
+        activity_type_id = self.env.ref('mail.mail_activity_data_todo').id
+        model_id = self.env['ir.model']._get_id(self._name)
+        today = fields.Date.today()
+        users = {}
+        vals_list = []
+        for stage, records in self.grouped('stage_id').items():
+            for group_xmlid, summary, note in self._stage_activities.get(stage.name, ()):
+                if group_xmlid not in users:
+                    users[group_xmlid] = self._get_stage_activity_users(group_xmlid)
+                vals_list.extend({
+                    'res_model_id': model_id,
+                    'res_id': rec.id,
+                    'activity_type_id': activity_type_id,
+                    'summary': summary,
+                    'user_id': user.id,
+                    'note': note,
+                    'date_deadline': today,
+                } for rec in records for user in users[group_xmlid])
+        if vals_list:
+            self.env['mail.activity'].create(vals_list)
@@ -1,2 +1,12 @@
 # -*- coding: utf-8 -*-
 from . import models
+
+
+def _uninstall_cleanup(env):
+    """ Removes the triggers refreshing the report, which would fail once
+    its table is dropped. """
+    from .models.model import REPORT_TRIGGERS
+    for table in REPORT_TRIGGERS:
+        env.cr.execute("DROP TRIGGER IF EXISTS crm_sales_account_report_refresh ON %s" % table)
+        env.cr.execute("DROP FUNCTION IF EXISTS crm_sales_account_report_%s_trigger()" % table)
+    env.cr.execute("DROP FUNCTION IF EXISTS crm_sales_account_report_refresh(integer[])")
@@ -26,16 +26,19 @@
     'author': 'Waqar Ahmad',
     'license': 'LGPL-3',
 
-    'depends': ['crm', 'sale_management', 'account'],
+    'depends': ['crm', 'sale_management', 'account', 'accounting_pdf_reports'],
 
     'data': [
         'security/ir.model.access.csv',
+        'security/security.xml',
         'data/cron.xml',
         'views/view.xml',
 
         'reports/action_report.xml',
     ],
 
+    'uninstall_hook': '_uninstall_cleanup',
+
     'installable': True,
     'application': False,
     'auto_install': False,
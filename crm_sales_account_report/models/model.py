@@ -1,13 +1,127 @@
 # -*- coding: utf-8 -*-
 
-import base64
-import io
+import os
+import tempfile
 from datetime import datetime
 
 import xlsxwriter
 
-from odoo import models, fields, api, _
+from odoo import models, fields, api, tools, _
 from odoo.exceptions import UserError
+from odoo.tools import sql
+
+# Rows of the report, one per opportunity, tag and sales order, for the
+# opportunities matching the condition the query is formatted with. The
+# invoices of an order are summed once each, whatever the number of their
+# lines invoicing it.
+REPORT_INSERT_QUERY = """
+    INSERT INTO crm_sales_account_report (
+        opportunity_id, opportunity_name, tag_id, stage_id, partner_id, user_id,
+        company_id, sale_order_id, quote_amount, so_amount, invoice_amount)
+    SELECT
+        lead.id,
+        lead.name,
+        tag_rel.tag_id,
+        lead.stage_id,
+        lead.partner_id,
+        lead.user_id,
+        lead.company_id,
+        so.id,
+        COALESCE(so.amount_total, 0),
+        CASE
+            WHEN so.state IN ('sale', 'done') THEN COALESCE(so.amount_total, 0)
+            ELSE 0
+        END,
+        COALESCE(inv_summary.invoice_total, 0)
+    FROM
+        crm_lead lead
+    JOIN
+        crm_stage stage ON lead.stage_id = stage.id
+    LEFT JOIN
+        crm_tag_rel tag_rel ON lead.id = tag_rel.lead_id
+    LEFT JOIN
+        sale_order so ON so.opportunity_id = lead.id
+    LEFT JOIN LATERAL (
+        SELECT
+            SUM(
+                CASE
+                    WHEN inv.move_type = 'out_invoice' THEN inv.amount_total
+                    ELSE -inv.amount_total
+                END
+            ) AS invoice_total
+        FROM
+            account_move inv
+        WHERE
+            inv.state = 'posted'
+            AND inv.move_type IN ('out_invoice', 'out_refund')
+            AND inv.id IN (
+                SELECT inv_line.move_id
+                FROM sale_order_line sol
+                JOIN sale_order_line_invoice_rel sol_inv_rel ON sol_inv_rel.order_line_id = sol.id
+                JOIN account_move_line inv_line ON inv_line.id = sol_inv_rel.invoice_line_id
+                WHERE sol.order_id = so.id
+            )
+    ) inv_summary ON TRUE
+    WHERE
+        stage.name->>'en_US' IN ('Need to Invoice', 'Awaiting Payment')
+        AND lead.type = 'opportunity'
+        AND lead.active = true
+        AND %s
+"""
+
+# Tables the report is computed from, as {table: (trigger events, ids of
+# the opportunities whose rows a change of the row {row} affects)}
+REPORT_TRIGGERS = {
+    'crm_lead': (
+        'INSERT OR UPDATE OF name, stage_id, partner_id, user_id, company_id, type, active OR DELETE',
+        'ARRAY[{row}.id]',
+    ),
+    'crm_stage': (
+        'UPDATE OF name',
+        'ARRAY(SELECT id FROM crm_lead WHERE stage_id = {row}.id)',
+    ),
+    'crm_tag_rel': (
+        'INSERT OR UPDATE OR DELETE',
+        'ARRAY[{row}.lead_id]',
+    ),
+    'sale_order': (
+        'INSERT OR UPDATE OF opportunity_id, state, amount_total OR DELETE',
+        'ARRAY[{row}.opportunity_id]',
+    ),
+    'sale_order_line_invoice_rel': (
+        'INSERT OR UPDATE OR DELETE',
+        'ARRAY(SELECT so.opportunity_id FROM sale_order_line sol '
+        'JOIN sale_order so ON so.id = sol.order_id '
+        'WHERE sol.id = {row}.order_line_id)',
+    ),
+    'account_move': (
+        'UPDATE OF state, move_type, amount_total',
+        'ARRAY(SELECT DISTINCT so.opportunity_id FROM account_move_line inv_line '
+        'JOIN sale_order_line_invoice_rel sol_inv_rel ON sol_inv_rel.invoice_line_id = inv_line.id '
+        'JOIN sale_order_line sol ON sol.id = sol_inv_rel.order_line_id '
+        'JOIN sale_order so ON so.id = sol.order_id '
+        'WHERE inv_line.move_id = {row}.id AND so.opportunity_id IS NOT NULL)',
+    ),
+}
+
+REPORT_INDEXED_COLUMNS = ['opportunity_id', 'stage_id', 'user_id', 'company_id', 'tag_id']
+
+REPORT_EXPORT_FIELDS = [
+    'tag_id', 'opportunity_name', 'partner_id', 'user_id', 'quote_amount',
+    'so_amount', 'invoice_amount', 'stage_id', 'company_id',
+]
+
+# Lines read at once when exporting the report
+REPORT_EXPORT_CHUNK_SIZE = 2000
+
+XLSX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+# Lines above which the report is exported in the background
+REPORT_EXPORT_SYNC_LIMIT = 20000
+
+# First key of the advisory locks of the refreshes, the second one being
+# the id of the opportunity
+REPORT_LOCK_KEY = 20310
 
 
 class CrmSalesAccountReport(models.Model):
@@ -30,68 +144,76 @@ class CrmSalesAccountReport(models.Model):
     company_id = fields.Many2one('res.company', string='Company', readonly=True)
 
     def init(self):
-        self.env.cr.execute("""
-            CREATE OR REPLACE VIEW crm_sales_account_report AS (
-                SELECT
-                    row_number() OVER () AS id,
-                    lead.id AS opportunity_id,
-                    lead.name AS opportunity_name,
-                    tag.id AS tag_id,
-                    lead.stage_id AS stage_id,
-                    lead.partner_id AS partner_id,
-                    lead.user_id AS user_id,
-                    lead.company_id AS company_id,
-                    so.id AS sale_order_id,
-                    COALESCE(so.amount_total, 0) AS quote_amount,
-                    CASE 
-                        WHEN so.state IN ('sale', 'done') THEN COALESCE(so.amount_total, 0)
-                        ELSE 0
-                    END AS so_amount,
-                    COALESCE(inv_summary.invoice_total, 0) AS invoice_amount
-                FROM
-                    crm_lead lead
-                LEFT JOIN
-                    crm_stage stage ON lead.stage_id = stage.id
-                LEFT JOIN
-                    crm_tag_rel tag_rel ON lead.id = tag_rel.lead_id
-                LEFT JOIN
-                    crm_tag tag ON tag_rel.tag_id = tag.id
-                LEFT JOIN
-                    sale_order so ON so.opportunity_id = lead.id
-                LEFT JOIN (
-                    SELECT
-                        so_inner.id AS sale_order_id,
-                        SUM(
-                            CASE 
-                                WHEN inv.state = 'posted' AND inv.move_type = 'out_invoice' 
-                                THEN inv.amount_total
-                                WHEN inv.state = 'posted' AND inv.move_type = 'out_refund'
-                                THEN -inv.amount_total
-                                ELSE 0
-                            END
-                        ) AS invoice_total
-                    FROM
-                        sale_order so_inner
-                    LEFT JOIN
-                        sale_order_line_invoice_rel sol_inv_rel ON sol_inv_rel.order_line_id IN (
-                            SELECT id FROM sale_order_line WHERE order_id = so_inner.id
-                        )
-                    LEFT JOIN
-                        account_move_line inv_line ON inv_line.id = sol_inv_rel.invoice_line_id
-                    LEFT JOIN
-                        account_move inv ON inv.id = inv_line.move_id
-                    WHERE
-                        inv.state = 'posted'
-                        AND inv.move_type IN ('out_invoice', 'out_refund')
-                    GROUP BY
-                        so_inner.id
-                ) inv_summary ON inv_summary.sale_order_id = so.id
-                WHERE
-                    stage.name->>'en_US' IN ('Need to Invoice', 'Awaiting Payment')
-                    AND lead.type = 'opportunity'
-                    AND lead.active = true
+        """ Creates the table of the report, filled in full, and the
+        triggers refreshing the rows of the opportunities whose lead, tags,
+        sales orders or invoices change, so reading the report never joins
+        the order history again. """
+        cr = self.env.cr
+        tools.drop_view_if_exists(cr, self._table)
+        cr.execute("""
+            CREATE TABLE IF NOT EXISTS crm_sales_account_report (
+                id serial PRIMARY KEY,
+                opportunity_id integer NOT NULL,
+                opportunity_name varchar,
+                tag_id integer,
+                stage_id integer,
+                partner_id integer,
+                user_id integer,
+                company_id integer,
+                sale_order_id integer,
+                quote_amount double precision,
+                so_amount double precision,
+                invoice_amount double precision
             )
         """)
+        for column in REPORT_INDEXED_COLUMNS:
+            sql.create_index(cr, '%s_%s_index' % (self._table, column), self._table, [column])
+
+        cr.execute("""
+            CREATE OR REPLACE FUNCTION crm_sales_account_report_refresh(lead_ids integer[])
+            RETURNS void AS $$
+            BEGIN
+                -- Refreshes of the same opportunity are serialized, so that
+                -- they never insert its rows twice
+                PERFORM pg_advisory_xact_lock(%s, lead_id)
+                FROM (SELECT DISTINCT unnest(lead_ids) AS lead_id) AS leads
+                WHERE lead_id IS NOT NULL
+                ORDER BY lead_id;
+                DELETE FROM crm_sales_account_report WHERE opportunity_id = ANY(lead_ids);
+                %s;
+            END;
+            $$ LANGUAGE plpgsql
+        """ % (REPORT_LOCK_KEY, REPORT_INSERT_QUERY % 'lead.id = ANY(lead_ids)'))
+        for table, (events, lead_ids) in REPORT_TRIGGERS.items():
+            cr.execute("""
+                CREATE OR REPLACE FUNCTION crm_sales_account_report_%(table)s_trigger()
+                RETURNS trigger AS $$
+                DECLARE
+                    lead_ids integer[] := '{}';
+                BEGIN
+                    IF TG_OP <> 'INSERT' THEN
+                        lead_ids := lead_ids || %(old)s;
+                    END IF;
+                    IF TG_OP <> 'DELETE' THEN
+                        lead_ids := lead_ids || %(new)s;
+                    END IF;
+                    PERFORM crm_sales_account_report_refresh(lead_ids);
+                    RETURN NULL;
+                END;
+                $$ LANGUAGE plpgsql;
+                DROP TRIGGER IF EXISTS crm_sales_account_report_refresh ON %(table)s;
+                CREATE TRIGGER crm_sales_account_report_refresh
+                AFTER %(events)s ON %(table)s
+                FOR EACH ROW EXECUTE FUNCTION crm_sales_account_report_%(table)s_trigger();
+            """ % {
+                'table': table,
+                'events': events,
+                'old': lead_ids.format(row='OLD'),
+                'new': lead_ids.format(row='NEW'),
+            })
+
+        cr.execute("TRUNCATE crm_sales_account_report")
+        cr.execute(REPORT_INSERT_QUERY % 'TRUE')
 
     def action_open_opportunity(self):
         self.ensure_one()
@@ -107,12 +229,32 @@ class CrmSalesAccountReport(models.Model):
     def _get_report_domain(self):
         return []
 
-    def _get_report_lines(self):
-        return self.search(self._get_report_domain(), order='opportunity_name')
-
-    def _generate_xlsx_file(self):
-        output = io.BytesIO()
-        workbook = xlsxwriter.Workbook(output, {'in_memory': True})
+    def _iter_report_lines(self):
+        """ Yields the lines of the report as dictionaries, ordered by
+        opportunity name, reading them by chunks of REPORT_EXPORT_CHUNK_SIZE
+        from the last name and id read, so that only one chunk is held in
+        memory at a time. """
+        domain = self._get_report_domain()
+        last = None
+        while True:
+            chunk_domain = domain
+            if last:
+                chunk_domain = domain + [
+                    '|', ('opportunity_name', '>', last['opportunity_name']),
+                    '&', ('opportunity_name', '=', last['opportunity_name']), ('id', '>', last['id']),
+                ]
+            lines = self.search_read(chunk_domain, REPORT_EXPORT_FIELDS,
+                                     order='opportunity_name, id', limit=REPORT_EXPORT_CHUNK_SIZE)
+            yield from lines
+            if len(lines) < REPORT_EXPORT_CHUNK_SIZE:
+                return
+            last = lines[-1]
+            self.env.invalidate_all()
+
+    def _write_xlsx_file(self, path):
+        """ Writes the report to the xlsx file at path, row by row, with
+        xlsxwriter flushing each row to disk once the next one is written. """
+        workbook = xlsxwriter.Workbook(path, {'constant_memory': True})
         worksheet = workbook.add_worksheet('Consolidated Report')
 
         title_fmt = workbook.add_format({
@@ -153,6 +295,14 @@ class CrmSalesAccountReport(models.Model):
             'Company',
         ]
 
+        worksheet.set_column('A:A', 18)
+        worksheet.set_column('B:B', 30)
+        worksheet.set_column('C:C', 25)
+        worksheet.set_column('D:D', 20)
+        worksheet.set_column('E:G', 18)
+        worksheet.set_column('H:H', 20)
+        worksheet.set_column('I:I', 25)
+
         row = 0
         worksheet.merge_range(row, 0, row, len(columns) - 1, 'CRM Sales Account Consolidated Report', title_fmt)
         row += 2
@@ -161,46 +311,58 @@ class CrmSalesAccountReport(models.Model):
             worksheet.write(row, col, header, header_fmt)
         row += 1
 
-        records = self._get_report_lines()
-
-        for rec in records:
-            worksheet.write(row, 0, rec.tag_id.display_name or '', text_fmt)
-            worksheet.write(row, 1, rec.opportunity_name or '', text_fmt)
-            worksheet.write(row, 2, rec.partner_id.display_name or '', text_fmt)
-            worksheet.write(row, 3, rec.user_id.display_name or '', text_fmt)
-            worksheet.write_number(row, 4, rec.quote_amount or 0.0, amount_fmt)
-            worksheet.write_number(row, 5, rec.so_amount or 0.0, amount_fmt)
-            worksheet.write_number(row, 6, rec.invoice_amount or 0.0, amount_fmt)
-            worksheet.write(row, 7, rec.stage_id.display_name or '', text_fmt)
-            worksheet.write(row, 8, rec.company_id.display_name or '', text_fmt)
+        def name(value):
+            return value[1] if value else ''
+
+        for line in self._iter_report_lines():
+            worksheet.write(row, 0, name(line['tag_id']), text_fmt)
+            worksheet.write(row, 1, line['opportunity_name'] or '', text_fmt)
+            worksheet.write(row, 2, name(line['partner_id']), text_fmt)
+            worksheet.write(row, 3, name(line['user_id']), text_fmt)
+            worksheet.write_number(row, 4, line['quote_amount'] or 0.0, amount_fmt)
+            worksheet.write_number(row, 5, line['so_amount'] or 0.0, amount_fmt)
+            worksheet.write_number(row, 6, line['invoice_amount'] or 0.0, amount_fmt)
+            worksheet.write(row, 7, name(line['stage_id']), text_fmt)
+            worksheet.write(row, 8, name(line['company_id']), text_fmt)
             row += 1
 
-        worksheet.set_column('A:A', 18)
-        worksheet.set_column('B:B', 30)
-        worksheet.set_column('C:C', 25)
-        worksheet.set_column('D:D', 20)
-        worksheet.set_column('E:G', 18)
-        worksheet.set_column('H:H', 20)
-        worksheet.set_column('I:I', 25)
-
         workbook.close()
-        output.seek(0)
 
+    def _create_xlsx_attachment(self, values=None):
+        """ Writes the report to a temporary xlsx file and returns it as a
+        new attachment, created with the given values. """
         filename = 'Consolidate Report %s.xlsx' % fields.Date.today()
-        file_content = base64.b64encode(output.read())
-        output.close()
-
-        return file_content, filename
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, filename)
+            self._write_xlsx_file(path)
+            return self.env['ir.attachment']._create_from_file(path, dict(values or {}, **{
+                'name': filename,
+                'type': 'binary',
+                'mimetype': XLSX_MIMETYPE,
+            }))
 
     @api.model
     def action_download_excel(self):
-        file_content, filename = self._generate_xlsx_file()
-
-        attachment = self.env['ir.attachment'].create({
-            'name': filename,
-            'type': 'binary',
-            'datas': file_content,
-            'mimetype': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        """ Downloads the report at once, or queues a background export of it
+        when it holds more than REPORT_EXPORT_SYNC_LIMIT lines, the file
+        being posted to the requester once written. """
+        if self.search_count(self._get_report_domain(), limit=REPORT_EXPORT_SYNC_LIMIT + 1) \
+                > REPORT_EXPORT_SYNC_LIMIT:
+            export = self.env['crm.sales.account.report.export'].create({
+                'name': 'Consolidate Report %s' % fields.Date.context_today(self),
+            })
+            return {
+                'type': 'ir.actions.client',
+                'tag': 'display_notification',
+                'params': {
+                    'title': _('Export Queued'),
+                    'message': _('The file will be attached to the export "%s" once generated.', export.name),
+                    'type': 'info',
+                    'sticky': False,
+                },
+            }
+
+        attachment = self._create_xlsx_attachment({
             'res_model': self._name,
             'res_id': self[:1].id or 0,
         })
@@ -223,14 +385,7 @@ class CrmSalesAccountReport(models.Model):
 
     def _send_report_email(self):
         config = self._get_consolidate_email_config()
-        file_content, filename = self._generate_xlsx_file()
-
-        attachment = self.env['ir.attachment'].create({
-            'name': filename,
-            'type': 'binary',
-            'datas': file_content,
-            'mimetype': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-        })
+        attachment = self._create_xlsx_attachment()
 
         mail_values = {
             'subject': config.subject_email or 'CRM Sales Account Consolidated Report',
@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models
+
+from .model import XLSX_MIMETYPE
+
+
+class CrmSalesAccountReportExport(models.Model):
+    _name = 'crm.sales.account.report.export'
+    _inherit = ['account.report.export.mixin']
+    _description = 'CRM Sales Account Consolidated Report Export'
+    _order = 'id desc'
+    _export_cron = 'crm_sales_account_report.ir_cron_crm_sales_account_report_export'
+
+    def _get_file_name(self):
+        return '%s.xlsx' % self.name
+
+    def _write_file(self, path):
+        report = self.env['crm.sales.account.report'].with_user(self.user_id).with_company(
+            self.company_id).with_context(lang=self.user_id.lang)
+        report._write_xlsx_file(path)
+        return XLSX_MIMETYPE
@@ -75,109 +75,200 @@ class HrPayslip(models.Model):
         first uncanceled, then all moves are unlinked. Finally, the method
         calls the parent class's action_payslip_cancel method."""
         moves = self.mapped('move_id')
+        if moves and self.search_count([
+                ('move_id', 'in', moves.ids), ('id', 'not in', self.ids)]):
+            raise UserError(
+                _("The accounting entry of these payslips is shared with "
+                  "other payslips of their batch, cancel all of them at "
+                  "once."))
         moves.filtered(lambda x: x.state == 'posted').button_cancel()
         moves.unlink()
         return super(HrPayslip, self).action_payslip_cancel()
 
-    def action_payslip_done(self):
-        """Finalize and post the payroll slip, creating accounting entries.This
-         method is called when marking a payroll slip as done. It calculates
-         the accounting entries based on the salary details, creates a move
-         (journal entry),and posts it. If necessary, adjustment entries are
-         added to balance the debit and credit amounts."""
-        res = super(HrPayslip, self).action_payslip_done()
-        for slip in self:
-            line_ids = []
-            debit_sum = 0.0
-            credit_sum = 0.0
-            name = _('Payslip of %s') % slip.employee_id.name
-            move_dict = {
-                'narration': name,
-                'ref': slip.number,
-                'journal_id': slip.journal_id.id,
-                'date': slip.date or slip.date_to,
-            }
-            for line in slip.details_by_salary_rule_category_ids:
-                amount = slip.company_id.currency_id.round(
-                    slip.credit_note and -line.total or line.total)
-                if slip.company_id.currency_id.is_zero(amount):
+    def _get_move_line_vals(self, partners):
+        """Returns the values of the journal items of the payslip, with the
+        sums of their debit and credit. The partners of the salary rules are
+        read from and stored in partners, keyed by rule and side, so they
+        are only looked up once for all the payslips of a batch."""
+        self.ensure_one()
+        currency = self.company_id.currency_id
+        date = self.date or self.date_to
+        line_ids = []
+        debit_sum = 0.0
+        credit_sum = 0.0
+        for line in self.details_by_salary_rule_category_ids:
+            amount = currency.round(
+                self.credit_note and -line.total or line.total)
+            if currency.is_zero(amount):
+                continue
+            rule = line.salary_rule_id
+            for account, credit_account in ((rule.account_debit_id, False),
+                                            (rule.account_credit_id, True)):
+                if not account:
                     continue
-                debit_account_id = line.salary_rule_id.account_debit_id.id
-                credit_account_id = line.salary_rule_id.account_credit_id.id
-                if debit_account_id:
-                    debit_line = (0, 0, {
-                        'name': line.name,
-                        'partner_id': line._get_partner_id(
-                            credit_account=False),
-                        'account_id': debit_account_id,
-                        'journal_id': slip.journal_id.id,
-                        'date': slip.date or slip.date_to,
-                        'debit': amount > 0.0 and amount or 0.0,
-                        'credit': amount < 0.0 and -amount or 0.0,
-                        'tax_line_id': line.salary_rule_id.account_tax_id.id,
-                    })
-                    line_ids.append(debit_line)
-                    debit_sum += debit_line[2]['debit'] - debit_line[2][
-                        'credit']
-                if credit_account_id:
-                    credit_line = (0, 0, {
-                        'name': line.name,
-                        'partner_id': line._get_partner_id(credit_account=True),
-                        'account_id': credit_account_id,
-                        'journal_id': slip.journal_id.id,
-                        'date': slip.date or slip.date_to,
-                        'debit': amount < 0.0 and -amount or 0.0,
-                        'credit': amount > 0.0 and amount or 0.0,
-                        'tax_line_id': line.salary_rule_id.account_tax_id.id,
-                    })
-                    line_ids.append(credit_line)
-                    credit_sum += credit_line[2]['credit'] - credit_line[2][
-                        'debit']
-            if slip.company_id.currency_id.compare_amounts(
-                    credit_sum, debit_sum) == -1:
-                acc_id = slip.journal_id.default_account_id.id
-                if not acc_id:
-                    raise UserError(
-                        _('The Expense Journal "%s" has not properly '
-                          'configured the Credit Account!') % (
-                            slip.journal_id.name))
-                adjust_credit = (0, 0, {
-                    'name': _('Adjustment Entry'),
-                    'partner_id': False,
-                    'account_id': acc_id,
-                    'journal_id': slip.journal_id.id,
-                    'date': slip.date or slip.date_to,
-                    'debit': 0.0,
-                    'credit': slip.company_id.currency_id.round(
-                        debit_sum - credit_sum),
-                })
-                line_ids.append(adjust_credit)
-            elif slip.company_id.currency_id.compare_amounts(
-                    debit_sum, credit_sum) == -1:
-                acc_id = slip.journal_id.default_account_id.id
-                if not acc_id:
-                    raise UserError(
-                        _('The Expense Journal "%s" has not properly '
-                          'configured the Debit Account!') % (
-                            slip.journal_id.name))
-                adjust_debit = (0, 0, {
-                    'name': _('Adjustment Entry'),
-                    'partner_id': False,
-                    'account_id': acc_id,
-                    'journal_id': slip.journal_id.id,
-                    'date': slip.date or slip.date_to,
-                    'debit': slip.company_id.currency_id.round(
-                        credit_sum - debit_sum),
-                    'credit': 0.0,
+                if (rule.id, credit_account) not in partners:
+                    partners[rule.id, credit_account] = line._get_partner_id(
+                        credit_account=credit_account)
+                debit = amount > 0.0 and amount or 0.0
+                credit = amount < 0.0 and -amount or 0.0
+                if credit_account:
+                    debit, credit = credit, debit
+                line_ids.append({
+                    'name': line.name,
+                    'partner_id': partners[rule.id, credit_account],
+                    'account_id': account.id,
+                    'journal_id': self.journal_id.id,
+                    'date': date,
+                    'debit': debit,
+                    'credit': credit,
+                    'tax_line_id': rule.account_tax_id.id,
                 })
-                line_ids.append(adjust_debit)
-            move_dict['line_ids'] = line_ids
-            move = self.env['account.move'].create(move_dict)
-            slip.write({'move_id': move.id, 'date': slip.date or slip.date_to})
-            if not move.line_ids:
+                if credit_account:
+                    credit_sum += credit - debit
+                else:
+                    debit_sum += debit - credit
+        return line_ids, debit_sum, credit_sum
+
+    @api.model
+    def _get_adjustment_line_vals(self, journal, date, currency, debit_sum,
+                                  credit_sum):
+        """Returns the values of the journal item balancing the debit and
+        credit sums on the default account of the journal, or None when
+        they are already balanced."""
+        if currency.compare_amounts(credit_sum, debit_sum) == -1:
+            if not journal.default_account_id:
+                raise UserError(
+                    _('The Expense Journal "%s" has not properly '
+                      'configured the Credit Account!') % (journal.name))
+            debit, credit = 0.0, currency.round(debit_sum - credit_sum)
+        elif currency.compare_amounts(debit_sum, credit_sum) == -1:
+            if not journal.default_account_id:
+                raise UserError(
+                    _('The Expense Journal "%s" has not properly '
+                      'configured the Debit Account!') % (journal.name))
+            debit, credit = currency.round(credit_sum - debit_sum), 0.0
+        else:
+            return None
+        return {
+            'name': _('Adjustment Entry'),
+            'partner_id': False,
+            'account_id': journal.default_account_id.id,
+            'journal_id': journal.id,
+            'date': date,
+            'debit': debit,
+            'credit': credit,
+        }
+
+    def _prepare_move_vals(self, partners):
+        """Returns the values of the journal entry of the payslip."""
+        self.ensure_one()
+        line_ids, debit_sum, credit_sum = self._get_move_line_vals(partners)
+        date = self.date or self.date_to
+        adjustment = self._get_adjustment_line_vals(
+            self.journal_id, date, self.company_id.currency_id, debit_sum,
+            credit_sum)
+        if adjustment:
+            line_ids.append(adjustment)
+        return {
+            'narration': _('Payslip of %s') % self.employee_id.name,
+            'ref': self.number,
+            'journal_id': self.journal_id.id,
+            'date': date,
+            'line_ids': [(0, 0, vals) for vals in line_ids],
+        }
+
+    def _prepare_consolidated_move_vals(self, partners):
+        """Returns the values of a single journal entry for the payslips,
+        of a same batch, journal and date, summing their journal items by
+        account, partner and tax."""
+        slip = self[:1]
+        currency = slip.company_id.currency_id
+        date = slip.date or slip.date_to
+        summary = {}
+        for payslip in self:
+            for vals in payslip._get_move_line_vals(partners)[0]:
+                key = (vals['account_id'], vals['partner_id'],
+                       vals['tax_line_id'])
+                summary[key] = summary.get(key, 0.0) + vals['debit'] - vals[
+                    'credit']
+        accounts = self.env['account.account'].browse(
+            {account_id for account_id, partner_id, tax_id in summary})
+        names = {account.id: account.name for account in accounts}
+        line_ids = []
+        debit_sum = 0.0
+        credit_sum = 0.0
+        for (account_id, partner_id, tax_id), balance in summary.items():
+            balance = currency.round(balance)
+            if currency.is_zero(balance):
+                continue
+            line_ids.append({
+                'name': names[account_id],
+                'partner_id': partner_id,
+                'account_id': account_id,
+                'journal_id': slip.journal_id.id,
+                'date': date,
+                'debit': balance > 0.0 and balance or 0.0,
+                'credit': balance < 0.0 and -balance or 0.0,
+                'tax_line_id': tax_id,
+            })
+            if balance > 0.0:
+                debit_sum += balance
+            else:
+                credit_sum -= balance
+        adjustment = self._get_adjustment_line_vals(
+            slip.journal_id, date, currency, debit_sum, credit_sum)
+        if adjustment:
+            line_ids.append(adjustment)
+        return {
+            'narration': _('Payslips of %s') % slip.payslip_run_id.name,
+            'ref': slip.payslip_run_id.name,
+            'journal_id': slip.journal_id.id,
+            'date': date,
+            'line_ids': [(0, 0, vals) for vals in line_ids],
+        }
+
+    def _create_account_moves(self):
+        """Creates and posts the journal entries of the payslips at once,
+        one per payslip, or one per journal and date for the payslips of
+        the batches set to consolidate their entries."""
+        partners = {}
+        groups = {}
+        for slip in self:
+            if slip.payslip_run_id.move_mode == 'consolidated':
+                key = (slip.payslip_run_id.id, slip.journal_id.id,
+                       slip.date or slip.date_to)
+            else:
+                key = slip.id
+            groups.setdefault(key, []).append(slip.id)
+        slip_groups = [self.browse(slip_ids) for slip_ids in groups.values()]
+
+        vals_list = []
+        for key, slips in zip(groups, slip_groups):
+            if isinstance(key, tuple):
+                vals = slips._prepare_consolidated_move_vals(partners)
+            else:
+                vals = slips._prepare_move_vals(partners)
+            if not vals['line_ids']:
                 raise UserError(
                     _("As you installed the payroll accounting module you have"
                       " to choose Debit and Credit account for at least one "
                       "salary rule in the chosen Salary Structure."))
-            move.action_post()
+            vals_list.append(vals)
+        moves = self.env['account.move'].create(vals_list)
+        for slips, move in zip(slip_groups, moves):
+            date_slips = slips.grouped(lambda slip: slip.date or slip.date_to)
+            for date, slips_of_date in date_slips.items():
+                slips_of_date.write({'move_id': move.id, 'date': date})
+        moves.action_post()
+        return moves
+
+    def action_payslip_done(self):
+        """Finalize and post the payroll slips, creating accounting entries.
+         This method is called when marking payroll slips as done. It
+         calculates the accounting entries based on the salary details,
+         creates all the moves (journal entries) at once and posts them
+         together. If necessary, adjustment entries are added to balance the
+         debit and credit amounts."""
+        res = super(HrPayslip, self).action_payslip_done()
+        self._create_account_moves()
         return res
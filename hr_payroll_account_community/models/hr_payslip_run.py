@@ -38,3 +38,10 @@ class HrPayslipRun(models.Model):
                                      'account.journal'].search(
                                      [('type', '=', 'general')],
                                      limit=1))
+    move_mode = fields.Selection(
+        [('payslip', 'One Entry per Payslip'),
+         ('consolidated', 'One Entry per Journal and Date')],
+        string='Accounting Entries', required=True, default='payslip',
+        help="Whether confirming the payslips of the batch creates a journal "
+             "entry per payslip, or a single entry per journal and date "
+             "summing their amounts by account.")
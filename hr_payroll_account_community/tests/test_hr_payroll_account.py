@@ -147,3 +147,47 @@ class TestHrPayrollAccount(common.TransactionCase):
 
         # I verify that the payslip is in done state.
         self.assertEqual(self.hr_payslip.state, 'done', 'State not changed!')
+
+    def test_01_hr_payslip_run_consolidated(self):
+        """ checking the consolidated entries of a payslip batch. """
+        date_from = time.strftime('%Y-%m-01')
+        date_to = str(datetime.now() + relativedelta.relativedelta(
+            months=+1, day=1, days=-1))[:10]
+        journal = self.env.ref('hr_payroll_account_community.expenses_journal')
+        payslip_run = self.env['hr.payslip.run'].create({
+            'name': 'Consolidated Batch',
+            'date_start': date_from,
+            'date_end': date_to,
+            'journal_id': journal.id,
+            'move_mode': 'consolidated',
+        })
+        hr_employee_jane = self.hr_employee_john.copy({'name': 'Jane'})
+        hr_contract_jane = self.hr_contract_john.copy({
+            'name': 'Contract for Jane',
+            'employee_id': hr_employee_jane.id,
+        })
+        payslips = self.env['hr.payslip'].create([{
+            'name': 'Payslip of %s' % contract.employee_id.name,
+            'employee_id': contract.employee_id.id,
+            'contract_id': contract.id,
+            'struct_id': self.hr_structure_softwaredeveloper.id,
+            'journal_id': journal.id,
+            'payslip_run_id': payslip_run.id,
+            'date_from': date_from,
+            'date_to': date_to,
+        } for contract in self.hr_contract_john | hr_contract_jane])
+        payslips.action_compute_sheet()
+
+        # Confirm the payslips of the batch
+        payslips.action_payslip_done()
+
+        # I verify that a single balanced entry is shared by the payslips.
+        moves = payslips.move_id
+        self.assertEqual(len(moves), 1,
+                         'One entry per journal and date expected')
+        self.assertEqual(moves.journal_id, journal)
+        self.assertEqual(moves.date, fields.Date.to_date(date_to))
+        self.assertEqual(moves.state, 'posted')
+        self.assertAlmostEqual(sum(moves.line_ids.mapped('debit')),
+                               sum(moves.line_ids.mapped('credit')))
+        self.assertEqual(payslips.mapped('date'), [moves.date] * 2)
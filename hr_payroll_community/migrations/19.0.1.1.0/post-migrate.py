@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+#############################################################################
+#    A part of Open HRMS Project <https://www.openhrms.com>
+#
+#    Cybrosys Technologies Pvt. Ltd.
+#
+#    Copyright (C) 2025-TODAY Cybrosys Technologies(<https://www.cybrosys.com>)
+#    Author: Cybrosys Techno Solutions(<https://www.cybrosys.com>)
+#
+#    You can modify it under the terms of the GNU LESSER
+#    GENERAL PUBLIC LICENSE (LGPL v3), Version 3.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU LESSER GENERAL PUBLIC LICENSE (LGPL v3) for more details.
+#
+#    You should have received a copy of the GNU LESSER GENERAL PUBLIC LICENSE
+#    (LGPL v3) along with this program.
+#    If not, see <http://www.gnu.org/licenses/>.
+#
+#############################################################################
+import logging
+from odoo import api, SUPERUSER_ID
+from odoo.addons.hr_payroll_community.models.hr_salary_rule_snapshot import \
+    RULE_SNAPSHOT_FIELDS
+from odoo.tools import sql
+
+_logger = logging.getLogger(__name__)
+
+
+def migrate(cr, version):
+    """Move the rule values copied on the existing payslip lines to the
+    salary rule snapshots, then drop the copied columns"""
+    columns = [column for column in RULE_SNAPSHOT_FIELDS
+               if sql.column_exists(cr, 'hr_payslip_line', column)]
+    if not columns:
+        return
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    select = ', '.join('l.%s' % column for column in columns)
+    # Oldest values first, so that the versions follow the history
+    cr.execute("""
+        SELECT l.salary_rule_id, %s, MIN(l.id) AS first_line_id
+        FROM hr_payslip_line l
+        WHERE l.rule_snapshot_id IS NULL
+        GROUP BY l.salary_rule_id, %s
+        ORDER BY first_line_id
+    """ % (select, select))
+    rows = cr.dictfetchall()
+    if rows:
+        snapshot_ids = env['hr.salary.rule.snapshot']._get_snapshot_ids(
+            [(row['salary_rule_id'], row) for row in rows])
+        cr.execute("""
+            CREATE TEMPORARY TABLE payslip_line_snapshot (
+                salary_rule_id integer, %s, rule_snapshot_id integer
+            ) ON COMMIT DROP
+        """ % ', '.join('%s %s' % (column, _column_type(cr, column))
+                        for column in columns))
+        for row, snapshot_id in zip(rows, snapshot_ids):
+            cr.execute(
+                "INSERT INTO payslip_line_snapshot VALUES (%s)" % ', '.join(
+                    ['%s'] * (len(columns) + 2)),
+                [row['salary_rule_id']] + [row[column] for column in columns]
+                + [snapshot_id])
+        cr.execute("""
+            UPDATE hr_payslip_line l
+            SET rule_snapshot_id = s.rule_snapshot_id
+            FROM payslip_line_snapshot s
+            WHERE l.rule_snapshot_id IS NULL
+                AND l.salary_rule_id = s.salary_rule_id AND %s
+        """ % ' AND '.join('l.%s IS NOT DISTINCT FROM s.%s' % (column, column)
+                           for column in columns))
+        _logger.info("Linked %s payslip lines to %s salary rule snapshots",
+                     cr.rowcount, len(set(snapshot_ids)))
+    for column in columns:
+        cr.execute('ALTER TABLE hr_payslip_line DROP COLUMN "%s"' % column)
+
+
+def _column_type(cr, column):
+    cr.execute("""
+        SELECT format_type(a.atttypid, a.atttypmod)
+        FROM pg_attribute a
+        WHERE a.attrelid = 'hr_payslip_line'::regclass AND a.attname = %s
+    """, (column,))
+    return cr.fetchone()[0]
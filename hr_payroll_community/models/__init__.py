@@ -27,6 +27,7 @@ from . import hr_employee
 from . import hr_leave_type
 from . import hr_payroll_structure
 from . import hr_payslip
+from . import hr_payslip_compute_chunk
 from . import hr_payslip_input
 from . import hr_salary_rule
 from . import hr_payslip_line
@@ -34,5 +35,6 @@ from . import hr_payslip_run
 from . import hr_payslip_worked_days
 from . import hr_rule_input
 from . import hr_salary_rule_category
+from . import hr_salary_rule_snapshot
 from . import res_config_settings
 from . import resource_mixin
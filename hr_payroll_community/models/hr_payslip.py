@@ -20,6 +20,7 @@
 #    If not, see <http://www.gnu.org/licenses/>.
 #
 #############################################################################
+from collections import defaultdict
 from datetime import date, datetime, time
 from dateutil.relativedelta import relativedelta
 from odoo import api, fields, models, tools, _
@@ -31,6 +32,84 @@ import babel
 ROUNDING_FACTOR = 16
 
 
+class PayslipHistory(object):
+    """
+    Totals of the done payslips of a set of employees, used by the payslip,
+    inputs and worked_days objects available in the salary rules. The first
+    time a rule asks for a code, the totals of that code are loaded for all
+    the employees with a single query, grouped by payslip period, and every
+    later call is answered from memory.
+    """
+    _queries = {
+        'input': """
+            SELECT hp.employee_id, hp.date_from, hp.date_to, sum(pi.amount)
+            FROM hr_payslip as hp, hr_payslip_input as pi
+            WHERE hp.employee_id IN %s AND hp.state = 'done'
+            AND hp.id = pi.payslip_id AND pi.code = %s
+            GROUP BY hp.employee_id, hp.date_from, hp.date_to""",
+        'worked_days': """
+            SELECT hp.employee_id, hp.date_from, hp.date_to,
+            sum(pi.number_of_days), sum(pi.number_of_hours)
+            FROM hr_payslip as hp, hr_payslip_worked_days as pi
+            WHERE hp.employee_id IN %s AND hp.state = 'done'
+            AND hp.id = pi.payslip_id AND pi.code = %s
+            GROUP BY hp.employee_id, hp.date_from, hp.date_to""",
+        'line': """
+            SELECT hp.employee_id, hp.date_from, hp.date_to,
+            sum(case when hp.credit_note = False then (pl.total)
+            else (-pl.total) end)
+            FROM hr_payslip as hp, hr_payslip_line as pl
+            WHERE hp.employee_id IN %s AND hp.state = 'done'
+            AND hp.id = pl.slip_id AND pl.code = %s
+            GROUP BY hp.employee_id, hp.date_from, hp.date_to""",
+    }
+    # number of summed columns returned by each query
+    _columns = {'input': 1, 'worked_days': 2, 'line': 1}
+
+    def __init__(self, env, employee_ids):
+        """Function for getting env and the employees of the batch"""
+        self.env = env
+        self.employee_ids = tuple(set(employee_ids))
+        self._totals = {}
+
+    def _get_totals(self, kind, code):
+        """
+        @return: dict {employee_id: list of (date_from, date_to, sums)} of
+        the done payslips having the given code
+        """
+        key = (kind, code)
+        if key not in self._totals:
+            totals = defaultdict(list)
+            if self.employee_ids:
+                self.env.flush_all()
+                self.env.cr.execute(self._queries[kind],
+                                    (self.employee_ids, code))
+                for row in self.env.cr.fetchall():
+                    totals[row[0]].append((row[1], row[2], row[3:]))
+            self._totals[key] = totals
+        return self._totals[key]
+
+    def sum(self, kind, employee_id, code, from_date, to_date=None):
+        """
+        @return: tuple with the sum of each aggregated column over the done
+        payslips of the employee between from_date and to_date, with None
+        for a column no payslip contributes to, like SQL SUM does
+        """
+        if to_date is None:
+            to_date = fields.Date.today()
+        from_date = fields.Date.to_date(from_date)
+        to_date = fields.Date.to_date(to_date)
+        result = [None] * self._columns[kind]
+        for date_from, date_to, sums in self._get_totals(kind, code)[
+                employee_id]:
+            if date_from < from_date or date_to > to_date:
+                continue
+            for index, value in enumerate(sums):
+                if value is not None:
+                    result[index] = (result[index] or 0.0) + value
+        return tuple(result)
+
+
 class HrPayslip(models.Model):
     """Create new model for getting total Payroll Sheet for an Employee"""
     _name = 'hr.payslip'
@@ -182,15 +261,11 @@ class HrPayslip(models.Model):
                   ))
         return super(HrPayslip, self).unlink()
 
-    # TODO move this function into hr_contract module, on hr.employee object
     @api.model
-    def get_contract(self, employee, date_from, date_to):
+    def _get_contract_date_domain(self, date_from, date_to):
         """
-        @param employee: recordset of employee
-        @param date_from: date_field
-        @param date_to: date_field
-        @return: returns the ids of all the contracts for the given employee
-        that need to be considered for the given dates
+        @return: domain matching the contracts that need to be considered
+        for the given dates
         """
         # a contract is valid if it ends between the given dates
         clause_1 = ['&', ('date_end', '<=', date_to),
@@ -202,28 +277,184 @@ class HrPayslip(models.Model):
         # date_end (or never finish)
         clause_3 = ['&', ('date_start', '<=', date_from), '|',
                     ('date_end', '=', False), ('date_end', '>=', date_to)]
+        return ['|', '|'] + clause_1 + clause_2 + clause_3
 
-        clause_final = [('employee_id', '=', employee.id), '|',
-                        '|'] + clause_1 + clause_2 + clause_3
+    # TODO move this function into hr_contract module, on hr.employee object
+    @api.model
+    def get_contract(self, employee, date_from, date_to):
+        """
+        @param employee: recordset of employee
+        @param date_from: date_field
+        @param date_to: date_field
+        @return: returns the ids of all the contracts for the given employee
+        that need to be considered for the given dates
+        """
+        clause_final = [('employee_id', '=', employee.id)] + \
+            self._get_contract_date_domain(date_from, date_to)
         return self.env['hr.version'].search(clause_final).ids
 
+    @api.model
+    def get_contracts_by_employee(self, employees, date_from, date_to):
+        """
+        Set based version of get_contract, resolving the contracts of all
+        the given employees with a single search
+        @param employees: recordset of employees
+        @return: dict {employee_id: list of contract ids}
+        """
+        clause_final = [('employee_id', 'in', employees.ids)] + \
+            self._get_contract_date_domain(date_from, date_to)
+        contracts_by_employee = defaultdict(list)
+        for contract in self.env['hr.version'].search(clause_final):
+            contracts_by_employee[contract.employee_id.id].append(contract.id)
+        return contracts_by_employee
+
+    @api.model
+    def _prepare_payslip_vals_list(self, employees, date_from, date_to,
+                                   default_vals=None):
+        """
+        Build the values of the payslips of several employees at once, the
+        same way onchange_employee fills a single payslip. Contracts are
+        resolved with one search, worked days with one call for all the
+        contracts and the rule inputs once per salary structure.
+        @param employees: recordset of employees
+        @param default_vals: values shared by all the payslips (batch,
+        credit note, ...)
+        @return: list of values ready for create
+        """
+        contracts_by_employee = self.get_contracts_by_employee(
+            employees, date_from, date_to)
+        contracts = self.env['hr.version'].browse(
+            [contract_ids[0] for contract_ids in
+             contracts_by_employee.values()])
+        contracts = contracts.filtered(
+            lambda contract: contract.contract_template_id.struct_id)
+        worked_days_by_contract = defaultdict(list)
+        for line in self.get_worked_day_lines(contracts, date_from, date_to):
+            worked_days_by_contract[line['contract_id']].append(line)
+        inputs_by_structure = {}
+        ttyme = datetime.combine(fields.Date.from_string(date_from), time.min)
+        locale = self.env.context.get('lang') or 'en_US'
+        period = tools.ustr(babel.dates.format_date(
+            date=ttyme, format='MMMM-y', locale=locale))
+        vals_list = []
+        for employee in employees:
+            vals = dict(default_vals or {},
+                        employee_id=employee.id,
+                        name=_('Salary Slip of %s for %s') % (
+                            employee.name, period),
+                        date_from=date_from,
+                        date_to=date_to,
+                        company_id=employee.company_id.id)
+            vals_list.append(vals)
+            contract_ids = contracts_by_employee.get(employee.id)
+            if not contract_ids:
+                continue
+            contract = self.env['hr.version'].browse(contract_ids[0])
+            vals['contract_id'] = contract.id
+            structure = contract.contract_template_id.struct_id
+            if not structure:
+                continue
+            if structure.id not in inputs_by_structure:
+                inputs_by_structure[structure.id] = self.get_inputs(
+                    contract, date_from, date_to)
+            vals.update({
+                'struct_id': structure.id,
+                'worked_days_line_ids': [
+                    (0, 0, line) for line in
+                    worked_days_by_contract[contract.id]],
+                'input_line_ids': [
+                    (0, 0, dict(line, contract_id=contract.id)) for line in
+                    inputs_by_structure[structure.id]],
+            })
+        return vals_list
+
     def action_compute_sheet(self):
         """Function for compute Payslip sheet"""
+        # delete old payslip lines
+        self.line_ids.unlink()
+        self._write_payslip_lines(self._get_payslip_lines_by_payslip())
+        return True
+
+    def _get_payslip_lines_by_payslip(self):
+        """
+        @return: dict {payslip id: list of line values} computed from the
+        salary rules, without writing anything
+        """
+        history = PayslipHistory(self.env, self.employee_id.ids)
+        lines_by_payslip = {}
         for payslip in self:
-            number = payslip.number or self.env['ir.sequence'].next_by_code(
-                'salary.slip')
-            # delete old payslip lines
-            payslip.line_ids.unlink()
             # set the list of contract for which the rules have to be applied
             # if we don't give the contract, then the rules to apply should be
             # for all current contracts of the employee
             contract_ids = payslip.contract_id.ids or \
                            self.get_contract(payslip.employee_id,
                                              payslip.date_from, payslip.date_to)
-            lines = [(0, 0, line) for line in
-                     self._get_payslip_lines(contract_ids, payslip.id)]
+            lines_by_payslip[payslip.id] = self._get_payslip_lines(
+                contract_ids, payslip.id, history=history)
+        return lines_by_payslip
+
+    def _write_payslip_lines(self, lines_by_payslip):
+        """Function for saving the computed lines and the payslip number,
+        following the order of the payslips"""
+        # Look up the snapshots of the rules once for all the payslips
+        rules = self.env['hr.salary.rule'].browse({
+            line['salary_rule_id'] for lines in lines_by_payslip.values()
+            for line in lines})
+        snapshot_ids = self.env[
+            'hr.salary.rule.snapshot']._get_rule_snapshot_ids(rules)
+        for lines in lines_by_payslip.values():
+            for line in lines:
+                line['rule_snapshot_id'] = snapshot_ids[line['salary_rule_id']]
+        for payslip in self:
+            number = payslip.number or self.env['ir.sequence'].next_by_code(
+                'salary.slip')
+            lines = [(0, 0, line) for line in lines_by_payslip[payslip.id]]
             payslip.write({'line_ids': lines, 'number': number})
-        return True
+
+    def action_compute_sheet_parallel(self, workers):
+        """
+        Compute the payslips with several worker processes. The payslips
+        are numbered here in the order of their ids, then split into chunks
+        queued for the crons of the workers, each chunk being computed and
+        committed on its own by a cron worker process, so the payslip
+        numbers and the result do not depend on the workers.
+        @param workers: maximum number of chunks computed at the same time,
+        1 computing the payslips in the current transaction
+        """
+        payslips = self.sorted('id')
+        if workers <= 1 or len(payslips) <= 1:
+            return payslips.action_compute_sheet()
+        for payslip in payslips.filtered(lambda slip: not slip.number):
+            payslip.number = self.env['ir.sequence'].next_by_code(
+                'salary.slip')
+        # Snapshot the rules of the payslips here, so the workers computing
+        # the chunks share the snapshots instead of creating them together
+        structures = (payslips.struct_id |
+                      payslips.contract_id.contract_template_id.struct_id
+                      )._get_parent_structure()
+        self.env['hr.salary.rule.snapshot']._get_rule_snapshot_ids(
+            self.env['hr.salary.rule'].browse(
+                {rule_id for rule_id, sequence in
+                 structures.get_all_rules()}))
+        chunk_size = -(-len(payslips) // workers)
+        Chunk = self.env['hr.payslip.compute.chunk']
+        Chunk.create([{
+            'payslip_run_id': chunk[0].payslip_run_id.id,
+            'payslip_ids': [(6, 0, chunk.ids)],
+        } for chunk in (payslips[index:index + chunk_size]
+                        for index in range(0, len(payslips), chunk_size))])
+        Chunk._trigger_compute_crons(workers)
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('Computation Queued'),
+                'message': _('The payslips will be computed in the '
+                             'background by %s workers.') % workers,
+                'type': 'info',
+                'sticky': False,
+            },
+        }
 
     @api.model
     def get_worked_day_lines(self, contracts, date_from, date_to):
@@ -337,8 +568,12 @@ class HrPayslip(models.Model):
         return res
 
     @api.model
-    def _get_payslip_lines(self, contract_ids, payslip_id):
-        """Function for getting Payslip Lines"""
+    def _get_payslip_lines(self, contract_ids, payslip_id, history=None):
+        """
+        Function for getting Payslip Lines
+        @param history: PayslipHistory shared by the payslips computed
+        together, a new one is used for this payslip employee if not given
+        """
 
         def _sum_salary_rule_category(localdict, category, amount):
             """Function for getting total sum of Salary Rule Category"""
@@ -372,17 +607,8 @@ class HrPayslip(models.Model):
             def sum(self, code, from_date, to_date=None):
                 """Function for getting sum of Payslip with respect to
                  from_date,to_date fields"""
-                if to_date is None:
-                    to_date = fields.Date.today()
-                self.env.cr.execute("""
-                    SELECT sum(amount) as sum
-                    FROM hr_payslip as hp, hr_payslip_input as pi
-                    WHERE hp.employee_id = %s AND hp.state = 'done'
-                    AND hp.date_from >= %s AND hp.date_to <= %s AND hp.id = 
-                    pi.payslip_id AND pi.code = %s""",
-                                    (self.employee_id, from_date, to_date,
-                                        code))
-                return self.env.cr.fetchone()[0] or 0.0
+                return history.sum('input', self.employee_id, code,
+                                   from_date, to_date)[0] or 0.0
 
         class WorkedDays(BrowsableObject):
             """a class that will be used into the python code, mainly for
@@ -391,18 +617,8 @@ class HrPayslip(models.Model):
             def _sum(self, code, from_date, to_date=None):
                 """Function for getting sum of Payslip days with respect to
                  from_date,to_date fields"""
-                if to_date is None:
-                    to_date = fields.Date.today()
-                self.env.cr.execute("""
-                    SELECT sum(number_of_days) as number_of_days, 
-                    sum(number_of_hours) as number_of_hours
-                    FROM hr_payslip as hp, hr_payslip_worked_days as pi
-                    WHERE hp.employee_id = %s AND hp.state = 'done'
-                    AND hp.date_from >= %s AND hp.date_to <= %s AND hp.id = 
-                    pi.payslip_id AND pi.code = %s""",
-                                    (self.employee_id, from_date, to_date,
-                                        code))
-                return self.env.cr.fetchone()
+                return history.sum('worked_days', self.employee_id, code,
+                                   from_date, to_date)
 
             def sum(self, code, from_date, to_date=None):
                 """Function for getting sum of Payslip with respect to
@@ -423,19 +639,8 @@ class HrPayslip(models.Model):
             def sum(self, code, from_date, to_date=None):
                 """Function for getting sum of Payslip with respect to
                  from_date,to_date fields"""
-                if to_date is None:
-                    to_date = fields.Date.today()
-                self.env.cr.execute("""SELECT sum(case when hp.credit_note = 
-                False then (pl.total) else (-pl.total) end)
-                FROM hr_payslip as hp, hr_payslip_line as pl
-                WHERE hp.employee_id = %s AND hp.state = 'done'
-                AND hp.date_from >= %s AND hp.date_to <= %s AND hp.id 
-                = pl.slip_id AND pl.code = %s""",
-                                    (
-                                        self.employee_id, from_date, to_date,
-                                        code))
-                res = self.env.cr.fetchone()
-                return res and res[0] or 0.0
+                return history.sum('line', self.employee_id, code,
+                                   from_date, to_date)[0] or 0.0
 
         # we keep a dict with the result because a value can be overwritten
         # by another rule with the same code
@@ -445,6 +650,8 @@ class HrPayslip(models.Model):
         inputs_dict = {}
         blacklist = []
         payslip = self.env['hr.payslip'].browse(payslip_id)
+        if history is None:
+            history = PayslipHistory(self.env, payslip.employee_id.ids)
         for worked_days_line in payslip.worked_days_line_ids:
             worked_days_dict[worked_days_line.code] = worked_days_line
         for input_line in payslip.input_line_ids:
@@ -507,16 +714,7 @@ class HrPayslip(models.Model):
                         'category_id': rule.category_id.id,
                         'sequence': rule.sequence,
                         'appears_on_payslip': rule.appears_on_payslip,
-                        'condition_select': rule.condition_select,
-                        'condition_python': rule.condition_python,
-                        'condition_range': rule.condition_range,
-                        'condition_range_min': rule.condition_range_min,
-                        'condition_range_max': rule.condition_range_max,
                         'amount_select': rule.amount_select,
-                        'amount_fix': rule.amount_fix,
-                        'amount_python_compute': rule.amount_python_compute,
-                        'amount_percentage': rule.amount_percentage,
-                        'amount_percentage_base': rule.amount_percentage_base,
                         'register_id': rule.register_id.id,
                         'amount': amount,
                         'employee_id': contract.employee_id.id,
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+#############################################################################
+#    A part of Open HRMS Project <https://www.openhrms.com>
+#
+#    Cybrosys Technologies Pvt. Ltd.
+#
+#    Copyright (C) 2025-TODAY Cybrosys Technologies(<https://www.cybrosys.com>)
+#    Author: Cybrosys Techno Solutions(<https://www.cybrosys.com>)
+#
+#    You can modify it under the terms of the GNU LESSER
+#    GENERAL PUBLIC LICENSE (LGPL v3), Version 3.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU LESSER GENERAL PUBLIC LICENSE (LGPL v3) for more details.
+#
+#    You should have received a copy of the GNU LESSER GENERAL PUBLIC LICENSE
+#    (LGPL v3) along with this program.
+#    If not, see <http://www.gnu.org/licenses/>.
+#
+#############################################################################
+import logging
+from odoo import api, fields, models
+
+_logger = logging.getLogger(__name__)
+
+# Number of ir.cron records computing the queued chunks, each of them being
+# run by a cron worker process of its own
+PAYSLIP_COMPUTE_CRON_COUNT = 8
+
+
+class HrPayslipComputeChunk(models.Model):
+    """Chunk of the payslips of a batch queued for computation by the cron
+    worker processes"""
+    _name = 'hr.payslip.compute.chunk'
+    _description = 'Payslip Computation Chunk'
+    _order = 'id'
+
+    payslip_run_id = fields.Many2one('hr.payslip.run', string='Payslip Batch',
+                                     ondelete='cascade',
+                                     help="Batch the payslips belong to")
+    payslip_ids = fields.Many2many('hr.payslip', string='Payslips',
+                                   help="Payslips computed together")
+    state = fields.Selection([
+        ('pending', 'Pending'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ], string='Status', required=True, default='pending', index=True,
+        help="Status of the computation of the chunk")
+    error = fields.Text(string='Error', help="Error raised by the computation")
+
+    @api.model
+    def _trigger_compute_crons(self, workers):
+        """Wake up the crons computing the chunks, one per worker"""
+        for index in range(1, min(workers, PAYSLIP_COMPUTE_CRON_COUNT) + 1):
+            self.env.ref('hr_payroll_community.ir_cron_payslip_compute_%s'
+                         % index)._trigger()
+
+    @api.model
+    def _claim_pending_chunk(self):
+        """Lock the next pending chunk which no other worker is computing"""
+        self.env.cr.execute("""
+            SELECT id FROM hr_payslip_compute_chunk
+            WHERE state = 'pending'
+            ORDER BY id
+            LIMIT 1
+            FOR UPDATE SKIP LOCKED
+        """)
+        row = self.env.cr.fetchone()
+        return self.browse(row[0] if row else [])
+
+    @api.model
+    def _cron_compute_chunks(self):
+        """Compute the pending chunks one after the other, each in its own
+        transaction. The crons of the workers run this at the same time in
+        separate processes, the lock of a chunk keeping the other ones from
+        computing it too."""
+        while True:
+            chunk = self._claim_pending_chunk()
+            if not chunk:
+                return
+            # The computation is rolled back to a savepoint on failure, so
+            # the chunk stays locked until it is marked as failed
+            try:
+                with self.env.cr.savepoint():
+                    chunk.payslip_ids.filtered(
+                        lambda slip: slip.state == 'draft'
+                    ).action_compute_sheet()
+                chunk.write({'state': 'done', 'error': False})
+            except Exception as e:
+                _logger.exception("Failed to compute the payslip chunk %s",
+                                  chunk.id)
+                chunk.write({'state': 'failed', 'error': str(e)})
+            self.env.cr.commit()
@@ -53,6 +53,31 @@ class HrPayslipLine(models.Model):
     total = fields.Float(compute='_compute_total', string='Total',
                          help="Total amount for Payslip",
                          digits='Payroll', store=True)
+    rule_snapshot_id = fields.Many2one('hr.salary.rule.snapshot',
+                                       string='Rule Version', readonly=True,
+                                       index=True,
+                                       help="Version of the salary rule the "
+                                            "line was computed with")
+    # The source of the rule is read from its snapshot rather than copied
+    # on every line
+    condition_select = fields.Selection(
+        related='rule_snapshot_id.condition_select', required=False)
+    condition_python = fields.Text(
+        related='rule_snapshot_id.condition_python', required=False)
+    condition_range = fields.Char(
+        related='rule_snapshot_id.condition_range')
+    condition_range_min = fields.Float(
+        related='rule_snapshot_id.condition_range_min')
+    condition_range_max = fields.Float(
+        related='rule_snapshot_id.condition_range_max')
+    amount_fix = fields.Float(related='rule_snapshot_id.amount_fix')
+    amount_python_compute = fields.Text(
+        related='rule_snapshot_id.amount_python_compute')
+    amount_percentage = fields.Float(
+        related='rule_snapshot_id.amount_percentage')
+    amount_percentage_base = fields.Char(
+        related='rule_snapshot_id.amount_percentage_base')
+    note = fields.Text(related='rule_snapshot_id.note')
 
     @api.depends('quantity', 'amount', 'rate')
     def _compute_total(self):
@@ -74,4 +99,16 @@ class HrPayslipLine(models.Model):
                 if not values['contract_id']:
                     raise UserError(
                         _('You must set a contract to create a payslip line.'))
+        rule_ids = {values['salary_rule_id'] for values in vals_list
+                    if values.get('salary_rule_id') and
+                    not values.get('rule_snapshot_id')}
+        if rule_ids:
+            snapshot_ids = self.env[
+                'hr.salary.rule.snapshot']._get_rule_snapshot_ids(
+                self.env['hr.salary.rule'].browse(rule_ids))
+            for values in vals_list:
+                if values.get('salary_rule_id') and \
+                        not values.get('rule_snapshot_id'):
+                    values['rule_snapshot_id'] = snapshot_ids[
+                        values['salary_rule_id']]
         return super(HrPayslipLine, self).create(vals_list)
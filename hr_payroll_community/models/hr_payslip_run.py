@@ -56,6 +56,21 @@ class HrPayslipRun(models.Model):
                                       "payslips generated from here are refund"
                                       "payslips.")
 
+    compute_chunk_ids = fields.One2many('hr.payslip.compute.chunk',
+                                        'payslip_run_id',
+                                        string='Computation Chunks',
+                                        help="Chunks of payslips queued for "
+                                             "computation by the workers")
+
+    def action_compute_sheets(self):
+        """Function for computing the draft payslips of the batches, with
+        the number of workers set in the payroll settings"""
+        workers = int(self.env['ir.config_parameter'].sudo().get_param(
+            'hr_payroll_community.payslip_compute_workers', 1) or 1)
+        return self.slip_ids.filtered(
+            lambda slip: slip.state == 'draft'
+        ).action_compute_sheet_parallel(workers)
+
     def action_payslip_run(self):
         """Function for state change"""
         return self.write({'state': 'draft'})
@@ -20,10 +20,20 @@
 #    If not, see <http://www.gnu.org/licenses/>.
 #
 #############################################################################
-from odoo import api, fields, models, _
+from odoo import api, fields, models, tools, _
 # from odoo.addons import decimal_precision as dp
 from odoo.exceptions import UserError, ValidationError
-from odoo.tools.safe_eval import safe_eval
+from odoo.tools.safe_eval import _BUILTINS, _SAFE_OPCODES, test_expr, \
+    unsafe_eval
+
+# Rule fields holding python source, with the compile mode of each one
+RULE_CODE_FIELDS = {
+    'quantity': 'eval',
+    'amount_percentage_base': 'eval',
+    'condition_range': 'eval',
+    'amount_python_compute': 'exec',
+    'condition_python': 'exec',
+}
 
 
 class HrSalaryRule(models.Model):
@@ -178,6 +188,36 @@ class HrSalaryRule(models.Model):
             children_rules += rule.child_ids._recursive_search_of_rules()
         return [(rule.id, rule.sequence) for rule in self] + children_rules
 
+    @tools.ormcache('self[field_name]', 'field_name', 'self.code')
+    def _get_compiled_code(self, field_name):
+        """
+        Validate and compile the python source stored in field_name once.
+        The code object is cached on the source itself, so it is shared by
+        every payslip of a batch and by the rules with the same code and
+        source, and can never be stale after an edit of the rule.
+        @param field_name: one of the keys of RULE_CODE_FIELDS
+        @return: code object checked against the safe_eval opcodes
+        """
+        self.ensure_one()
+        return test_expr(self[field_name] or '', _SAFE_OPCODES,
+                         mode=RULE_CODE_FIELDS[field_name],
+                         filename='%s (%s)' % (field_name, self.code))
+
+    def _eval_code(self, field_name, localdict):
+        """
+        Evaluate the compiled expression of field_name in localdict, the
+        same way safe_eval would: localdict is the globals of the rule code,
+        so its variables are also seen by the comprehensions and lambdas of
+        the code, which only gets the safe builtins, and the variables it
+        assigns (result, result_qty, ...) are written back into localdict.
+        """
+        code = self._get_compiled_code(field_name)
+        localdict['__builtins__'] = dict(_BUILTINS)
+        try:
+            return unsafe_eval(code, localdict)
+        finally:
+            localdict.pop('__builtins__', None)
+
     # TODO should add some checks on the type of result (should be float)
     def _compute_rule(self, localdict):
         """
@@ -192,7 +232,7 @@ class HrSalaryRule(models.Model):
             if rec.amount_select == 'fix':
                 try:
                     return rec.amount_fix, float(
-                        safe_eval(rec.quantity, localdict)), 100.0
+                        rec._eval_code('quantity', localdict)), 100.0
                 except:
                     raise UserError(
                         _('Wrong quantity defined for salary rule %s (%s).') % (
@@ -200,8 +240,9 @@ class HrSalaryRule(models.Model):
             elif rec.amount_select == 'percentage':
                 try:
                     return (
-                        float(safe_eval(rec.amount_percentage_base, localdict)),
-                        float(safe_eval(rec.quantity, localdict)),
+                        float(rec._eval_code('amount_percentage_base',
+                                             localdict)),
+                        float(rec._eval_code('quantity', localdict)),
                         rec.amount_percentage)
                 except:
                     raise UserError(
@@ -210,8 +251,7 @@ class HrSalaryRule(models.Model):
                             rec.name, rec.code))
             else:
                 try:
-
-                    safe_eval(rec.amount_python_compute, localdict, mode='exec')
+                    rec._eval_code('amount_python_compute', localdict)
                     return (float(localdict['result']),
                             'result_qty' in localdict and
                             localdict['result_qty'] or 1.0, 'result_rate'
@@ -233,7 +273,7 @@ class HrSalaryRule(models.Model):
             return True
         elif self.condition_select == 'range':
             try:
-                result = safe_eval(self.condition_range, localdict)
+                result = self._eval_code('condition_range', localdict)
                 return (
                             self.condition_range_min <= result <= self.condition_range_max or False)
             except:
@@ -243,8 +283,7 @@ class HrSalaryRule(models.Model):
                         self.name, self.code))
         else:  # python code
             try:
-                safe_eval(self.condition_python, localdict, mode='exec',
-                          nocopy=True)
+                self._eval_code('condition_python', localdict)
                 return 'result' in localdict and localdict['result'] or False
             except:
                 raise UserError(
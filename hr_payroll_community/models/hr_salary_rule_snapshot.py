@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+#############################################################################
+#    A part of Open HRMS Project <https://www.openhrms.com>
+#
+#    Cybrosys Technologies Pvt. Ltd.
+#
+#    Copyright (C) 2025-TODAY Cybrosys Technologies(<https://www.cybrosys.com>)
+#    Author: Cybrosys Techno Solutions(<https://www.cybrosys.com>)
+#
+#    You can modify it under the terms of the GNU LESSER
+#    GENERAL PUBLIC LICENSE (LGPL v3), Version 3.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU LESSER GENERAL PUBLIC LICENSE (LGPL v3) for more details.
+#
+#    You should have received a copy of the GNU LESSER GENERAL PUBLIC LICENSE
+#    (LGPL v3) along with this program.
+#    If not, see <http://www.gnu.org/licenses/>.
+#
+#############################################################################
+import hashlib
+from odoo import api, fields, models
+from odoo.tools import sql
+
+# Rule fields kept in the snapshots instead of every payslip line
+RULE_SNAPSHOT_FIELDS = (
+    'condition_select', 'condition_python', 'condition_range',
+    'condition_range_min', 'condition_range_max', 'amount_fix',
+    'amount_python_compute', 'amount_percentage', 'amount_percentage_base',
+    'note',
+)
+
+# First key of the advisory locks numbering the versions of a rule, the
+# second one being the id of the rule
+SNAPSHOT_LOCK_KEY = 20319
+
+
+class HrSalaryRuleSnapshot(models.Model):
+    """Create new model for keeping the versions of the salary rules the
+    payslip lines were computed with, each version being stored once and
+    shared by all the lines computed with it"""
+    _name = 'hr.salary.rule.snapshot'
+    _description = 'Salary Rule Snapshot'
+    _order = 'salary_rule_id, version'
+    _rec_name = 'salary_rule_id'
+
+    salary_rule_id = fields.Many2one('hr.salary.rule', string='Rule',
+                                     required=True, readonly=True,
+                                     index=True,
+                                     help="Salary rule of the snapshot")
+    version = fields.Integer(string='Version', readonly=True,
+                             help="Version of the salary rule, increased "
+                                  "each time the rule is used with new "
+                                  "values")
+    fingerprint = fields.Char(string='Fingerprint', required=True,
+                              readonly=True, index=True,
+                              help="Hash of the rule and of its values")
+    condition_select = fields.Selection(
+        selection=lambda self: self.env['hr.salary.rule']._fields[
+            'condition_select'].selection,
+        string="Condition Based on", readonly=True)
+    condition_python = fields.Text(string='Python Condition', readonly=True)
+    condition_range = fields.Char(string='Range Based on', readonly=True)
+    condition_range_min = fields.Float(string='Minimum Range',
+                                       readonly=True)
+    condition_range_max = fields.Float(string='Maximum Range',
+                                       readonly=True)
+    amount_fix = fields.Float(string='Fixed Amount', digits='Payroll',
+                              readonly=True)
+    amount_python_compute = fields.Text(string='Python Code', readonly=True)
+    amount_percentage = fields.Float(string='Percentage (%)',
+                                     digits='Payroll Rate', readonly=True)
+    amount_percentage_base = fields.Char(string='Percentage based on',
+                                         readonly=True)
+    note = fields.Text(string='Description', readonly=True)
+
+    def init(self):
+        """Function for making the fingerprints unique"""
+        sql.create_unique_index(self.env.cr,
+                                'hr_salary_rule_snapshot_fingerprint_uniq',
+                                self._table, ['fingerprint'])
+
+    @api.model
+    def _get_fingerprint(self, rule_id, values):
+        """
+        @param values: dict of the values of RULE_SNAPSHOT_FIELDS
+        @return: hash identifying the rule with these values
+        """
+        key = (rule_id,) + tuple(values.get(field_name) or False
+                                 for field_name in RULE_SNAPSHOT_FIELDS)
+        return hashlib.sha1(repr(key).encode()).hexdigest()
+
+    @api.model
+    def _get_snapshot_ids(self, rule_values):
+        """
+        Find or create the snapshots of the rules with the given values,
+        with one search and one insert for all of them
+        @param rule_values: list of tuples (rule id, dict of the values of
+        RULE_SNAPSHOT_FIELDS)
+        @return: list of the snapshot ids, in the order of rule_values
+        """
+        fingerprints = [self._get_fingerprint(rule_id, values)
+                        for rule_id, values in rule_values]
+        snapshot_ids = {
+            snapshot.fingerprint: snapshot.id
+            for snapshot in self.sudo().search(
+                [('fingerprint', 'in', list(set(fingerprints)))])}
+        missing = {}
+        for fingerprint, (rule_id, values) in zip(fingerprints, rule_values):
+            if fingerprint not in snapshot_ids:
+                missing[fingerprint] = (rule_id, values)
+        if missing:
+            snapshot_ids.update(self._create_snapshots(missing))
+        return [snapshot_ids[fingerprint] for fingerprint in fingerprints]
+
+    @api.model
+    def _create_snapshots(self, missing):
+        """
+        Create the snapshots of the given fingerprints. The versions of a
+        rule are numbered under a lock of the rule, held until the end of
+        the transaction, and the snapshots created meanwhile by another
+        transaction are skipped and read back, so concurrent computations
+        of payslips never insert a fingerprint twice.
+        @param missing: dict {fingerprint: (rule id, dict of the values of
+        RULE_SNAPSHOT_FIELDS)}
+        @return: dict {fingerprint: snapshot id}
+        """
+        self.flush_model()
+        cr = self.env.cr
+        rule_ids = sorted({rule_id for rule_id, values in missing.values()})
+        cr.execute("""
+            SELECT pg_advisory_xact_lock(%s, rule_id)
+            FROM unnest(%s) AS rule_id
+            ORDER BY rule_id
+        """, (SNAPSHOT_LOCK_KEY, rule_ids))
+        cr.execute("""
+            SELECT salary_rule_id, MAX(version)
+            FROM hr_salary_rule_snapshot
+            WHERE salary_rule_id = ANY(%s)
+            GROUP BY salary_rule_id
+        """, (rule_ids,))
+        versions = dict(cr.fetchall())
+        cr.execute("""
+            SELECT fingerprint, id FROM hr_salary_rule_snapshot
+            WHERE fingerprint = ANY(%s)
+        """, (list(missing),))
+        snapshot_ids = dict(cr.fetchall())
+        columns = ('salary_rule_id', 'version', 'fingerprint') + \
+            RULE_SNAPSHOT_FIELDS
+        rows = []
+        for fingerprint, (rule_id, values) in missing.items():
+            if fingerprint in snapshot_ids:
+                continue
+            versions[rule_id] = (versions.get(rule_id) or 0) + 1
+            rows.append((rule_id, versions[rule_id], fingerprint) + tuple(
+                values.get(field_name) or None
+                for field_name in RULE_SNAPSHOT_FIELDS))
+        if rows:
+            now = cr.now()
+            placeholders = '(%s)' % ', '.join(['%s'] * (len(columns) + 4))
+            cr.execute(
+                "INSERT INTO hr_salary_rule_snapshot (" + ', '.join(columns) +
+                ", create_uid, create_date, write_uid, write_date) VALUES " +
+                ', '.join([placeholders] * len(rows)) +
+                " ON CONFLICT (fingerprint) DO NOTHING"
+                " RETURNING fingerprint, id",
+                [value for row in rows
+                 for value in row + (self.env.uid, now, self.env.uid, now)])
+            snapshot_ids.update(cr.fetchall())
+            self.invalidate_model()
+        return snapshot_ids
+
+    @api.model
+    def _get_rule_snapshot_ids(self, rules):
+        """
+        @return: dict {rule id: id of the snapshot of its current values}
+        """
+        rule_values = [(rule.id, {field_name: rule[field_name]
+                                  for field_name in RULE_SNAPSHOT_FIELDS})
+                       for rule in rules]
+        return dict(zip(rules.ids, self._get_snapshot_ids(rule_values)))
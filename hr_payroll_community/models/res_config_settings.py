@@ -35,3 +35,9 @@ class ResConfigSettings(models.TransientModel):
                                                help="Is Belgium Payroll")
     module_l10n_in_hr_payroll = fields.Boolean(string='Indian Payroll',
                                                help="Is Indian Payroll")
+    payslip_compute_workers = fields.Integer(
+        string='Payslip Computation Workers', default=1,
+        config_parameter='hr_payroll_community.payslip_compute_workers',
+        help="Number of cron worker processes computing the payslips of a "
+             "batch at the same time, at most 8 and the max_cron_threads of "
+             "the server. 1 computes them in the current transaction.")
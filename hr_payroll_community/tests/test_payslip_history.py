@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+#############################################################################
+#    A part of Open HRMS Project <https://www.openhrms.com>
+#
+#    Cybrosys Technologies Pvt. Ltd.
+#
+#    Copyright (C) 2025-TODAY Cybrosys Technologies(<https://www.cybrosys.com>)
+#    Author: Cybrosys Techno Solutions(<https://www.cybrosys.com>)
+#
+#    You can modify it under the terms of the GNU LESSER
+#    GENERAL PUBLIC LICENSE (LGPL v3), Version 3.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU LESSER GENERAL PUBLIC LICENSE (LGPL v3) for more details.
+#
+#    You should have received a copy of the GNU LESSER GENERAL PUBLIC LICENSE
+#    (LGPL v3) along with this program.
+#    If not, see <http://www.gnu.org/licenses/>.
+#
+#############################################################################
+from odoo.tests import common
+from odoo.addons.hr_payroll_community.models.hr_payslip import PayslipHistory
+
+
+class TestPayslipHistory(common.TransactionCase):
+
+    def setUp(self):
+        super(TestPayslipHistory, self).setUp()
+        self.hr_employee = self.env['hr.employee'].create({
+            'name': 'Payslip History Employee',
+        })
+        contract = self.hr_employee.version_id
+        rule = self.env.ref('hr_payroll_community.hr_rule_basic')
+        for month, credit_note in ((1, False), (2, False), (3, True)):
+            date_from = '2024-%02d-01' % month
+            date_to = '2024-%02d-28' % month
+            self.env['hr.payslip'].create({
+                'employee_id': self.hr_employee.id,
+                'contract_id': contract.id,
+                'date_from': date_from,
+                'date_to': date_to,
+                'credit_note': credit_note,
+                'state': 'done',
+                'line_ids': [(0, 0, {
+                    'name': rule.name,
+                    'code': rule.code,
+                    'category_id': rule.category_id.id,
+                    'salary_rule_id': rule.id,
+                    'contract_id': contract.id,
+                    'employee_id': self.hr_employee.id,
+                    'amount': 1000.0 * month,
+                })],
+                'input_line_ids': [(0, 0, {
+                    'name': 'Commission',
+                    'code': 'COMMISSION',
+                    'contract_id': contract.id,
+                    'date_from': date_from,
+                    'date_to': date_to,
+                    'amount': 10.0 * month,
+                })],
+                'worked_days_line_ids': [(0, 0, {
+                    'name': 'Normal Working Days paid at 100%',
+                    'code': 'WORK100',
+                    'contract_id': contract.id,
+                    'number_of_days': 20.0 + month,
+                    'number_of_hours': 8.0 * (20.0 + month),
+                })],
+            })
+        self.periods = [('2024-01-01', '2024-12-31'),
+                        ('2024-02-01', '2024-03-31'),
+                        ('2024-01-15', '2024-02-28'),
+                        ('2025-01-01', '2025-12-31')]
+
+    def _sql_sum(self, query, code, from_date, to_date):
+        """Per employee aggregate, as the salary rule helpers ran it"""
+        self.env.flush_all()
+        self.env.cr.execute(query, (self.hr_employee.id, from_date, to_date,
+                                    code))
+        return self.env.cr.fetchone()
+
+    def test_00_history_matches_sql(self):
+        """ checking the prefetched totals against the SQL aggregates. """
+        history = PayslipHistory(self.env, self.hr_employee.ids)
+        for from_date, to_date in self.periods:
+            self.assertEqual(
+                history.sum('line', self.hr_employee.id, 'BASIC',
+                            from_date, to_date),
+                self._sql_sum("""
+                    SELECT sum(case when hp.credit_note = False
+                    then (pl.total) else (-pl.total) end)
+                    FROM hr_payslip as hp, hr_payslip_line as pl
+                    WHERE hp.employee_id = %s AND hp.state = 'done'
+                    AND hp.date_from >= %s AND hp.date_to <= %s
+                    AND hp.id = pl.slip_id AND pl.code = %s""",
+                              'BASIC', from_date, to_date))
+            self.assertEqual(
+                history.sum('input', self.hr_employee.id, 'COMMISSION',
+                            from_date, to_date),
+                self._sql_sum("""
+                    SELECT sum(amount)
+                    FROM hr_payslip as hp, hr_payslip_input as pi
+                    WHERE hp.employee_id = %s AND hp.state = 'done'
+                    AND hp.date_from >= %s AND hp.date_to <= %s
+                    AND hp.id = pi.payslip_id AND pi.code = %s""",
+                              'COMMISSION', from_date, to_date))
+            self.assertEqual(
+                history.sum('worked_days', self.hr_employee.id, 'WORK100',
+                            from_date, to_date),
+                self._sql_sum("""
+                    SELECT sum(number_of_days), sum(number_of_hours)
+                    FROM hr_payslip as hp, hr_payslip_worked_days as pi
+                    WHERE hp.employee_id = %s AND hp.state = 'done'
+                    AND hp.date_from >= %s AND hp.date_to <= %s
+                    AND hp.id = pi.payslip_id AND pi.code = %s""",
+                              'WORK100', from_date, to_date))
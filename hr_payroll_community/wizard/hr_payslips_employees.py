@@ -20,9 +20,12 @@
 #    If not, see <http://www.gnu.org/licenses/>.
 #
 #############################################################################
+import logging
 from odoo import fields, models, _
 from odoo.exceptions import UserError
 
+_logger = logging.getLogger(__name__)
+
 
 class HrPayslipEmployees(models.TransientModel):
     """Create new model for Generate payslips for all selected employees"""
@@ -34,10 +37,14 @@ class HrPayslipEmployees(models.TransientModel):
                                     'payslip_id',
                                     'employee_id', 'Employees',
                                     help="Choose employee for Payslip")
+    chunk_size = fields.Integer(string='Commit Every',
+                                help="Number of employees whose payslips are "
+                                     "generated and committed together. "
+                                     "Leave 0 to generate the whole batch in "
+                                     "a single transaction.")
 
     def action_compute_sheet(self):
         """Function for compute Payslip Sheet"""
-        payslips = self.env['hr.payslip']
         [data] = self.read()
         active_id = self.env.context.get('active_id')
         if active_id:
@@ -48,26 +55,20 @@ class HrPayslipEmployees(models.TransientModel):
         if not data['employee_ids']:
             raise UserError(
                 _("You must select employee(s) to generate payslip(s)."))
-        for employee in self.env['hr.employee'].browse(data['employee_ids']):
-            slip_data = (
-                self.env['hr.payslip'].onchange_employee_id(
-                    from_date, to_date, employee.id, contract_id=False))
-            res = {
-                'employee_id': employee.id,
-                'name': slip_data['value'].get('name'),
-                'struct_id': slip_data['value'].get('struct_id'),
-                'contract_id': slip_data['value'].get('contract_id'),
-                'payslip_run_id': active_id,
-                'input_line_ids': [(0, 0, x) for x in
-                                   slip_data['value'].get('input_line_ids')],
-                'worked_days_line_ids': [(0, 0, x) for x in
-                                         slip_data['value'].get(
-                                             'worked_days_line_ids')],
-                'date_from': from_date,
-                'date_to': to_date,
-                'credit_note': run_data.get('credit_note'),
-                'company_id': employee.company_id.id,
-            }
-            payslips += self.env['hr.payslip'].create(res)
-        payslips.action_compute_sheet()
+        employees = self.env['hr.employee'].browse(data['employee_ids'])
+        default_vals = {
+            'payslip_run_id': active_id,
+            'credit_note': run_data.get('credit_note'),
+        }
+        chunk_size = self.chunk_size if self.chunk_size > 0 else len(employees)
+        for index in range(0, len(employees), chunk_size):
+            chunk = employees[index:index + chunk_size]
+            vals_list = self.env['hr.payslip']._prepare_payslip_vals_list(
+                chunk, from_date, to_date, default_vals)
+            self.env['hr.payslip'].create(vals_list).action_compute_sheet()
+            if self.chunk_size > 0:
+                # keep the payslips already generated if a later chunk fails
+                self.env.cr.commit()
+            _logger.info('Payslip batch %s: %s/%s employees processed',
+                         active_id, index + len(chunk), len(employees))
         return {'type': 'ir.actions.act_window_close'}
@@ -20,17 +20,22 @@
 #    If not, see <http://www.gnu.org/licenses/>.
 #
 #############################################################################
+import time
 import pandas as pd
 from collections import defaultdict
 from datetime import timedelta, datetime, date
 from dateutil.relativedelta import relativedelta
 from odoo import api, fields, models, _
 from odoo.http import request
-from odoo.tools import float_utils
+from odoo.tools import float_utils, ormcache
 from odoo.tools import format_duration
 from pytz import utc
 
 ROUNDING_FACTOR = 16
+# Seconds the company wide panels of the dashboard are shared between users
+DASHBOARD_CACHE_TTL = 300
+# Tables whose changes refresh the company wide panels of the dashboard
+DASHBOARD_CHANGE_TABLES = ('hr_employee', 'hr_leave', 'hr_announcement')
 
 
 class HrEmployee(models.Model):
@@ -40,6 +45,72 @@ class HrEmployee(models.Model):
     birthday = fields.Date(string='Date of Birth', groups="base.group_user",
                            help="Birthday of employee")
 
+    @api.model
+    def _get_dashboard_change_marker(self):
+        """Returns the last write date and the number of rows of each table
+        in DASHBOARD_CHANGE_TABLES, which change with any create, write or
+        unlink of their records, in a single query"""
+        self.env.flush_all()
+        self.env.cr.execute(" UNION ALL ".join(
+            "SELECT MAX(write_date), COUNT(*) FROM %s" % table
+            for table in DASHBOARD_CHANGE_TABLES))
+        return tuple(self.env.cr.fetchall())
+
+    @api.model
+    def _get_cached_dashboard_panels(self):
+        """Returns the company wide panels of the dashboard from the cache
+        of the current lang, time slot and change marker"""
+        return self._get_company_dashboard_panels(
+            self.env.lang or 'en_US', int(time.time() // DASHBOARD_CACHE_TTL),
+            self._get_dashboard_change_marker())
+
+    @ormcache('lang', 'time_slot', 'marker')
+    def _get_company_dashboard_panels(self, lang, time_slot, marker):
+        """
+        Compute the panels of the dashboard which are the same for all the
+        users, cached by lang and change marker of the employees, leaves and
+        announcements, for DASHBOARD_CACHE_TTL seconds at most
+        @return: dict of the panels, which must not be modified
+        """
+        employees = self.sudo().with_context(lang=lang)
+        join_resign = employees.join_resign_trends()
+        return {
+            'counts': employees._get_dashboard_counts(),
+            'dept_employee': employees.get_dept_employee(),
+            'department_leave': employees._get_department_leave(),
+            'join_resign_trends': join_resign,
+            'attrition_rate': employees._get_attrition_rate(join_resign),
+        }
+
+    @api.model
+    def get_dashboard_data(self):
+        """Returns all the panels of the dashboard in a single call. The
+        employee of the user is only looked up once, and the company wide
+        panels are shared by all the users for DASHBOARD_CACHE_TTL seconds
+        at most, or until the employees, leaves or announcements change."""
+        is_manager = self.env.user.has_group('hr.group_hr_manager')
+        employee = self.env['hr.employee'].sudo().search_read(
+            [('user_id', '=', self.env.uid)], limit=1)
+        employee_id = employee[0]['id'] if employee else False
+        panels = self._get_cached_dashboard_panels()
+        data = {
+            'is_manager': is_manager,
+            'employee': self._get_employee_details(
+                employee, panels['counts']),
+            'upcoming': self._get_upcoming(self.browse(employee_id)),
+            'project_tasks': self.get_employee_project_tasks(),
+            'leave_trend': self._get_employee_leave_trend(employee_id),
+            'skills': self._get_employee_skill(employee_id),
+        }
+        if is_manager:
+            data.update({
+                'dept_employee': panels['dept_employee'],
+                'department_leave': panels['department_leave'],
+                'join_resign_trends': panels['join_resign_trends'],
+                'attrition_rate': panels['attrition_rate'],
+            })
+        return data
+
     def attendance_manual(self):
         """Create and update an attendance for the user employee"""
         employee = request.env['hr.employee'].sudo().browse(
@@ -86,6 +157,58 @@ class HrEmployee(models.Model):
         uid = request.session.uid
         employee = self.env['hr.employee'].sudo().search_read(
             [('user_id', '=', uid)], limit=1)
+        return self._get_employee_details(
+            employee, self._get_cached_dashboard_panels()['counts'])
+
+    @api.model
+    def _get_dashboard_counts(self):
+        """Returns the company wide counts of leaves and applications
+        shown with the details of the employee"""
+        leaves_to_approve = self.env['hr.leave'].sudo().search_count(
+            [('state', 'in', ['confirm', 'validate1'])])
+        today = datetime.strftime(datetime.today(), '%Y-%m-%d')
+        query = """
+        select count(id)
+        from hr_leave
+        WHERE (hr_leave.date_from::DATE,hr_leave.date_to::DATE) 
+        OVERLAPS ('%s', '%s') and
+        state='validate'""" % (today, today)
+        cr = self._cr
+        cr.execute(query)
+        leaves_today = cr.fetchall()
+        first_day = date.today().replace(day=1)
+        last_day = (date.today() + relativedelta(months=1, day=1)) - timedelta(
+            1)
+        query = """
+                select count(id)
+                from hr_leave
+                WHERE (hr_leave.date_from::DATE,hr_leave.date_to::DATE) 
+                OVERLAPS ('%s', '%s')
+                and  state='validate'""" % (first_day, last_day)
+        cr = self._cr
+        cr.execute(query)
+        leaves_this_month = cr.fetchall()
+        leaves_alloc_req = self.env['hr.leave.allocation'].sudo().search_count(
+            [('state', 'in', ['confirm', 'validate1'])])
+        job_applications = self.env['hr.applicant'].sudo().search_count([])
+        return {
+            'leaves_to_approve': leaves_to_approve,
+            'leaves_today': leaves_today,
+            'leaves_this_month': leaves_this_month,
+            'leaves_alloc_req': leaves_alloc_req,
+            'job_applications': job_applications,
+        }
+
+    @api.model
+    def _get_employee_details(self, employee, counts):
+        """
+        Fetch the details of the employee
+        @param employee: result of search_read for the employee of the user
+        @param counts: company wide counts from _get_dashboard_counts
+        """
+        if not employee:
+            return False
+        uid = self.env.uid
         attendance = self.env['hr.attendance'].sudo().search_read(
             [('employee_id', '=', employee[0]['id'])],
             fields=['id', 'check_in', 'check_out', 'worked_hours'])
@@ -143,39 +266,12 @@ class HrEmployee(models.Model):
             else:
                 line['state'] = 'Refused'
                 line['color'] = 'red'
-        leaves_to_approve = self.env['hr.leave'].sudo().search_count(
-            [('state', 'in', ['confirm', 'validate1'])])
-        today = datetime.strftime(datetime.today(), '%Y-%m-%d')
-        query = """
-        select count(id)
-        from hr_leave
-        WHERE (hr_leave.date_from::DATE,hr_leave.date_to::DATE) 
-        OVERLAPS ('%s', '%s') and
-        state='validate'""" % (today, today)
-        cr = self._cr
-        cr.execute(query)
-        leaves_today = cr.fetchall()
-        first_day = date.today().replace(day=1)
-        last_day = (date.today() + relativedelta(months=1, day=1)) - timedelta(
-            1)
-        query = """
-                select count(id)
-                from hr_leave
-                WHERE (hr_leave.date_from::DATE,hr_leave.date_to::DATE) 
-                OVERLAPS ('%s', '%s')
-                and  state='validate'""" % (first_day, last_day)
-        cr = self._cr
-        cr.execute(query)
-        leaves_this_month = cr.fetchall()
-        leaves_alloc_req = self.env['hr.leave.allocation'].sudo().search_count(
-            [('state', 'in', ['confirm', 'validate1'])])
         timesheet_count = self.env['account.analytic.line'].sudo().search_count(
             [('project_id', '!=', False), ('user_id', '=', uid)])
         contract_count = self.env['hr.version'].sudo().search_count(
             [('employee_id', '=', employee[0]['id'])])
         timesheet_view_id = self.env.ref(
             'hr_timesheet.hr_timesheet_line_search')
-        job_applications = self.env['hr.applicant'].sudo().search_count([])
         if employee:
             sql = """select broad_factor from hr_employee_broad_factor 
             where id =%s"""
@@ -199,22 +295,17 @@ class HrEmployee(models.Model):
             else:
                 experience = False
             if employee:
-                data = {
+                data = dict(counts, **{
                     'broad_factor': broad_factor if broad_factor else 0,
-                    'leaves_to_approve': leaves_to_approve,
-                    'leaves_today': leaves_today,
-                    'leaves_this_month': leaves_this_month,
-                    'leaves_alloc_req': leaves_alloc_req,
                     'emp_timesheets': timesheet_count,
                     'contracts_count': contract_count,
-                    'job_applications': job_applications,
                     'timesheet_view_id': timesheet_view_id,
                     'experience': experience,
                     'age': age,
                     'attendance_lines': attendance_line,
                     'leave_lines': leaves,
                     'expense_lines': expense
-                }
+                })
                 employee[0].update(data)
             return employee
         else:
@@ -223,10 +314,15 @@ class HrEmployee(models.Model):
     @api.model
     def get_upcoming(self):
         """It returns upcoming events, announcements and birthday"""
-        cr = self._cr
         uid = request.session.uid
         employee = self.env['hr.employee'].search([('user_id', '=', uid)],
                                                   limit=1)
+        return self._get_upcoming(employee)
+
+    @api.model
+    def _get_upcoming(self, employee):
+        """Returns the upcoming events, birthdays and the announcements of
+        the employee"""
         today = fields.Date.today()
         birthday_employees = self.env['hr.employee'].search_read(
             [('birthday', '!=', False)], fields=['id', 'name', 'birthday'], order='birthday ASC', limit=4)
@@ -281,6 +377,11 @@ class HrEmployee(models.Model):
         user = self.env.user
         if not user.has_group('hr.group_hr_manager'):
             return [], []
+        return self._get_department_leave()
+
+    @api.model
+    def _get_department_leave(self):
+        """Compute the department monthly wise leave information"""
         month_list = []
         graph_result = []
         for i in range(5, -1, -1):
@@ -389,6 +490,13 @@ class HrEmployee(models.Model):
     @api.model
     def employee_leave_trend(self):
         """Logged employee monthly wise leave information"""
+        employee = self.env['hr.employee'].sudo().search(
+            [('user_id', '=', request.session.uid)], limit=1)
+        return self._get_employee_leave_trend(employee.id)
+
+    @api.model
+    def _get_employee_leave_trend(self, employee_id):
+        """Monthly wise leave information of the employee"""
         leave_lines = []
         month_list = []
         graph_result = []
@@ -396,9 +504,6 @@ class HrEmployee(models.Model):
             last_month = datetime.now() - relativedelta(months=i)
             text = format(last_month, '%B %Y')
             month_list.append(text)
-        uid = request.session.uid
-        employee = self.env['hr.employee'].sudo().search_read(
-            [('user_id', '=', uid)], limit=1)
         for month in month_list:
             vals = {
                 'l_month': month,
@@ -419,7 +524,7 @@ class HrEmployee(models.Model):
                 date_trunc('month', now()) - interval '6 month' and
                 date_trunc('month', GREATEST(y , h.date_from)) <= 
                 date_trunc('month', now()) and h.employee_id = %s """
-        self.env.cr.execute(sql, (employee[0]['id'],))
+        self.env.cr.execute(sql, (employee_id,))
         results = self.env.cr.dictfetchall()
         for line in results:
             employee = self.browse(line['employee_id'])
@@ -515,8 +620,13 @@ class HrEmployee(models.Model):
     @api.model
     def get_attrition_rate(self):
         """Returns monthly wise attrition rate"""
+        return self._get_attrition_rate(self.join_resign_trends())
+
+    @api.model
+    def _get_attrition_rate(self, monthly_join_resign):
+        """Compute the monthly wise attrition rate from the result of
+        join_resign_trends"""
         month_attrition = []
-        monthly_join_resign = self.join_resign_trends()
         month_join = monthly_join_resign[0]['values']
         month_resign = monthly_join_resign[1]['values']
         sql = """
@@ -560,8 +670,13 @@ class HrEmployee(models.Model):
         """ Retrieve employee skills and its progress"""
         employee = self.env['hr.employee'].sudo().search(
             [('user_id', '=', request.session.uid)], limit=1)
+        return self._get_employee_skill(employee.id)
+
+    @api.model
+    def _get_employee_skill(self, employee_id):
+        """Retrieve the skills of the employee and their progress"""
         skills = self.env['hr.employee.skill'].sudo().search_read(
-            [('employee_id', '=', employee.id)])
+            [('employee_id', '=', employee_id)])
         dataset = []
         for rec in skills:
             vals = {
@@ -20,7 +20,8 @@
 #    If not, see <http://www.gnu.org/licenses/>.
 #
 #############################################################################
-from datetime import date, timedelta
+from datetime import date
+from markupsafe import Markup
 from odoo import api, fields, models, _
 from odoo.exceptions import UserError
 
@@ -35,7 +36,7 @@ class HrEmployeeDocument(models.Model):
                        help='You can give your Document number.')
     description = fields.Text(string='Description', copy=False,
                               help="Description of the documents.")
-    expiry_date = fields.Date(string='Expiry Date', copy=False,
+    expiry_date = fields.Date(string='Expiry Date', copy=False, index=True,
                               help="Expiry date of the documents.")
     employee_ref_id = fields.Many2one('hr.employee', invisible=1,
                                       copy=False,
@@ -62,51 +63,69 @@ class HrEmployeeDocument(models.Model):
     ], string='Notification Type',
         help="Select type of the documents expiry notification.")
 
+    def _get_notification_document_ids(self, today):
+        """Returns the ids of the documents to notify about on the given
+        day, the notification rule of each document being evaluated in SQL
+        over its expiry date, number of days and notification type."""
+        self.flush_model(['expiry_date', 'before_days', 'notification_type'])
+        self.env.cr.execute("""
+            SELECT id FROM hr_employee_document
+            WHERE expiry_date IS NOT NULL AND (
+                (notification_type = 'single' AND expiry_date = %(today)s)
+                OR (notification_type = 'multi' AND (
+                    expiry_date - COALESCE(before_days, 0) = %(today)s
+                    OR expiry_date = %(today)s))
+                OR (notification_type = 'everyday'
+                    AND expiry_date - COALESCE(before_days, 0) <= %(today)s)
+                OR (notification_type = 'everyday_after'
+                    AND expiry_date + COALESCE(before_days, 0) >= %(today)s)
+                OR (notification_type IS NULL AND expiry_date - 7 = %(today)s)
+            )
+            ORDER BY employee_ref_id, expiry_date, id
+        """, {'today': today})
+        return [row[0] for row in self.env.cr.fetchall()]
+
+    def _prepare_reminder_mail_values(self, employee):
+        """Returns the values of the digest mail notifying the employee of
+        the expiry of the documents of self."""
+        if len(self) == 1:
+            subject = _('Document-%s Expired On %s') % (
+                self.name, str(self.expiry_date))
+            body = Markup(
+                "Hello %s,<br>Your Document %s is going to expire on %s. "
+                "Please renew it before the expiry date.") % (
+                employee.name, self.name, str(self.expiry_date))
+        else:
+            subject = _('%s Documents Expiring') % len(self)
+            items = Markup('').join(
+                Markup("<li>%s: %s</li>") % (document.name,
+                                               str(document.expiry_date))
+                for document in self)
+            body = Markup(
+                "Hello %s,<br>The following documents are going to expire:"
+                "<ul>%s</ul>Please renew them before their expiry date.") % (
+                employee.name, items)
+        return {
+            'subject': subject,
+            'author_id': self.env.user.partner_id.id,
+            'body_html': body,
+            'email_to': employee.work_email,
+        }
+
     def mail_reminder(self):
-        """Sending document expiry notification to employees."""
-        for record in self.search([('expiry_date', '!=', False)]):
-            exp_date = fields.Date.from_string(record.expiry_date)
-            days_before = timedelta(days=record.before_days or 0)
-            is_expiry_today = fields.Date.today() == exp_date
-            is_notification_day = any([record.notification_type == 'single'
-                                       and is_expiry_today,
-                                       record.notification_type == 'multi'
-                                       and (fields.Date.today() == fields.Date.
-                                            from_string(
-                                           record.expiry_date) - days_before
-                                            or is_expiry_today),
-                                       record.notification_type == 'everyday'
-                                       and fields.Date.today() >= fields.Date.
-                                      from_string(
-                                           record.expiry_date) - days_before,
-                                       record.notification_type ==
-                                       'everyday_after'
-                                       and fields.Date.today() <=
-                                       fields.Date.from_string(
-                                           record.expiry_date) + days_before,
-                                       not record.notification_type and
-                                       fields.Date.today() == fields.Date.
-                                      from_string(
-                                           record.expiry_date) - timedelta(
-                                           days=7), ])
-            if is_notification_day:
-                employee_name = record.employee_ref_id.name
-                document_name = record.name
-                expiry_date_str = str(record.expiry_date)
-                mail_content = (
-                    f"Hello {employee_name},<br>Your Document {document_name} "
-                    f"is going to expire on {expiry_date_str}. "
-                    "Please renew it before the expiry date."
-                )
-                subject = _('Document-%s Expired On %s') % (
-                    document_name, expiry_date_str)
-                main_content = {
-                    'subject': subject,
-                    'author_id': self.env.user.partner_id.id,
-                    'body_html': mail_content,
-                    'email_to': record.employee_ref_id.work_email,
-                }
-                self.env['mail.mail'].create(main_content).send()
+        """Queues a digest of the documents reaching their notification day
+        to each employee, the mails being sent by the mail queue."""
+        documents = self.browse(
+            self._get_notification_document_ids(fields.Date.today()))
+        vals_list = [
+            employee_documents._prepare_reminder_mail_values(employee)
+            for employee, employee_documents in documents.grouped(
+                'employee_ref_id').items()
+            if employee.work_email
+        ]
+        if vals_list:
+            self.env['mail.mail'].create(vals_list)
+            self.env.ref('mail.ir_cron_mail_scheduler_action')._trigger()
 
     @api.constrains('expiry_date')
     def _check_expiry_date(self):
@@ -1,4 +1,7 @@
 import calendar
+import logging
+import time
+from collections import defaultdict
 from datetime import date, datetime
 from dateutil.relativedelta import relativedelta
 
@@ -7,6 +10,11 @@ from odoo.exceptions import UserError, ValidationError
 from odoo.tools import float_compare, float_is_zero
 from markupsafe import Markup
 
+_logger = logging.getLogger(__name__)
+
+# Number of depreciation lines turned into journal entries at once
+DEPRECIATION_CHUNK_SIZE = 500
+
 
 class AccountAssetCategory(models.Model):
     _name = 'account.asset.category'
@@ -219,22 +227,52 @@ class AccountAssetAsset(models.Model):
 
     @api.model
     def _cron_generate_entries(self):
-        self.compute_generated_entries(datetime.today())
+        self.compute_generated_entries(datetime.today(), commit=True)
 
     @api.model
-    def compute_generated_entries(self, date, asset_type=None):
-        # Entries generated : one by grouped category and one by asset from ungrouped category
-        created_move_ids = []
-        type_domain = []
+    def compute_generated_entries(self, date, asset_type=None, commit=False):
+        """ Generates the entries of all the depreciation lines due at date,
+        one by grouped category and one by line of the ungrouped categories.
+        The due lines are fetched with a single search and their entries are
+        created and posted by chunks. With commit, every chunk is committed
+        and a failing chunk is rolled back and logged, its lines being left
+        for the next run.
+        """
+        domain = [('asset_id.state', '=', 'open'), ('depreciation_date', '<=', date), ('move_check', '=', False)]
         if asset_type:
-            type_domain = [('type', '=', asset_type)]
-
-        ungrouped_assets = self.env['account.asset.asset'].search(type_domain + [('state', '=', 'open'), ('category_id.group_entries', '=', False)])
-        created_move_ids += ungrouped_assets._compute_entries(date, group_entries=False)
+            domain.append(('asset_id.category_id.type', '=', asset_type))
+        depreciation_lines = self.env['account.asset.depreciation.line'].search(domain, order='asset_id, sequence, id')
+
+        chunks = []
+        ungrouped_lines = depreciation_lines.filtered(lambda l: not l.asset_id.category_id.group_entries)
+        for index in range(0, len(ungrouped_lines), DEPRECIATION_CHUNK_SIZE):
+            chunks.append((ungrouped_lines[index:index + DEPRECIATION_CHUNK_SIZE], False))
+        lines_by_category = defaultdict(lambda: self.env['account.asset.depreciation.line'])
+        for line in depreciation_lines - ungrouped_lines:
+            lines_by_category[line.asset_id.category_id] |= line
+        for category in sorted(lines_by_category, key=lambda c: c.id):
+            chunks.append((lines_by_category[category], True))
 
-        for grouped_category in self.env['account.asset.category'].search(type_domain + [('group_entries', '=', True)]):
-            assets = self.env['account.asset.asset'].search([('state', '=', 'open'), ('category_id', '=', grouped_category.id)])
-            created_move_ids += assets._compute_entries(date, group_entries=True)
+        created_move_ids = []
+        for index, (lines, group_entries) in enumerate(chunks, 1):
+            start = time.time()
+            try:
+                if group_entries:
+                    move_ids = lines.create_grouped_move()
+                else:
+                    move_ids = lines.create_move()
+                if commit:
+                    self.env.cr.commit()
+            except Exception:
+                if not commit:
+                    raise
+                self.env.cr.rollback()
+                _logger.exception('Asset entries: chunk %s/%s failed, its %s depreciation lines are left for the next run',
+                                  index, len(chunks), len(lines))
+                continue
+            created_move_ids += move_ids
+            _logger.info('Asset entries: chunk %s/%s, %s depreciation lines, %s entries in %.2fs',
+                         index, len(chunks), len(lines), len(move_ids), time.time() - start)
         return created_move_ids
 
     def _compute_board_amount(self, sequence, residual_amount, amount_to_depr,
@@ -284,74 +322,115 @@ class AccountAssetAsset(models.Model):
             undone_dotation_number += 1
         return undone_dotation_number
 
-    def compute_depreciation_board(self):
+    def _compute_depreciation_board_values(self):
+        """ Returns the values of the unposted depreciation lines of the
+        board, following the posted ones, without writing anything.
+        """
         self.ensure_one()
+        board_values = []
+        if self.value_residual == 0.0:
+            return board_values
 
         posted_depreciation_line_ids = self.depreciation_line_ids.filtered(lambda x: x.move_check).sorted(key=lambda l: l.depreciation_date)
-        unposted_depreciation_line_ids = self.depreciation_line_ids.filtered(lambda x: not x.move_check)
-
-        # Remove old unposted depreciation lines. We cannot use unlink() with One2many field
-        commands = [(2, line_id.id, False) for line_id in unposted_depreciation_line_ids]
-
-        if self.value_residual != 0.0:
-            amount_to_depr = residual_amount = self.value_residual
+        amount_to_depr = residual_amount = self.value_residual
+        currency = self.currency_id
+        method_period = self.method_period
+        date_first_depreciation = self.date_first_depreciation
+        prorata = self.prorata
+
+        # if we already have some previous validated entries, starting date is last entry + method period
+        if posted_depreciation_line_ids and posted_depreciation_line_ids[-1].depreciation_date:
+            last_depreciation_date = fields.Date.from_string(posted_depreciation_line_ids[-1].depreciation_date)
+            depreciation_date = last_depreciation_date + relativedelta(months=+method_period)
+        else:
+            # depreciation_date computed from the purchase date
+            depreciation_date = self.date
+            if date_first_depreciation == 'last_day_period':
+                # depreciation_date = the last day of the month
+                depreciation_date = depreciation_date + relativedelta(day=31)
+                # ... or fiscalyear depending the number of period
+                if method_period == 12:
+                    depreciation_date = depreciation_date + relativedelta(month=int(self.company_id.fiscalyear_last_month))
+                    depreciation_date = depreciation_date + relativedelta(day=int(self.company_id.fiscalyear_last_day))
+                    if depreciation_date < self.date:
+                        depreciation_date = depreciation_date + relativedelta(years=1)
+            elif self.first_depreciation_manual_date and self.first_depreciation_manual_date != self.date:
+                # depreciation_date set manually from the 'first_depreciation_manual_date' field
+                depreciation_date = self.first_depreciation_manual_date
+        total_days = (depreciation_date.year % 4) and 365 or 366
+        month_day = depreciation_date.day
+        undone_dotation_number = self._compute_board_undone_dotation_nb(depreciation_date, total_days)
+
+        for x in range(len(posted_depreciation_line_ids), undone_dotation_number):
+            sequence = x + 1
+            amount = self._compute_board_amount(sequence, residual_amount, amount_to_depr,
+                                                undone_dotation_number, posted_depreciation_line_ids,
+                                                total_days, depreciation_date)
+            amount = currency.round(amount)
+            if float_is_zero(amount, precision_rounding=currency.rounding):
+                continue
+            residual_amount -= amount
+            board_values.append({
+                'amount': amount,
+                'asset_id': self.id,
+                'sequence': sequence,
+                'name': (self.code or '') + '/' + str(sequence),
+                'remaining_value': residual_amount,
+                'depreciated_value': self.value - (self.salvage_value + residual_amount),
+                'depreciation_date': depreciation_date,
+            })
+
+            depreciation_date = depreciation_date + relativedelta(months=+method_period)
+
+            if month_day > 28 and date_first_depreciation == 'manual':
+                max_day_in_month = calendar.monthrange(depreciation_date.year, depreciation_date.month)[1]
+                depreciation_date = depreciation_date.replace(day=min(max_day_in_month, month_day))
+
+            # datetime doesn't take into account that the number of days is not the same for each month
+            if not prorata and method_period % 12 != 0 and date_first_depreciation == 'last_day_period':
+                max_day_in_month = calendar.monthrange(depreciation_date.year, depreciation_date.month)[1]
+                depreciation_date = depreciation_date.replace(day=max_day_in_month)
+        return board_values
+
+    def _get_depreciation_line_changes(self, line, vals):
+        """ Returns the values of vals that differ from the depreciation line. """
+        currency = self.currency_id
+        changes = {}
+        for field_name in ('amount', 'remaining_value', 'depreciated_value'):
+            if currency.compare_amounts(line[field_name], vals[field_name]):
+                changes[field_name] = vals[field_name]
+        for field_name in ('name', 'depreciation_date'):
+            if line[field_name] != vals[field_name]:
+                changes[field_name] = vals[field_name]
+        return changes
 
-            # if we already have some previous validated entries, starting date is last entry + method period
-            if posted_depreciation_line_ids and posted_depreciation_line_ids[-1].depreciation_date:
-                last_depreciation_date = fields.Date.from_string(posted_depreciation_line_ids[-1].depreciation_date)
-                depreciation_date = last_depreciation_date + relativedelta(months=+self.method_period)
-            else:
-                # depreciation_date computed from the purchase date
-                depreciation_date = self.date
-                if self.date_first_depreciation == 'last_day_period':
-                    # depreciation_date = the last day of the month
-                    depreciation_date = depreciation_date + relativedelta(day=31)
-                    # ... or fiscalyear depending the number of period
-                    if self.method_period == 12:
-                        depreciation_date = depreciation_date + relativedelta(month=int(self.company_id.fiscalyear_last_month))
-                        depreciation_date = depreciation_date + relativedelta(day=int(self.company_id.fiscalyear_last_day))
-                        if depreciation_date < self.date:
-                            depreciation_date = depreciation_date + relativedelta(years=1)
-                elif self.first_depreciation_manual_date and self.first_depreciation_manual_date != self.date:
-                    # depreciation_date set manually from the 'first_depreciation_manual_date' field
-                    depreciation_date = self.first_depreciation_manual_date
-            total_days = (depreciation_date.year % 4) and 365 or 366
-            month_day = depreciation_date.day
-            undone_dotation_number = self._compute_board_undone_dotation_nb(depreciation_date, total_days)
-
-            for x in range(len(posted_depreciation_line_ids), undone_dotation_number):
-                sequence = x + 1
-                amount = self._compute_board_amount(sequence, residual_amount, amount_to_depr,
-                                                    undone_dotation_number, posted_depreciation_line_ids,
-                                                    total_days, depreciation_date)
-                amount = self.currency_id.round(amount)
-                if float_is_zero(amount, precision_rounding=self.currency_id.rounding):
+    def compute_depreciation_board(self):
+        """ Recomputes the unposted part of the depreciation boards. The new
+        schedule is compared to the existing unposted lines by sequence, so
+        only the lines that changed are updated, and the missing or extra
+        lines of all the assets are created and deleted at once.
+        """
+        lines_to_create = []
+        lines_to_unlink = self.env['account.asset.depreciation.line']
+        for asset in self:
+            unposted_lines = {}
+            for line in asset.depreciation_line_ids.filtered(lambda x: not x.move_check):
+                if line.sequence in unposted_lines:
+                    lines_to_unlink |= line
+                else:
+                    unposted_lines[line.sequence] = line
+            for vals in asset._compute_depreciation_board_values():
+                line = unposted_lines.pop(vals['sequence'], None)
+                if not line:
+                    lines_to_create.append(vals)
                     continue
-                residual_amount -= amount
-                vals = {
-                    'amount': amount,
-                    'asset_id': self.id,
-                    'sequence': sequence,
-                    'name': (self.code or '') + '/' + str(sequence),
-                    'remaining_value': residual_amount,
-                    'depreciated_value': self.value - (self.salvage_value + residual_amount),
-                    'depreciation_date': depreciation_date,
-                }
-                commands.append((0, False, vals))
-
-                depreciation_date = depreciation_date + relativedelta(months=+self.method_period)
-
-                if month_day > 28 and self.date_first_depreciation == 'manual':
-                    max_day_in_month = calendar.monthrange(depreciation_date.year, depreciation_date.month)[1]
-                    depreciation_date = depreciation_date.replace(day=min(max_day_in_month, month_day))
-
-                # datetime doesn't take into account that the number of days is not the same for each month
-                if not self.prorata and self.method_period % 12 != 0 and self.date_first_depreciation == 'last_day_period':
-                    max_day_in_month = calendar.monthrange(depreciation_date.year, depreciation_date.month)[1]
-                    depreciation_date = depreciation_date.replace(day=max_day_in_month)
-
-        self.write({'depreciation_line_ids': commands})
-
+                changes = asset._get_depreciation_line_changes(line, vals)
+                if changes:
+                    line.write(changes)
+            for line in unposted_lines.values():
+                lines_to_unlink |= line
+        lines_to_unlink.unlink()
+        self.env['account.asset.depreciation.line'].create(lines_to_create)
         return True
 
     def validate(self):
@@ -506,26 +585,16 @@ class AccountAssetAsset(models.Model):
         default['name'] = self.name + _(' (copy)')
         return super(AccountAssetAsset, self).copy_data(default)
 
-    def _compute_entries(self, date, group_entries=False):
-        depreciation_ids = self.env['account.asset.depreciation.line'].search([
-            ('asset_id', 'in', self.ids), ('depreciation_date', '<=', date),
-            ('move_check', '=', False)])
-        if group_entries:
-            return depreciation_ids.create_grouped_move()
-        return depreciation_ids.create_move()
-
     @api.model_create_multi
     def create(self, vals_list):
         assets = super(AccountAssetAsset, self.with_context(mail_create_nolog=True)).create(vals_list)
-        for asset in assets:
-            asset.sudo().compute_depreciation_board()
+        assets.sudo().compute_depreciation_board()
         return assets
 
     def write(self, vals):
         res = super(AccountAssetAsset, self).write(vals)
         if 'depreciation_line_ids' not in vals and 'state' not in vals:
-            for rec in self:
-                rec.compute_depreciation_board()
+            self.compute_depreciation_board()
         return res
 
     def open_entries(self):
@@ -582,14 +651,11 @@ class AccountAssetDepreciationLine(models.Model):
             line.move_posted_check = True if line.move_id and line.move_id.state == 'posted' else False
 
     def create_move(self, post_move=True):
-        created_moves = self.env['account.move']
-        for line in self:
-            if line.move_id:
-                raise UserError(_('This depreciation is already linked to a journal entry. Please post or delete it.'))
-            move_vals = self._prepare_move(line)
-            move = self.env['account.move'].create(move_vals)
-            line.write({'move_id': move.id, 'move_check': True})
-            created_moves |= move
+        if any(line.move_id for line in self):
+            raise UserError(_('This depreciation is already linked to a journal entry. Please post or delete it.'))
+        created_moves = self.env['account.move'].create([self._prepare_move(line) for line in self])
+        for line, move in zip(self, created_moves):
+            line.move_id = move
 
         if post_move and created_moves:
             created_moves.filtered(lambda m: any(m.asset_depreciation_ids.mapped('asset_id.category_id.open_asset'))).action_post()
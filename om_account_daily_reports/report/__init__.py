@@ -1,3 +1,4 @@
+from . import report_ledger
 from . import report_daybook
 from . import report_cashbook
 from . import report_bankbook
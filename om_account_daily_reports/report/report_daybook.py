@@ -1,74 +1,47 @@
+import itertools
 import time
 from odoo import api, models, fields, _
 from odoo.exceptions import UserError
-from datetime import timedelta, datetime
 
 
 class ReportDayBook(models.AbstractModel):
     _name = 'report.om_account_daily_reports.report_daybook'
+    _inherit = 'account.daily.ledger'
     _description = 'Day Book'
 
-    def _get_account_move_entry(self, accounts, form_data, date):
-        cr = self.env.cr
-        MoveLine = self.env['account.move.line']
-        init_wheres = [""]
-
-        init_tables, init_where_clause, init_where_params =MoveLine._query_get()
-        if init_where_clause.strip():
-            init_wheres.append(init_where_clause.strip())
-        if form_data['target_move'] == 'posted':
-            target_move = "AND m.state = 'posted'"
-        else:
-            target_move = ''
+    def _iter_day_entries(self, accounts, form_data, date_from, date_to):
+        """
+        Yields, day by day, the dates between date_from and date_to having
+        move lines, with their lines and their debit, credit and balance
+        totals. The whole range comes from a single query ordered by date,
+        the totals of the days being computed by the database.
+        """
+        rows = self._iter_ledger_rows(
+            accounts, journal_ids=form_data['journal_ids'], date_from=date_from,
+            date_to=date_to, target_move=form_data['target_move'], partition='date')
+        for date, lines in itertools.groupby(rows, key=lambda row: row['ldate']):
+            lines = list(lines)
+            for line in lines:
+                line['balance'] = line['debit'] - line['credit']
+            debit = lines[0]['partition_debit']
+            credit = lines[0]['partition_credit']
+            yield {
+                'date': date,
+                'debit': debit,
+                'credit': credit,
+                'balance': debit - credit,
+                'move_lines': lines,
+            }
 
-        sql = ("""
-                    SELECT 0 AS lid, 
-                          l.account_id AS account_id, l.date AS ldate, j.code AS lcode, 
-                          l.amount_currency AS amount_currency,l.ref AS lref,l.name AS lname, 
-                          COALESCE(SUM(l.credit),0.0) AS credit,COALESCE(l.debit,0) AS debit,COALESCE(SUM(l.debit),0) - COALESCE(SUM(l.credit),0) as balance, 
-                              m.name AS move_name, 
-                              c.symbol AS currency_code, 
-                              p.name AS lpartner_id, 
-                              m.id AS mmove_id 
-                            FROM 
-                              account_move_line l 
-                              LEFT JOIN account_move m ON (l.move_id = m.id) 
-                              LEFT JOIN res_currency c ON (l.currency_id = c.id) 
-                              LEFT JOIN res_partner p ON (l.partner_id = p.id) 
-                              JOIN account_journal j ON (l.journal_id = j.id) 
-                              JOIN account_account acc ON (l.account_id = acc.id) 
-                            WHERE 
-                              l.account_id IN %s 
-                              AND l.journal_id IN %s """ + target_move + """ 
-                              AND l.date = %s 
-                            GROUP BY 
-                              l.id, 
-                              l.account_id, 
-                              l.date, 
-                              m.name, 
-                              m.id, 
-                              p.name, 
-                              c.symbol, 
-                              j.code, 
-                              l.ref 
-                            ORDER BY 
-                              l.date DESC
-                     """)
-
-        where_params = (tuple(accounts.ids), tuple(form_data['journal_ids']), date)
-        cr.execute(sql, where_params)
-        data = cr.dictfetchall()
-        res = {}
-        debit = credit = balance = 0.00
-        for line in data:
-            debit += line['debit']
-            credit += line['credit']
-            balance += line['balance']
-        res['debit'] = debit
-        res['credit'] = credit
-        res['balance'] = balance
-        res['lines'] = data
-        return res
+    def _get_account_move_entry(self, accounts, form_data, date):
+        for day in self._iter_day_entries(accounts, form_data, date, date):
+            return {
+                'debit': day['debit'],
+                'credit': day['credit'],
+                'balance': day['balance'],
+                'lines': day['move_lines'],
+            }
+        return {'debit': 0.0, 'credit': 0.0, 'balance': 0.0, 'lines': []}
 
     @api.model
     def _get_report_values(self, docids, data=None):
@@ -85,23 +58,7 @@ class ReportDayBook(models.AbstractModel):
         if data['form'].get('journal_ids', False):
             codes = [journal.code for journal in
                      self.env['account.journal'].browse(data['form']['journal_ids'])]
-        accounts = self.env['account.account'].search([])
-        dates = []
-        record = []
-        days_total = date_to - date_from
-        for day in range(days_total.days + 1):
-            dates.append(date_from + timedelta(days=day))
-        for date in dates:
-            date_data = str(date)
-            accounts_res = self.with_context(data['form'].get('comparison_context', {}))._get_account_move_entry(accounts, form_data, date_data)
-            if accounts_res['lines']:
-                record.append({
-                    'date': date,
-                    'debit': accounts_res['debit'],
-                    'credit': accounts_res['credit'],
-                    'balance': accounts_res['balance'],
-                    'move_lines': accounts_res['lines']
-                })
+        record = self._iter_day_entries(None, form_data, date_from, date_to)
         return {
             'doc_ids': docids,
             'doc_model': model,
@@ -0,0 +1,177 @@
+from odoo import api, models
+
+# Columns the move lines can be sorted on, inside an account or a date
+LEDGER_SORTS = {
+    'sort_date': 'ldate, move_id',
+    'sort_journal_partner': 'lcode, partner_name, move_id',
+}
+
+
+class AccountDailyLedger(models.AbstractModel):
+    _name = 'account.daily.ledger'
+    _description = 'Daily Reports Ledger'
+
+    @api.model
+    def _iter_ledger_rows(self, accounts=None, journal_ids=None, date_from=None,
+                          date_to=None, target_move='all', init_balance=False,
+                          sortby='sort_date', partition='account'):
+        """
+        Yields the move lines of the books as dictionaries, in a single
+        query read through a server side cursor.
+
+        :param accounts: the recordset of accounts, all the accounts if None
+        :param journal_ids: the ids of the journals, all the journals if None
+        :param date_from: the first date of the lines, or None
+        :param date_to: the last date of the lines, or None
+        :param target_move: 'posted' to only read posted entries, or 'all'
+        :param init_balance: when partitioned by account, yields first an
+            'Initial Balance' row per account summing the lines before
+            date_from
+        :param sortby: 'sort_date' or 'sort_journal_partner'
+        :param partition: 'account' to order the lines by account, in the
+            order of accounts, or 'date' to order them by date
+
+        Every row holds the running balance of its partition in 'balance',
+        and the total debit and credit of its partition in
+        'partition_debit' and 'partition_credit'.
+        """
+        MoveLine = self.env['account.move.line']
+        MoveLine.check_access('read')
+        init_balance = bool(init_balance and date_from and partition == 'account')
+        wheres = [
+            "l.display_type NOT IN ('line_section', 'line_note')",
+            "l.parent_state != 'cancel'",
+            "l.company_id IN %(company_ids)s",
+        ]
+        params = {
+            'company_ids': tuple(self.env.companies.ids),
+            'date_from': date_from,
+        }
+        if accounts is not None:
+            if not accounts:
+                return
+            wheres.append("l.account_id IN %(account_ids)s")
+            params['account_ids'] = tuple(accounts.ids)
+            params['account_order'] = accounts.ids
+        if journal_ids:
+            wheres.append("l.journal_id IN %(journal_ids)s")
+            params['journal_ids'] = tuple(journal_ids)
+        if target_move == 'posted':
+            wheres.append("l.parent_state = 'posted'")
+        if date_to:
+            wheres.append("l.date <= %(date_to)s")
+            params['date_to'] = date_to
+        if date_from and not init_balance:
+            wheres.append("l.date >= %(date_from)s")
+
+        sort = LEDGER_SORTS.get(sortby, LEDGER_SORTS['sort_date'])
+        if partition == 'account':
+            partition_column = 'account_id'
+            window_order = 'initial DESC, ' + sort
+            if accounts is not None:
+                order = 'array_position(%(account_order)s::int[], account_id), ' + window_order
+            else:
+                order = 'account_id, ' + window_order
+        else:
+            partition_column = 'ldate'
+            window_order = order = 'ldate, ' + sort
+        initial = 'l.date < %(date_from)s' if init_balance else 'FALSE'
+
+        # The lines before date_from come first in the window of their
+        # account, so that the running balance of the following lines
+        # starts from the initial balance, then they are summed up into a
+        # single row.
+        sql = '''
+            WITH ledger AS (
+                SELECT l.id AS lid, l.account_id AS account_id, l.date AS ldate,
+                    j.code AS lcode, l.currency_id, l.amount_currency,
+                    l.ref AS lref, l.name AS lname, l.move_id,
+                    COALESCE(l.debit, 0) AS debit, COALESCE(l.credit, 0) AS credit,
+                    m.name AS move_name, c.symbol AS currency_code,
+                    p.name AS partner_name, ''' + initial + ''' AS initial
+                FROM account_move_line l
+                JOIN account_move m ON (l.move_id = m.id)
+                LEFT JOIN res_currency c ON (l.currency_id = c.id)
+                LEFT JOIN res_partner p ON (l.partner_id = p.id)
+                JOIN account_journal j ON (l.journal_id = j.id)
+                WHERE ''' + ' AND '.join(wheres) + '''
+            ), ledger_balance AS (
+                SELECT ledger.*,
+                    SUM(debit - credit) OVER (
+                        PARTITION BY ''' + partition_column + ''' ORDER BY ''' + window_order + ''', lid
+                        ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW) AS balance,
+                    SUM(debit) OVER (PARTITION BY ''' + partition_column + ''') AS partition_debit,
+                    SUM(credit) OVER (PARTITION BY ''' + partition_column + ''') AS partition_credit
+                FROM ledger
+            )
+            SELECT * FROM (
+            SELECT 0 AS lid, account_id, NULL AS ldate, '' AS lcode,
+                NULL AS currency_id, 0.0 AS amount_currency, '' AS lref,
+                'Initial Balance' AS lname, NULL AS move_id,
+                SUM(debit) AS debit, SUM(credit) AS credit, '' AS move_name,
+                '' AS currency_code, '' AS partner_name, TRUE AS initial,
+                SUM(debit - credit) AS balance,
+                MAX(partition_debit) AS partition_debit,
+                MAX(partition_credit) AS partition_credit
+            FROM ledger_balance WHERE initial
+            GROUP BY account_id
+            UNION ALL
+            SELECT * FROM ledger_balance WHERE NOT initial
+            ) AS ledger_rows
+            ORDER BY ''' + order + ''', lid'''
+        yield from MoveLine._iter_query_rows(sql, params)
+
+    def _get_journal_accounts(self, journal_type):
+        journals = self.env['account.journal'].search([('type', '=', journal_type)])
+        accounts = self.env['account.account']
+        for journal in journals:
+            for acc_out in journal.outbound_payment_method_line_ids:
+                if acc_out.payment_account_id:
+                    accounts += acc_out.payment_account_id
+            for acc_in in journal.inbound_payment_method_line_ids:
+                if acc_in.payment_account_id:
+                    accounts += acc_in.payment_account_id
+        return accounts
+
+    def _iter_account_move_entry(self, accounts, form_data, init_balance, sortby, display_account):
+        """
+        :param:
+                accounts: the recordset of accounts
+                form_data: the values of the wizard
+                init_balance: boolean value of initial_balance
+                sortby: sorting by date or partner and journal
+                display_account: type of account (receivable, payable and both)
+
+        Yields a dictionary per account with following key and value:
+            {
+                'code': account code,
+                'name': account name,
+                'debit': sum of total debit amount,
+                'credit': sum of total credit amount,
+                'balance': total balance,
+                'move_lines': list of move lines
+            }
+        """
+        rows = self._iter_ledger_rows(
+            accounts, journal_ids=form_data.get('journal_ids'),
+            date_from=form_data.get('date_from'), date_to=form_data.get('date_to'),
+            target_move=form_data.get('target_move', 'all'),
+            init_balance=init_balance, sortby=sortby)
+        row = next(rows, None)
+        for account in accounts:
+            currency = account.currency_id or self.env.company.currency_id
+            res = {fn: 0.0 for fn in ['credit', 'debit', 'balance']}
+            res.update({'code': account.code, 'name': account.name, 'move_lines': []})
+            while row is not None and row['account_id'] == account.id:
+                res['move_lines'].append(row)
+                res['debit'] += row['debit']
+                res['credit'] += row['credit']
+                res['balance'] = row['balance']
+                row = next(rows, None)
+
+            if display_account == 'all':
+                yield res
+            elif display_account == 'movement' and res.get('move_lines'):
+                yield res
+            elif display_account == 'not_zero' and not currency.is_zero(res['balance']):
+                yield res
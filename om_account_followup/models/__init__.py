@@ -2,6 +2,7 @@
 
 from . import account_move
 from . import followup
+from . import followup_balance
 from . import followup_partner
 from . import partner
 from . import settings
@@ -4,6 +4,12 @@ from odoo import api, fields, models, _
 class AccountMoveLine(models.Model):
     _inherit = 'account.move.line'
 
+    # Fields the follow-up receivable balance of the partners depends on
+    _FOLLOWUP_BALANCE_FIELDS = {
+        'partner_id', 'company_id', 'account_id', 'date', 'date_maturity',
+        'debit', 'credit', 'balance', 'full_reconcile_id',
+    }
+
     followup_line_id = fields.Many2one('followup.line', 'Follow-up Level')
     followup_date = fields.Date('Latest Follow-up')
     result = fields.Float(compute='_get_result', string="Balance Amount")
@@ -11,3 +17,44 @@ class AccountMoveLine(models.Model):
     def _get_result(self):
         for aml in self:
             aml.result = aml.debit - aml.credit
+
+    def _get_followup_partner_ids(self):
+        return self.filtered(
+            lambda aml: aml.account_id.account_type == 'asset_receivable').partner_id.ids
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        lines = super(AccountMoveLine, self).create(vals_list)
+        self.env['followup.partner.balance']._refresh(lines._get_followup_partner_ids())
+        return lines
+
+    def write(self, vals):
+        if not self._FOLLOWUP_BALANCE_FIELDS.intersection(vals):
+            return super(AccountMoveLine, self).write(vals)
+        partner_ids = self._get_followup_partner_ids()
+        res = super(AccountMoveLine, self).write(vals)
+        self.env['followup.partner.balance']._refresh(partner_ids + self._get_followup_partner_ids())
+        return res
+
+    def unlink(self):
+        partner_ids = self._get_followup_partner_ids()
+        res = super(AccountMoveLine, self).unlink()
+        self.env['followup.partner.balance']._refresh(partner_ids)
+        return res
+
+
+class AccountFullReconcile(models.Model):
+    _inherit = 'account.full.reconcile'
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        reconciles = super(AccountFullReconcile, self).create(vals_list)
+        self.env['followup.partner.balance']._refresh(
+            reconciles.reconciled_line_ids._get_followup_partner_ids())
+        return reconciles
+
+    def unlink(self):
+        partner_ids = self.reconciled_line_ids._get_followup_partner_ids()
+        res = super(AccountFullReconcile, self).unlink()
+        self.env['followup.partner.balance']._refresh(partner_ids)
+        return res
@@ -0,0 +1,52 @@
+from odoo import api, fields, models
+
+# Open receivable balance of the partners, by company and due date
+FOLLOWUP_BALANCE_QUERY = """
+    SELECT l.partner_id, l.company_id,
+        COALESCE(l.date_maturity, l.date) AS date_maturity,
+        SUM(l.debit - l.credit) AS balance
+    FROM account_move_line l
+    JOIN account_account a ON a.id = l.account_id
+    WHERE a.account_type = 'asset_receivable'
+        AND l.full_reconcile_id IS NULL
+        AND l.partner_id IS NOT NULL
+        %s
+    GROUP BY l.partner_id, l.company_id, COALESCE(l.date_maturity, l.date)
+"""
+
+
+class FollowupPartnerBalance(models.Model):
+    _name = "followup.partner.balance"
+    _description = "Follow-up Receivable Balance by Partner"
+    _rec_name = 'partner_id'
+    _log_access = False
+
+    partner_id = fields.Many2one('res.partner', 'Partner', required=True, readonly=True,
+                                 index=True, ondelete='cascade')
+    company_id = fields.Many2one('res.company', 'Company', required=True, readonly=True,
+                                 ondelete='cascade')
+    date_maturity = fields.Date('Due Date', readonly=True)
+    balance = fields.Float('Balance', readonly=True)
+
+    def init(self):
+        self.env.cr.execute("DELETE FROM followup_partner_balance")
+        self.env.cr.execute("""
+            INSERT INTO followup_partner_balance (partner_id, company_id, date_maturity, balance)
+        """ + FOLLOWUP_BALANCE_QUERY % '')
+
+    @api.model
+    def _refresh(self, partner_ids):
+        """ Rebuilds the rows of the given partners from their open
+        receivable move lines, called whenever those lines change. """
+        partner_ids = tuple(set(partner_id for partner_id in partner_ids if partner_id))
+        if not partner_ids:
+            return
+        self.env['account.move.line'].flush_model([
+            'partner_id', 'company_id', 'account_id', 'date', 'date_maturity',
+            'debit', 'credit', 'full_reconcile_id',
+        ])
+        self.env.cr.execute("DELETE FROM followup_partner_balance WHERE partner_id IN %s", (partner_ids,))
+        self.env.cr.execute("""
+            INSERT INTO followup_partner_balance (partner_id, company_id, date_maturity, balance)
+        """ + FOLLOWUP_BALANCE_QUERY % 'AND l.partner_id IN %s', (partner_ids,))
+        self.invalidate_model()
@@ -1,3 +1,4 @@
+import operator
 from functools import reduce
 from lxml import etree
 from odoo import api, fields, models, _
@@ -5,6 +6,15 @@ from datetime import datetime
 from odoo.exceptions import ValidationError
 from odoo.tools.misc import formatLang
 
+SEARCH_OPERATORS = {
+    '=': operator.eq,
+    '!=': operator.ne,
+    '>': operator.gt,
+    '>=': operator.ge,
+    '<': operator.lt,
+    '<=': operator.le,
+}
+
 
 class ResPartner(models.Model):
     _inherit = "res.partner"
@@ -252,98 +262,60 @@ class ResPartner(models.Model):
     def _get_amounts_and_date(self):
         company = self.env.user.company_id
         current_date = fields.Date.today()
+        amounts = {}
+        partner_ids = tuple(self._origin.ids)
+        if partner_ids:
+            self.env.cr.execute("""
+                SELECT partner_id, SUM(balance),
+                    COALESCE(SUM(balance) FILTER (WHERE date_maturity <= %s), 0),
+                    MIN(date_maturity)
+                FROM followup_partner_balance
+                WHERE partner_id IN %s AND company_id = %s
+                GROUP BY partner_id""", (current_date, partner_ids, company.id))
+            amounts = {row[0]: row[1:] for row in self.env.cr.fetchall()}
         for partner in self:
-            worst_due_date = False
-            amount_due = amount_overdue = 0.0
-            for aml in partner.unreconciled_aml_ids:
-                if (aml.company_id == company):
-                    date_maturity = aml.date_maturity or aml.date
-                    if not worst_due_date or date_maturity < worst_due_date:
-                        worst_due_date = date_maturity
-                    amount_due += aml.result
-                    if (date_maturity <= current_date):
-                        amount_overdue += aml.result
+            amount_due, amount_overdue, worst_due_date = amounts.get(
+                partner._origin.id, (0.0, 0.0, False))
             partner.payment_amount_due = amount_due
             partner.payment_amount_overdue = amount_overdue
             partner.payment_earliest_due_date = worst_due_date
 
-    def _get_followup_overdue_query(self, args, overdue_only=False):
+    def _search_followup_balance(self, aggregate, operator, value, params=()):
+        """ Returns the domain of the partners whose aggregated follow-up
+        balance in the company of the user compares to the value. """
+        if operator not in SEARCH_OPERATORS:
+            raise ValueError(f"Unsupported operator: {operator}")
         company_id = self.env.user.company_id.id
-        having_clauses = []
-        having_values = []
-
-        for field, operator, value in args:
-            if operator in ['=', '!=', '>', '>=', '<', '<=']:
-                having_clauses.append(f'SUM(bal2) {operator} %s')
-                having_values.append(value)
-            else:
-                raise ValueError(f"Unsupported operator: {operator}")
-
-        having_where_clause = ' AND '.join(having_clauses)
-        overdue_only_str = 'AND date_maturity <= NOW()' if overdue_only else ''
-
-        query = ('''
-            SELECT pid AS partner_id, SUM(bal2) FROM (
-                SELECT 
-                    CASE WHEN bal IS NOT NULL THEN bal ELSE 0.0 END AS bal2, 
-                    p.id as pid 
-                FROM (
-                    SELECT 
-                        (debit - credit) AS bal, 
-                        partner_id 
-                    FROM account_move_line l
-                    LEFT JOIN account_account a ON a.id = l.account_id
-                    WHERE a.account_type = 'asset_receivable'
-                    %s AND full_reconcile_id IS NULL
-                    AND l.company_id = %%s
-                ) AS l
-                RIGHT JOIN res_partner p ON p.id = partner_id 
-            ) AS pl
-            GROUP BY pid HAVING %s
-        ''') % (overdue_only_str, having_where_clause)
-
-        params = [company_id] + having_values
-        return query, params
-
-    def _payment_overdue_search(self, operator, operand):
-        args = [('payment_amount_overdue', operator, operand)]
-        query, params = self._get_followup_overdue_query(args, overdue_only=True)
-        self.env.cr.execute(query, params)
+        query = """
+            SELECT partner_id FROM followup_partner_balance
+            WHERE company_id = %%s
+            GROUP BY partner_id HAVING %s %s %%s""" % (aggregate, operator)
+        self.env.cr.execute(query, (company_id,) + tuple(params) + (value,))
         res = self.env.cr.fetchall()
         if not res:
             return [('id', '=', '0')]
         return [('id', 'in', [x[0] for x in res])]
 
+    def _search_followup_amount(self, aggregate, operator, value, params=()):
+        domain = self._search_followup_balance(aggregate, operator, value, params)
+        # partners without open receivable have an amount of 0
+        if operator in SEARCH_OPERATORS and SEARCH_OPERATORS[operator](0.0, value):
+            self.env.cr.execute(
+                "SELECT DISTINCT partner_id FROM followup_partner_balance WHERE company_id = %s",
+                (self.env.user.company_id.id,))
+            domain = ['|', ('id', 'not in', [x[0] for x in self.env.cr.fetchall()])] + domain
+        return domain
+
+    def _payment_overdue_search(self, operator, operand):
+        return self._search_followup_amount(
+            'COALESCE(SUM(balance) FILTER (WHERE date_maturity <= %s), 0)',
+            operator, operand, params=(fields.Date.today(),))
+
     def _payment_earliest_date_search(self, operator, operand):
-        args = [('payment_earliest_due_date', operator, operand)]
-        company_id = self.env.user.company_id.id
-        having_where_clause = ' AND '.join(
-            map(lambda x: "(MIN(l.date_maturity) %s '%%s')" % (x[1]), args))
-        having_values = [x[2] for x in args]
-        having_where_clause = having_where_clause % (having_values[0])
-        query = """SELECT partner_id FROM account_move_line l
-                LEFT JOIN account_account a ON a.id = l.account_id
-                WHERE a.account_type = 'asset_receivable' 
-                AND l.company_id = %s 
-                AND l.full_reconcile_id IS NULL 
-                AND partner_id IS NOT NULL GROUP BY partner_id"""
-        query = query % company_id
-        if having_where_clause:
-            query += ' HAVING %s ' % (having_where_clause)
-        self.env.cr.execute(query)
-        res = self.env.cr.fetchall()
-        if not res:
-            return [('id', '=', '0')]
-        return [('id', 'in', [x[0] for x in res])]
+        return self._search_followup_balance('MIN(date_maturity)', operator, operand)
 
     def _payment_due_search(self, operator, operand):
-        args = [('payment_amount_due', operator, operand)]
-        query, params = self._get_followup_overdue_query(args, overdue_only=False)
-        self.env.cr.execute(query, params)
-        res = self.env.cr.fetchall()
-        if not res:
-            return [('id', '=', '0')]
-        return [('id', 'in', [x[0] for x in res])]
+        return self._search_followup_amount('SUM(balance)', operator, operand)
 
     def _get_partners(self):
         partners = set()